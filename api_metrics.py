@@ -0,0 +1,227 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+# 구글 Sheets API 기본 할당량 (사용자별 분당 읽기/쓰기 요청 수)
+READ_QUOTA_PER_MINUTE = 60
+WRITE_QUOTA_PER_MINUTE = 60
+QUOTA_WINDOW_SECONDS = 60
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNATTRIBUTED = "-"
+
+_current_action = contextvars.ContextVar("api_action", default=UNATTRIBUTED)
+_current_method = contextvars.ContextVar("api_method", default=UNATTRIBUTED)
+
+
+def classify_endpoint(path):
+    """요청 경로를 API 엔드포인트 이름으로 분류합니다 (예: /v4/spreadsheets/ID/values:batchGet -> values.batchGet)."""
+    if path.startswith("/drive/"):
+        return "drive.files.get"
+    if ":batchUpdate" in path and "/values" not in path:
+        return "spreadsheets.batchUpdate"
+    for marker, name in ((":batchGet", "values.batchGet"), (":batchUpdate", "values.batchUpdate"),
+                         (":append", "values.append"), (":clear", "values.clear"), ("/values/", "values")):
+        if marker in path:
+            return name
+    return "spreadsheets.get" if path.startswith("/v4/") else path
+
+
+def quota_kind(method, endpoint):
+    """할당량 종류: Drive 호출은 'drive', Sheets GET은 'read', 나머지는 'write'"""
+    if endpoint.startswith("drive."):
+        return "drive"
+    return "read" if method == "GET" else "write"
+
+
+def set_api_action(name):
+    """현재 실행 흐름(스레드/컨텍스트)의 UI 동작 이름을 설정합니다. 이후 API 호출은 이 동작으로 집계됩니다."""
+    return _current_action.set(name)
+
+
+class api_action:
+    """with 블록 안의 API 호출을 지정한 UI 동작으로 집계합니다."""
+
+    def __init__(self, name):
+        self.name = name
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_action.set(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_action.reset(self._token)
+
+
+def tracked(func):
+    """
+    매니저 메서드 데코레이터: 메서드 안에서 발생한 API 호출을 '클래스.메서드'로 집계합니다.
+    중첩 호출이면 바깥쪽(UI에서 직접 부른) 메서드로 집계됩니다 (예: read_sheet_data 안의 open_spreadsheet).
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current_method.get() != UNATTRIBUTED:
+            return func(*args, **kwargs)
+        token = _current_method.set(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_method.reset(token)
+    return wrapper
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+class ApiMetrics:
+    """
+    업스트림 API 호출 집계 (프로세스 전체에서 하나)
+    - (UI 동작, 매니저 메서드, 엔드포인트)별 호출 수, 오류 수, 지연 시간, 요청/응답 크기
+    - 최근 QUOTA_WINDOW_SECONDS 동안의 읽기/쓰기 호출 수 (할당량 사용률)
+    """
+
+    def __init__(self, read_quota=READ_QUOTA_PER_MINUTE, write_quota=WRITE_QUOTA_PER_MINUTE):
+        self.read_quota = read_quota
+        self.write_quota = write_quota
+        self._lock = threading.Lock()
+        self._totals = {}  # {(action, method, endpoint): {...}}
+        self._latency_buckets = {}  # {endpoint: [버킷별 누적 개수..., 전체]}
+        self._window = deque()  # [(timestamp, quota kind)]
+        self.started = time.time()
+
+    def record(self, http_method, url, status, seconds, request_bytes, response_bytes):
+        endpoint = classify_endpoint(urlparse(url).path)
+        kind = quota_kind(http_method, endpoint)
+        key = (_current_action.get(), _current_method.get(), f"{http_method} {endpoint}")
+        now = time.time()
+        with self._lock:
+            entry = self._totals.get(key)
+            if entry is None:
+                entry = self._totals[key] = {
+                    "calls": 0, "errors": 0, "rate_limited": 0, "seconds": 0.0, "max_seconds": 0.0,
+                    "request_bytes": 0, "response_bytes": 0, "kind": kind,
+                }
+            entry["calls"] += 1
+            entry["errors"] += int(status is None or status >= 400)
+            entry["rate_limited"] += int(status == 429)
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["request_bytes"] += request_bytes
+            entry["response_bytes"] += response_bytes
+            buckets = self._latency_buckets.setdefault(key[2], [0] * (len(LATENCY_BUCKETS) + 1))
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[index] += 1
+            buckets[-1] += 1
+            self._window.append((now, kind))
+            self._trim_window(now)
+
+    def _trim_window(self, now):
+        while self._window and now - self._window[0][0] > QUOTA_WINDOW_SECONDS:
+            self._window.popleft()
+
+    def quota_usage(self):
+        """최근 1분간 종류별 호출 수와 할당량 대비 사용률"""
+        with self._lock:
+            self._trim_window(time.time())
+            counts = {"read": 0, "write": 0, "drive": 0}
+            for _, kind in self._window:
+                counts[kind] += 1
+        return {
+            "read": counts["read"], "write": counts["write"], "drive": counts["drive"],
+            "read_ratio": counts["read"] / self.read_quota if self.read_quota else 0.0,
+            "write_ratio": counts["write"] / self.write_quota if self.write_quota else 0.0,
+        }
+
+    def rows(self):
+        """집계 행 목록 [{action, method, endpoint, calls, ...}]"""
+        with self._lock:
+            return [
+                {"action": action, "method": method, "endpoint": endpoint, **entry}
+                for (action, method, endpoint), entry in self._totals.items()
+            ]
+
+    def summarize(self, by):
+        """by('action' | 'method' | 'endpoint')별 합계 (호출 수 많은 순)"""
+        summary = {}
+        for row in self.rows():
+            total = summary.setdefault(row[by], {by: row[by], "calls": 0, "errors": 0, "seconds": 0.0,
+                                                 "max_seconds": 0.0, "request_bytes": 0, "response_bytes": 0})
+            for field in ("calls", "errors", "seconds", "request_bytes", "response_bytes"):
+                total[field] += row[field]
+            total["max_seconds"] = max(total["max_seconds"], row["max_seconds"])
+        for total in summary.values():
+            total["avg_ms"] = total["seconds"] / total["calls"] * 1000 if total["calls"] else 0.0
+        return sorted(summary.values(), key=lambda total: -total["calls"])
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._latency_buckets.clear()
+            self._window.clear()
+            self.started = time.time()
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식으로 카운터를 내보냅니다."""
+        rows = self.rows()
+        usage = self.quota_usage()
+        with self._lock:
+            latency = {endpoint: list(buckets) for endpoint, buckets in self._latency_buckets.items()}
+        lines = [
+            "# HELP sheets_api_requests_total Upstream Google API requests by UI action, manager method and endpoint.",
+            "# TYPE sheets_api_requests_total counter",
+        ]
+        for row in rows:
+            lines.append(f"sheets_api_requests_total{_labels(action=row['action'], method=row['method'], endpoint=row['endpoint'])} {row['calls']}")
+        lines += ["# HELP sheets_api_errors_total Upstream requests that failed (HTTP >= 400 or no response).",
+                  "# TYPE sheets_api_errors_total counter"]
+        for row in rows:
+            lines.append(f"sheets_api_errors_total{_labels(action=row['action'], method=row['method'], endpoint=row['endpoint'])} {row['errors']}")
+        lines += ["# HELP sheets_api_rate_limited_total Upstream requests rejected with HTTP 429.",
+                  "# TYPE sheets_api_rate_limited_total counter"]
+        for row in rows:
+            lines.append(f"sheets_api_rate_limited_total{_labels(action=row['action'], method=row['method'], endpoint=row['endpoint'])} {row['rate_limited']}")
+        for field, help_text in (("request_bytes", "Request payload bytes sent."), ("response_bytes", "Response payload bytes received.")):
+            lines += [f"# HELP sheets_api_{field}_total {help_text}", f"# TYPE sheets_api_{field}_total counter"]
+            for row in rows:
+                lines.append(f"sheets_api_{field}_total{_labels(action=row['action'], method=row['method'], endpoint=row['endpoint'])} {row[field]}")
+        lines += ["# HELP sheets_api_request_duration_seconds Upstream request latency.",
+                  "# TYPE sheets_api_request_duration_seconds histogram"]
+        for endpoint, buckets in latency.items():
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f"sheets_api_request_duration_seconds_bucket{_labels(endpoint=endpoint, le=bound)} {count}")
+            lines.append(f"sheets_api_request_duration_seconds_bucket{_labels(endpoint=endpoint, le='+Inf')} {buckets[-1]}")
+            seconds = sum(row["seconds"] for row in rows if row["endpoint"] == endpoint)
+            lines.append(f"sheets_api_request_duration_seconds_sum{_labels(endpoint=endpoint)} {seconds:.6f}")
+            lines.append(f"sheets_api_request_duration_seconds_count{_labels(endpoint=endpoint)} {buckets[-1]}")
+        lines += ["# HELP sheets_api_quota_window_requests Requests in the last 60 seconds by quota kind.",
+                  "# TYPE sheets_api_quota_window_requests gauge"]
+        for kind in ("read", "write", "drive"):
+            lines.append(f"sheets_api_quota_window_requests{_labels(kind=kind)} {usage[kind]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Prometheus 텍스트 파일로 저장합니다 (node_exporter textfile collector 등에서 수집)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+_api_metrics = ApiMetrics()
+
+
+def get_api_metrics():
+    """프로세스 전체에서 공유하는 API 호출 집계"""
+    return _api_metrics
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def normalize_asset_path(path, case_sensitive=False):
+    """에셋 경로 비교용 정규화: 구분자를 '/'로 통일하고 앞쪽 './', '/'를 제거합니다."""
+    normalized = str(path).replace("\\", "/").strip()
+    while normalized.startswith("./"):
+        normalized = normalized[2:]
+    normalized = normalized.lstrip("/")
+    return normalized if case_sensitive else normalized.lower()
+
+
+def default_manifest_file(root):
+    """에셋 폴더별 매니페스트 저장 파일 경로 (현재 폴더의 .asset_manifest.<해시>.json)"""
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:10]
+    return os.path.join(os.getcwd(), f".asset_manifest.{digest}.json")
+
+
+class AssetManifest:
+    """
+    로컬 에셋 폴더의 파일 목록 색인
+    - 처음 한 번 전체를 스캔하고, 이후 refresh()는 폴더 mtime이 바뀐 폴더만 다시 읽습니다 (파일마다 stat하지 않음).
+    - contains()/contains_stem()은 메모리의 set 조회만 하므로 행마다 파일 시스템에 접근하지 않습니다.
+    - manifest_file이 주어지면 폴더별 목록을 저장해 두었다가 다음 실행에서 증분 갱신의 기준으로 사용합니다.
+    """
+
+    def __init__(self, root, manifest_file=None, case_sensitive=False, min_refresh_interval=30.0):
+        self.root = os.path.abspath(root)
+        self.manifest_file = manifest_file
+        self.case_sensitive = case_sensitive
+        self.min_refresh_interval = min_refresh_interval
+        self.version = 0
+        self.digest = None
+        self.last_refresh = None
+        self.last_scan_stats = {"scanned_dirs": 0, "reused_dirs": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+        self._dirs = {}  # {폴더 상대 경로: {"mtime": int(ns), "files": [...], "subdirs": [...]}}
+        self._paths = frozenset()
+        self._stems = frozenset()
+        self._load_manifest()
+
+    def _load_manifest(self):
+        """저장된 매니페스트가 같은 폴더의 것이면 폴더별 목록을 불러옵니다 (파일 목록은 refresh 때 검증)."""
+        if not self.manifest_file or not os.path.exists(self.manifest_file):
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get("root") == self.root and saved.get("case_sensitive") == self.case_sensitive:
+                self._dirs = saved.get("dirs", {})
+        except Exception as e:
+            print(f"에셋 매니페스트 로드 중 오류: {e}")
+
+    def _save_manifest(self):
+        """폴더별 목록을 임시 파일에 쓴 뒤 교체하여 원자적으로 저장합니다."""
+        if not self.manifest_file:
+            return
+        payload = {"root": self.root, "case_sensitive": self.case_sensitive, "dirs": self._dirs}
+        manifest_dir = os.path.dirname(os.path.abspath(self.manifest_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".asset_manifest.", suffix=".tmp", dir=manifest_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_file)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"에셋 매니페스트 저장 중 오류: {e}")
+
+    def _scan_dir(self, absolute):
+        files, subdirs = [], []
+        with os.scandir(absolute) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file() and not entry.name.startswith(".asset_manifest."):
+                    files.append(entry.name)
+        return files, subdirs
+
+    def refresh(self, force=False):
+        """
+        폴더 mtime을 비교하여 바뀐 폴더만 다시 읽습니다. force=True면 저장된 목록을 무시하고 전체를 스캔합니다.
+        파일 목록이 실제로 바뀌었으면 True를 반환합니다.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            previous = {} if force else self._dirs
+            current = {}
+            scanned = reused = 0
+            stack = [""]
+            while stack:
+                relative = stack.pop()
+                absolute = os.path.join(self.root, relative) if relative else self.root
+                try:
+                    mtime = os.stat(absolute).st_mtime_ns
+                    cached = previous.get(relative)
+                    if cached and cached["mtime"] == mtime:
+                        entry = cached
+                        reused += 1
+                    else:
+                        files, subdirs = self._scan_dir(absolute)
+                        entry = {"mtime": mtime, "files": files, "subdirs": subdirs}
+                        scanned += 1
+                except OSError:
+                    continue
+                current[relative] = entry
+                stack.extend(f"{relative}/{name}" if relative else name for name in entry["subdirs"])
+
+            # mtime만 바뀌고 목록이 같은 폴더는 변경으로 보지 않음 (매니페스트 파일이 에셋 폴더 안에 있는 경우 등)
+            listing_changed = current.keys() != previous.keys() or any(
+                entry is not previous[relative] and (entry["files"], entry["subdirs"]) != (previous[relative]["files"], previous[relative]["subdirs"])
+                for relative, entry in current.items()
+            )
+            self._dirs = current
+            previous_digest = self.digest
+            if listing_changed or self.digest is None:
+                self._rebuild_index()
+            if listing_changed:
+                self._save_manifest()
+            changed = self.digest != previous_digest
+            self.last_refresh = time.monotonic()
+            self.last_scan_stats = {"scanned_dirs": scanned, "reused_dirs": reused, "seconds": time.perf_counter() - started}
+            return changed
+
+    def ensure_fresh(self):
+        """마지막 갱신 후 min_refresh_interval이 지났으면 증분 갱신합니다."""
+        if self.last_refresh is None or time.monotonic() - self.last_refresh >= self.min_refresh_interval:
+            return self.refresh()
+        return False
+
+    def _rebuild_index(self):
+        paths = set()
+        for relative, entry in self._dirs.items():
+            prefix = f"{relative}/" if relative else ""
+            paths.update(normalize_asset_path(prefix + name, self.case_sensitive) for name in entry["files"])
+        digest = hashlib.sha1("\n".join(sorted(paths)).encode("utf-8")).hexdigest()[:16]
+        if digest != self.digest:
+            self._paths = frozenset(paths)
+            self._stems = frozenset(os.path.splitext(path)[0] for path in paths)
+            self.digest = digest
+            self.version += 1
+
+    def contains(self, path):
+        """에셋 폴더 기준 상대 경로의 파일이 있으면 True"""
+        return normalize_asset_path(path, self.case_sensitive) in self._paths
+
+    def contains_stem(self, path):
+        """확장자를 뺀 경로가 일치하는 파일이 있으면 True (확장자 없이 지정하는 사운드 경로용)"""
+        normalized = normalize_asset_path(path, self.case_sensitive)
+        return normalized in self._paths or normalized in self._stems
+
+    def stats(self):
+        return {
+            "root": self.root,
+            "files": len(self._paths),
+            "dirs": len(self._dirs),
+            "version": self.version,
+            **self.last_scan_stats,
+        }
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+
+from session_store import estimate_size
+
+
+class BoundedCache:
+    """
+    크기/나이/메모리 한도가 있는 스레드 안전 LRU 캐시
+    - max_entries: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 제거)
+    - ttl_seconds: 마지막 사용 이후 이 시간이 지나면 만료 (None이면 만료 없음)
+    - max_bytes: size_fn으로 계산한 총 용량 한도 (None이면 제한 없음)
+    """
+
+    def __init__(self, max_entries=8, ttl_seconds=None, max_bytes=None, size_fn=estimate_size, on_evict=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.size_fn = size_fn
+        self.on_evict = on_evict
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # {key: {"value": ..., "bytes": int, "created": float, "last_used": float}}
+        self._build_locks = {}
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": {"lru": 0, "ttl": 0, "memory": 0, "manual": 0}}
+
+    def _is_expired(self, entry, now):
+        return self.ttl_seconds is not None and now - entry["last_used"] > self.ttl_seconds
+
+    def _remove(self, key, reason):
+        """항목을 제거하고 통계를 갱신합니다 (lock 안에서 호출)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry["bytes"]
+        self._stats["evictions"][reason] += 1
+        if self.on_evict:
+            try:
+                self.on_evict(key, entry["value"], reason)
+            except Exception as e:
+                print(f"캐시 항목 정리 중 오류: {e}")
+
+    def _enforce_limits(self, protected_key=None):
+        """만료 항목과 한도를 넘는 항목을 제거합니다 (lock 안에서 호출)."""
+        now = time.time()
+        for key in [key for key, entry in self._entries.items() if self._is_expired(entry, now)]:
+            self._remove(key, "ttl")
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)), "lru")
+        if self.max_bytes is not None:
+            for key in list(self._entries):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                if key != protected_key:
+                    self._remove(key, "memory")
+
+    def get(self, key, default=None):
+        """값을 반환합니다. 없거나 만료되었으면 default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is None or self._is_expired(entry, now):
+                if entry is not None:
+                    self._remove(key, "ttl")
+                self._stats["misses"] += 1
+                return default
+            entry["last_used"] = now
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry["value"]
+
+    def put(self, key, value):
+        """값을 저장하고 한도를 적용합니다."""
+        size = self.size_fn(value) if self.size_fn else 0
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries[key]["bytes"]
+            now = time.time()
+            self._entries[key] = {"value": value, "bytes": size, "created": now, "last_used": now}
+            self._entries.move_to_end(key)
+            self._total_bytes += size
+            self._enforce_limits(protected_key=key)
+        return value
+
+    def get_or_create(self, key, factory):
+        """
+        값이 있으면 반환하고, 없으면 factory()로 만들어 저장합니다.
+        같은 키를 동시에 요청해도 factory는 한 번만 실행됩니다. factory가 None을 반환하면 저장하지 않습니다.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and not self._is_expired(entry, time.time()):
+                    entry["last_used"] = time.time()
+                    return entry["value"]
+            value = factory()
+            if value is not None:
+                self.put(key, value)
+        with self._lock:
+            self._build_locks.pop(key, None)
+        return value
+
+    def pop(self, key):
+        """항목을 직접 제거합니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            self._remove(key, "manual")
+            return entry["value"] if entry else None
+
+    def clear(self):
+        """모든 항목을 제거합니다."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key, "manual")
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry, time.time())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """적중/실패/제거 통계와 현재 항목 정보를 반환합니다."""
+        with self._lock:
+            self._enforce_limits()
+            now = time.time()
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "evictions": dict(self._stats["evictions"]),
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "items": [
+                    {
+                        "key": str(key),
+                        "bytes": entry["bytes"],
+                        "age_seconds": round(now - entry["created"], 1),
+                        "idle_seconds": round(now - entry["last_used"], 1),
+                    }
+                    for key, entry in self._entries.items()
+                ],
+            }
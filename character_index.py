@@ -0,0 +1,128 @@
+import re
+from collections import defaultdict
+
+_STRIP_PATTERN = re.compile(r"[\s\W_]+")
+
+
+def normalize_name(text):
+    """비교용 이름 정규화: 소문자 변환 후 공백/기호 제거 ('아 빈', '아빈!' -> '아빈')"""
+    return _STRIP_PATTERN.sub("", str(text).lower())
+
+
+def edit_distance(a, b, max_distance=None):
+    """레벤슈타인 거리 (max_distance를 넘으면 더 계산하지 않고 max_distance + 1 반환)"""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def _bigrams(key, padded=False):
+    if padded:
+        key = f"\x02{key}\x03"
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+class CharacterIndex:
+    """
+    캐릭터 이름(KR, Name) n-gram 색인
+    - 정확히 일치하는 조회는 dict로 O(1)
+    - 검색창의 부분 문자열 검색은 bigram 역색인 교집합으로 후보를 줄인 뒤 확인
+    - 미등록 캐릭터 추천은 bigram을 공유하는 후보만 편집 거리로 점수를 매김
+    행 번호는 characters_df의 위치(iloc) 기준입니다.
+    """
+
+    def __init__(self, characters_df, min_similarity=0.4, max_candidates=50):
+        self.min_similarity = min_similarity
+        self.max_candidates = max_candidates
+        self.by_kr = {}
+        self.by_name = {}
+        self.labels = []      # 행 번호 -> 표시용 KR 이름
+        self.keys = []        # 항목 번호 -> (정규화된 이름, 행 번호)
+        self.unigrams = defaultdict(set)
+        self.bigrams = defaultdict(set)
+        self.padded_bigrams = defaultdict(set)
+
+        kr_values = characters_df['kr'].tolist() if 'kr' in characters_df.columns else [""] * len(characters_df)
+        name_values = characters_df['name'].tolist() if 'name' in characters_df.columns else [""] * len(characters_df)
+        for row, (kr, name) in enumerate(zip(kr_values, name_values)):
+            self.by_kr.setdefault(kr, row)
+            self.by_name.setdefault(str(name).lower(), row)
+            self.labels.append(kr or name)
+            for key in {normalize_name(kr), normalize_name(name)}:
+                if key:
+                    self._add_key(key, row)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _add_key(self, key, row):
+        entry = len(self.keys)
+        self.keys.append((key, row))
+        for char in set(key):
+            self.unigrams[char].add(entry)
+        for gram in _bigrams(key):
+            self.bigrams[gram].add(entry)
+        for gram in _bigrams(key, padded=True):
+            self.padded_bigrams[gram].add(entry)
+
+    def find_kr(self, kr_name):
+        """한글 이름이 정확히 일치하는 행 번호 (없으면 None)"""
+        return self.by_kr.get(kr_name)
+
+    def find_name(self, name):
+        """영문 이름이 대소문자 무시하고 일치하는 행 번호 (없으면 None)"""
+        return self.by_name.get(str(name).lower())
+
+    def search(self, query):
+        """
+        부분 문자열 검색 (공백/대소문자 무시). 일치하는 행 번호를 원래 순서대로 반환합니다.
+        """
+        key = normalize_name(query)
+        if not key:
+            return list(range(len(self.labels)))
+        if len(key) == 1:
+            entries = self.unigrams.get(key, set())
+        else:
+            postings = sorted((self.bigrams.get(gram, set()) for gram in _bigrams(key)), key=len)
+            entries = set.intersection(*postings) if postings and postings[0] else set()
+        return sorted({self.keys[entry][1] for entry in entries if key in self.keys[entry][0]})
+
+    def suggest_rows(self, name, limit=3):
+        """비슷한 이름의 캐릭터 [(행 번호, 유사도)] (유사도 높은 순)"""
+        key = normalize_name(name)
+        if not key:
+            return []
+        shared = defaultdict(int)
+        for gram in _bigrams(key, padded=True):
+            for entry in self.padded_bigrams.get(gram, ()):
+                shared[entry] += 1
+        candidates = sorted(shared, key=shared.get, reverse=True)[:self.max_candidates]
+
+        best = {}
+        for entry in candidates:
+            candidate, row = self.keys[entry]
+            longest = max(len(key), len(candidate))
+            max_distance = int(longest * (1 - self.min_similarity))
+            similarity = 1 - edit_distance(key, candidate, max_distance) / longest
+            # 별명/줄임말처럼 한쪽이 다른 쪽을 포함하는 경우도 추천 대상
+            if len(key) >= 2 and len(candidate) >= 2 and (key in candidate or candidate in key):
+                similarity = max(similarity, 0.6)
+            if similarity >= self.min_similarity and similarity > best.get(row, 0):
+                best[row] = similarity
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def suggest(self, name, limit=3):
+        """비슷한 캐릭터의 KR 이름 목록 (유사도 높은 순)"""
+        return [self.labels[row] for row, _ in self.suggest_rows(name, limit)]
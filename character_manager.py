@@ -1,6 +1,10 @@
 import pandas as pd
 import re
+import threading
 import gspread # gspread 임포트
+from settings_manager import records_from_values, content_hash
+from settings_snapshot import CharacterSnapshot, exclusive_write
+from api_metrics import tracked
 
 class CharacterManager:
     def __init__(self, gspread_client, sheet_url):
@@ -8,11 +12,31 @@ class CharacterManager:
         self.gc = gspread_client
         self.sheet_url = sheet_url
         self.spreadsheet = None
-        self.characters_df = pd.DataFrame()
+        # [신규] 캐릭터 표는 불변 스냅샷으로 보관하고, 변경 시 새 스냅샷으로 통째로 교체합니다 (읽는 쪽은 잠금 없음).
+        # 스냅샷의 version은 'character' 탭 내용이 바뀌었을 때만 증가합니다 (포트레이트 경로 캐시 등 무효화용).
+        self._snapshot = CharacterSnapshot()
+        self._write_lock = threading.RLock()  # 시트 쓰기와 스냅샷 교체는 한 번에 하나씩
+        self._worksheets = {}  # [신규] 탭 이름 -> 워크시트 핸들
 
         if self.gc and self.sheet_url:
             self.load_characters()
 
+    def snapshot(self):
+        """[신규] 현재 캐릭터 표 스냅샷 (변환 한 번 동안 이 객체만 사용하면 도중의 변경에 영향받지 않음)"""
+        return self._snapshot
+
+    @property
+    def characters_df(self):
+        return self._snapshot.characters_df
+
+    @property
+    def index(self):
+        return self._snapshot.index
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
     def is_loaded(self):
         """[신규] 데이터가 성공적으로 로드되었는지 확인하는 메서드"""
         return not self.characters_df.empty
@@ -21,55 +45,103 @@ class CharacterManager:
         """[신규] 데이터가 비어있는지 확인하는 메서드 (is_loaded와 동일)"""
         return self.characters_df.empty
     
-    def load_characters(self):
-        """[수정] 'character' 시트에서 캐릭터 데이터를 로드하여 DataFrame으로 저장합니다."""
+    @tracked
+    @exclusive_write
+    def load_characters(self, values=None):
+        """
+        [수정] 'character' 시트에서 캐릭터 데이터를 로드하여 DataFrame으로 저장합니다.
+        values(get_all_values 형식)가 주어지면 시트를 다시 읽지 않고 그 값을 사용하며,
+        내용이 이전과 같으면 DataFrame을 다시 만들지 않습니다.
+        [수정] 새 DataFrame과 색인을 따로 만든 뒤 스냅샷을 한 번에 교체하므로, 변환 중인 다른 세션은 이전 표를 그대로 봅니다.
+        """
         try:
-            self.spreadsheet = self.gc.open_by_url(self.sheet_url)
-            worksheet = self.spreadsheet.worksheet("character")
-            records = worksheet.get_all_records()
-            self.characters_df = pd.DataFrame(records)
+            if values is None:
+                if not self.spreadsheet:
+                    self.spreadsheet = self.gc.open_by_url(self.sheet_url)
+                worksheet = self._worksheet("character")
+                values = worksheet.get_all_values()
+
+            new_hash = content_hash(values)
+            if new_hash == self._snapshot.content_hash:
+                return True, "캐릭터 데이터가 변경되지 않았습니다."
+
+            records = records_from_values(values)
+            characters_df = pd.DataFrame(records)
             
             # 데이터 타입 통일 및 소문자 변환
-            for col in self.characters_df.columns:
-                self.characters_df[col] = self.characters_df[col].astype(str)
-            self.characters_df.columns = [str(col).lower() for col in self.characters_df.columns]
+            for col in characters_df.columns:
+                characters_df[col] = characters_df[col].astype(str)
+            characters_df.columns = [str(col).lower() for col in characters_df.columns]
             
             # [신규] 빈 string_id 행들 필터링
-            if 'string_id' in self.characters_df.columns:
+            if 'string_id' in characters_df.columns:
                 # string_id가 빈 문자열, 공백, 'nan', None인 경우 제거
-                self.characters_df = self.characters_df[
-                    (self.characters_df['string_id'].notna()) & 
-                    (self.characters_df['string_id'].str.strip() != '') &
-                    (self.characters_df['string_id'] != 'nan')
+                characters_df = characters_df[
+                    (characters_df['string_id'].notna()) & 
+                    (characters_df['string_id'].str.strip() != '') &
+                    (characters_df['string_id'] != 'nan')
                 ].copy()
                 
                 # 인덱스 재설정
-                self.characters_df.reset_index(drop=True, inplace=True)
-            
+                characters_df.reset_index(drop=True, inplace=True)
+
+            # [신규] 이름 조회/검색/추천용 색인은 스냅샷을 만들 때 한 번만 생성
+            self._snapshot = CharacterSnapshot(characters_df, self._snapshot.version + 1, new_hash)
             return True, "캐릭터 데이터를 시트에서 불러왔습니다."
         except gspread.exceptions.SpreadsheetNotFound:
             return False, "설정 시트를 찾을 수 없습니다."
         except gspread.exceptions.WorksheetNotFound:
+            self.forget_worksheets()
             return False, "'character' 시트를 찾을 수 없습니다."
         except Exception as e:
+            self.forget_worksheets()
             return False, f"캐릭터 데이터 로드 중 오류: {e}"
 
+    def _worksheet(self, tab_name):
+        """[신규] 워크시트 핸들을 캐시합니다. 처음 한 번 전체 탭 목록을 받아 두므로 탭마다 메타데이터를 다시 조회하지 않습니다."""
+        if tab_name not in self._worksheets:
+            self._worksheets.update({worksheet.title: worksheet for worksheet in self.spreadsheet.worksheets()})
+            if tab_name not in self._worksheets:
+                raise gspread.exceptions.WorksheetNotFound(tab_name)
+        return self._worksheets[tab_name]
+
+    def forget_worksheets(self):
+        """[신규] 캐시한 워크시트 핸들을 버립니다. 오류가 나거나 다시 불러올 때 호출하여, 탭이 삭제/재생성된 뒤 이전 시트 ID를 쓰지 않게 합니다."""
+        self._worksheets = {}
+
+    def get_content_hash(self):
+        """[신규] 마지막으로 로드한 'character' 탭 내용의 해시를 반환합니다 (로드 전이면 None)."""
+        return self._snapshot.content_hash
+
     def get_characters_dataframe(self):
-        """[수정] 메모리에 저장된 DataFrame을 반환합니다."""
-        return self.characters_df
+        """[수정] 현재 스냅샷의 DataFrame을 반환합니다 (공유 객체이므로 수정하지 마세요)."""
+        return self._snapshot.characters_df
 
     def get_character_by_kr(self, kr_name):
-        """[수정] DataFrame에서 한글 이름으로 캐릭터를 찾습니다."""
-        if self.characters_df.empty: return None
-        result = self.characters_df[self.characters_df['kr'] == kr_name]
-        return result.iloc[0].to_dict() if not result.empty else None
+        """[수정] 색인에서 한글 이름으로 캐릭터를 찾습니다."""
+        return self._snapshot.get_character_by_kr(kr_name)
 
     def get_character_by_name(self, name):
-        """[수정] DataFrame에서 영문 이름으로 캐릭터를 찾습니다."""
-        if self.characters_df.empty: return None
-        result = self.characters_df[self.characters_df['name'].str.lower() == name.lower()]
-        return result.iloc[0].to_dict() if not result.empty else None
+        """[수정] 색인에서 영문 이름(대소문자 무시)으로 캐릭터를 찾습니다."""
+        return self._snapshot.get_character_by_name(name)
+
+    def suggest_characters(self, name, limit=3):
+        """[신규] 미등록 이름과 비슷한 등록 캐릭터의 KR 이름 목록 (오타, 띄어쓰기, 줄임말 등)"""
+        return self._snapshot.index.suggest(name, limit)
+
+    def search_characters(self, query):
+        """
+        [신규] 이름 또는 KR로 캐릭터를 검색합니다 (공백/대소문자 무시 부분 일치).
+        일치하는 항목이 없으면 비슷한 이름의 캐릭터를 대신 반환합니다. (DataFrame, 추천 결과 여부)
+        """
+        snapshot = self._snapshot
+        rows = snapshot.index.search(query)
+        if rows or not query:
+            return snapshot.characters_df.iloc[rows], False
+        return snapshot.characters_df.iloc[[row for row, _ in snapshot.index.suggest_rows(query, limit=10)]], True
 
+    @tracked
+    @exclusive_write
     def add_character(self, name, kr_name, string_id, portrait_path):
         """[수정] 새 캐릭터를 'character' 시트에 추가합니다."""
         if not self.spreadsheet: return False, "설정 시트에 연결되지 않았습니다."
@@ -87,7 +159,7 @@ class CharacterManager:
             return False, f"String_ID '{string_id}'가 이미 사용 중입니다."
             
         try:
-            worksheet = self.spreadsheet.worksheet("character")
+            worksheet = self._worksheet("character")
             # 컬럼 순서: String_ID, KR, Name, Portrait_Path, Converter_Name
             converter_name = f"[@{string_id}]"
             new_row = [string_id, kr_name, name, portrait_path, converter_name]
@@ -95,8 +167,11 @@ class CharacterManager:
             self.load_characters() # 데이터 다시 로드
             return True, f"캐릭터 '{name}'이(가) 시트에 추가되었습니다."
         except Exception as e:
+            self.forget_worksheets()
             return False, f"캐릭터 추가 중 오류: {e}"
     
+    @tracked
+    @exclusive_write
     def delete_character(self, string_id):
         """[수정] 'character' 시트에서 string_id로 캐릭터를 찾아 삭제합니다."""
         if not self.spreadsheet: return False, "설정 시트에 연결되지 않았습니다."
@@ -106,7 +181,7 @@ class CharacterManager:
             return False, "유효하지 않은 String_ID입니다."
             
         try:
-            worksheet = self.spreadsheet.worksheet("character")
+            worksheet = self._worksheet("character")
             cell = worksheet.find(string_id, in_column=1) # String_ID는 A열에 있다고 가정
             if cell:
                 worksheet.delete_rows(cell.row)
@@ -114,8 +189,11 @@ class CharacterManager:
                 return True, f"'{string_id}' 캐릭터가 삭제되었습니다."
             return False, "삭제할 캐릭터를 찾지 못했습니다."
         except Exception as e:
+            self.forget_worksheets()
             return False, f"캐릭터 삭제 중 오류: {e}"
 
+    @tracked
+    @exclusive_write
     def add_characters_batch(self, char_data_list):
         """[신규] 여러 캐릭터를 한 번에 추가하는 메서드"""
         if not self.spreadsheet: 
@@ -125,7 +203,7 @@ class CharacterManager:
         error_messages = []
         
         try:
-            worksheet = self.spreadsheet.worksheet("character")
+            worksheet = self._worksheet("character")
             new_rows = []
             
             for char_data in char_data_list:
@@ -161,6 +239,7 @@ class CharacterManager:
                 self.load_characters()  # 데이터 다시 로드
                 
         except Exception as e:
+            self.forget_worksheets()
             error_messages.append(f"일괄 추가 중 오류: {e}")
         
         return success_count, error_messages
\ No newline at end of file
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+from types import MappingProxyType
+
+from bounded_cache import BoundedCache
+from session_store import estimate_size
+
+
+def _freeze(results):
+    """결과 목록을 세션 간에 공유할 수 있는 불변 형태(읽기 전용 dict의 튜플)로 복사합니다."""
+    return tuple(MappingProxyType(dict(result)) for result in results)
+
+
+def _thaw(results):
+    """공유 중인 결과를 호출자 전용 복사본(dict의 list)으로 돌려줍니다. 호출자가 수정해도 캐시와 다른 세션에 영향이 없습니다."""
+    return [dict(result) for result in results]
+
+
+class ConversionResultCache:
+    """
+    프로세스 전체에서 공유되는 변환 결과 캐시
+    키: (spreadsheet id, 시트 이름, 씬 번호, 시트 revision, 설정 지문)
+    같은 revision의 같은 씬을 같은 설정으로 변환하면 다시 변환하지 않고 저장된 결과를 반환합니다.
+    결과는 읽기 전용 dict로 보관하고, 꺼낼 때마다 dict를 복사해 반환합니다.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl_seconds=6 * 3600):
+        self._cache = BoundedCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            size_fn=estimate_size,
+        )
+
+    @staticmethod
+    def make_key(sheet_id, worksheet, scene, revision, fingerprint):
+        """캐시 키를 만듭니다. revision을 알 수 없으면 None (캐시하지 않음)"""
+        if not sheet_id or revision is None:
+            return None
+        return (sheet_id, worksheet, str(scene), str(revision), fingerprint)
+
+    def get(self, key):
+        """저장된 결과의 복사본(list)을 반환합니다. 없으면 None"""
+        if key is None:
+            return None
+        results = self._cache.get(key)
+        return _thaw(results) if results is not None else None
+
+    def put(self, key, results):
+        """결과를 저장합니다. 세션 간 공유되므로 불변 복사본으로 보관합니다."""
+        if key is not None:
+            self._cache.put(key, _freeze(results))
+
+    def get_or_convert(self, key, convert_fn):
+        """
+        캐시된 결과가 있으면 반환하고, 없으면 convert_fn()으로 변환해 저장합니다.
+        반환값: (결과 list, 캐시 적중 여부) - 결과는 항상 호출자 전용 복사본입니다.
+        """
+        if key is None:
+            return convert_fn(), False
+        converted = []
+
+        def factory():
+            converted.append(True)
+            return _freeze(convert_fn())
+
+        results = self._cache.get_or_create(key, factory)
+        return _thaw(results), not converted
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+def read_options_id(column_mapping=None, columns=None):
+    """컬럼 매핑/프로젝션처럼 시트를 읽을 때 입력 데이터에 영향을 주는 옵션의 식별자"""
+    options = repr((sorted((column_mapping or {}).items()), list(columns or [])))
+    return hashlib.sha1(options.encode("utf-8")).hexdigest()[:12]
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_conversion_cache():
+    """모든 Streamlit 세션과 배치 작업이 함께 쓰는 변환 결과 캐시를 반환합니다."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ConversionResultCache()
+        return _shared_cache
+
+
+def convert_scene_cached(converter, scene_df, sheet_id, worksheet, scene, revision, read_options="", snapshot=None):
+    """
+    씬을 변환하되, 같은 (시트, 씬, revision, 설정)의 결과가 이미 있으면 재사용합니다.
+    read_options에는 컬럼 매핑/프로젝션처럼 입력 데이터에 영향을 주는 읽기 옵션 식별자를 넘깁니다.
+    반환값: (결과 list, 캐시 적중 여부)
+    캐시 키의 설정 지문과 실제 변환은 같은 설정 스냅샷을 사용합니다 (생략하면 현재 스냅샷, 에셋 검사 없음).
+    """
+    snapshot = snapshot or converter.snapshot()
+    fingerprint = f"{converter.get_settings_fingerprint(snapshot)}:{read_options}"
+    cache = get_conversion_cache()
+    key = cache.make_key(sheet_id, worksheet, scene, revision, fingerprint)
+    return cache.get_or_convert(key, lambda: converter.convert_scene_data(scene_df, snapshot))
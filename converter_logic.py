@@ -1,25 +1,90 @@
+import numpy as np
 import pandas as pd
 import re
+import hashlib
 from portrait_sound_manager import PortraitSoundManager
+from expression_index import NORMALIZED, PREFIX, UNMATCHED, describe_match
 
 class ConverterLogic:
     """
     지시문별 규칙과 상세 리포팅을 처리하는 클래스 (v2.4)
     """
+    # [신규] 변환에 항상 필요한 컬럼 (씬 선택/지시문 분기 + 내장 '대사' 규칙이 읽는 컬럼)
+    BASE_COLUMNS = ("씬 번호", "지시문")
+    DIALOGUE_COLUMNS = ("캐릭터", "string_id", "표정", "사운드 주소", "사운드 파일", "대사")
     def __init__(self, character_manager, portrait_sound_manager, settings_manager):
         # [함수명: __init__]: "자막" 규칙 제거
         self.character_manager = character_manager
         self.ps_manager = portrait_sound_manager
         self.settings_manager = settings_manager
         self.builtin_rules = {"대사": self._convert_dialogue}
+        # [수정] ('directives' 탭 버전, {지시문: 컴파일된 템플릿}) 캐시. 버전이 바뀌면 새 dict로 통째로 교체합니다.
+        self._compiled_templates = (None, {})
 
-    def _apply_template(self, template, row):
-        """[수정] {{컬럼명}} 형태의 placeholder를 인식하고, #{{컬럼명}} 패턴에 자동 개행 처리 적용"""
-        # 1. #{{컬럼명}} 패턴 찾기 (개행 처리 적용용)
+    def snapshot(self, portrait_assets=None, sound_assets=None):
+        """
+        [신규] 변환/검증 한 번에 사용할 설정 스냅샷 (캐릭터 표, 표정 맵, 지시문 규칙)
+        [수정] 에셋 존재 여부를 검사하려면 세션의 에셋 색인(AssetManifest)을 넘깁니다.
+        """
+        return self.ps_manager.current_snapshot(portrait_assets, sound_assets)
+
+    def _compile_template(self, template):
+        """[신규] 템플릿의 placeholder 목록을 미리 추출합니다. (#{{컬럼명}} 목록, {{컬럼명}} 목록)"""
         comment_placeholders = re.findall(r'#\{\{(.+?)\}\}', template)
-        
-        # 2. 일반 {{컬럼명}} 패턴 찾기
         placeholders = re.findall(r'\{\{(.+?)\}\}', template)
+        return comment_placeholders, placeholders
+
+    def _get_compiled_template(self, directive, template, snapshot):
+        """[수정] 지시문별 컴파일된 템플릿을 반환합니다. 스냅샷의 'directives' 탭 버전이 바뀌면 새 캐시로 교체합니다."""
+        version = snapshot.settings.tab_versions.get("directives", 0)
+        cached_version, compiled_templates = self._compiled_templates
+        if version != cached_version:
+            compiled_templates = {}
+            self._compiled_templates = (version, compiled_templates)
+        compiled = compiled_templates.get(directive)
+        if compiled is None:
+            compiled = self._compile_template(template)
+            compiled_templates[directive] = compiled
+        return compiled
+
+    def get_settings_fingerprint(self, snapshot=None):
+        """
+        [수정] 변환 결과에 영향을 주는 설정(캐릭터 표, 표정 맵, 지시문 규칙)의 지문을 반환합니다.
+        설정 탭의 내용 해시를 조합하므로 내용이 같으면 매니저가 새로 만들어져도 같은 값입니다.
+        snapshot을 넘기면 그 스냅샷 기준으로 계산합니다 (변환에 쓴 스냅샷과 캐시 키를 일치시킬 때).
+        """
+        snapshot = snapshot or self.snapshot()
+        tab_hashes = snapshot.settings.tab_hashes
+        parts = [
+            str(snapshot.characters.content_hash),
+            str(tab_hashes.get("expressions")),
+            str(tab_hashes.get("directives")),
+        ]
+        if tab_hashes.get("expressions") is None:
+            # 설정 시트 없이 주입된 표정 맵을 사용하는 경우
+            parts.append(repr(sorted(snapshot.expression_map.items())))
+        # [신규] 에셋 존재 여부 경고도 변환 결과에 포함되므로 에셋 색인 내용을 지문에 반영
+        parts.append(repr(snapshot.asset_stamp))
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def get_required_columns(self, dialogue_columns=()):
+        """
+        [신규] 시트에서 읽어야 하는 컬럼 목록을 반환합니다 (정규화된 컬럼명).
+        기본 컬럼 + '대사' 규칙 컬럼 + 사용자 정의 지시문 템플릿의 placeholder를 포함합니다.
+        [수정] dialogue_columns(다국어 변환에 쓸 언어별 대사 컬럼, convert_scene_locales 참고)도 포함합니다.
+        """
+        snapshot = self.snapshot()
+        columns = list(self.BASE_COLUMNS) + list(self.DIALOGUE_COLUMNS)
+        columns.extend(column.strip().lower() for column in dialogue_columns)
+        for directive, rule in snapshot.directive_rules.items():
+            comment_placeholders, placeholders = self._get_compiled_template(directive, rule['template'], snapshot)
+            columns.extend(ph.strip().lower() for ph in comment_placeholders + placeholders)
+        return list(dict.fromkeys(columns))
+
+    def _apply_template(self, template, row, compiled=None):
+        """[수정] {{컬럼명}} 형태의 placeholder를 인식하고, #{{컬럼명}} 패턴에 자동 개행 처리 적용"""
+        # 1~2. #{{컬럼명}} / {{컬럼명}} 패턴 찾기 (미리 컴파일된 목록이 있으면 재사용)
+        comment_placeholders, placeholders = compiled or self._compile_template(template)
         result = template
         
         # 3. #{{컬럼명}} 패턴 먼저 처리 (개행을 공백으로 치환)
@@ -54,23 +119,39 @@ class ConverterLogic:
         cleaned = ' '.join(cleaned.split())
         return cleaned
 
+    def _has_text(self, value):
+        return isinstance(value, str) and value.strip() != ""
+
     def _generate_fallback_string_id(self, row):
         sound_file = row.get('사운드 파일', '')
         if sound_file and isinstance(sound_file, str): return f"cs_{sound_file}"
         return ""
     
-    def _convert_dialogue(self, row):
+    def _convert_dialogue(self, row, snapshot):
         """
         [수정] 대사 텍스트를 _clean_dialogue_text 함수로 처리합니다.
+        캐릭터/표정 조회는 모두 변환 시작 시점의 snapshot에서 합니다.
+        """
+        error, command, messages, missing_assets = self._resolve_dialogue(row, snapshot)
+        if error:
+            return error
+        return self._format_dialogue(command, messages, row.get("대사", ""), missing_assets)
+
+    def _resolve_dialogue(self, row, snapshot):
+        """
+        [신규] '대사' 행에서 언어와 관계없는 부분(캐릭터 확인, STRING_ID, 포트레이트/사운드 경로, 에셋 경고)을 계산합니다.
+        반환값: (오류 결과 또는 None, 대화상자 추가 명령 줄, 경고 메시지 목록, 에셋 색인에 없는 경로 목록)
         """
         messages = []
         # 1. 캐릭터 검증
         char_name = row.get("캐릭터", "")
         if not char_name:
-            return {"status": "error", "result": "# [오류] '캐릭터' 정보가 비어있습니다.", "message": "필수값 '캐릭터' 없음"}
-        char_data = self.character_manager.get_character_by_kr(char_name) or self.character_manager.get_character_by_name(char_name)
+            return {"status": "error", "result": "# [오류] '캐릭터' 정보가 비어있습니다.", "message": "필수값 '캐릭터' 없음"}, None, None, None
+        char_data = snapshot.characters.find_character(char_name)
         if not char_data:
-            return {"status": "error", "result": f"# [오류] 등록되지 않은 캐릭터: {char_name}", "message": f"미등록 캐릭터: {char_name}"}
+            suggestions = snapshot.characters.index.suggest(char_name)
+            hint = f" (추천: {', '.join(suggestions)})" if suggestions else ""
+            return {"status": "error", "result": f"# [오류] 등록되지 않은 캐릭터: {char_name}{hint}", "message": f"미등록 캐릭터: {char_name}{hint}"}, None, None, None
         char_string_id = char_data.get('string_id', 'unknown')
 
         # 2. STRING_ID 검증 및 자동 생성
@@ -78,36 +159,178 @@ class ConverterLogic:
         if not dialogue_string_id or (isinstance(dialogue_string_id, str) and dialogue_string_id.strip() == ''):
             dialogue_string_id = self._generate_fallback_string_id(row)
             if not dialogue_string_id:
-                 return {"status": "error", "result": "# [오류] STRING_ID가 비어있고, ID 생성에 필요한 '사운드 파일'도 없습니다.", "message": "ID 생성 불가"}
+                 return {"status": "error", "result": "# [오류] STRING_ID가 비어있고, ID 생성에 필요한 '사운드 파일'도 없습니다.", "message": "ID 생성 불가"}, None, None, None
             messages.append("경고: 'STRING_ID'가 비어있어 '사운드 파일' 기준으로 자동 생성했습니다.")
 
         # 3. 포트레이트 경로 생성
         expression = row.get('표정', '')
-        portrait_path = self.ps_manager.generate_portrait_path(char_name, expression)
+        portrait_path = self.ps_manager.generate_portrait_path(char_name, expression, snapshot)
+        # [신규] 표정이 맵과 정확히 일치하지 않으면(근사 일치 또는 Default 대체) 경고로 알림
+        expression_note = describe_match(expression, snapshot.expression_index.lookup(expression)) if portrait_path else None
+        if expression_note:
+            messages.append(f"경고: {expression_note}")
 
         # 4. 사운드 경로 생성
         sound_address = row.get('사운드 주소', '')
         sound_file = row.get('사운드 파일', '')
         sound_path = self.ps_manager.generate_sound_path(sound_address, sound_file)
 
-        # 5. 최종 3줄 텍스트 조합 (대사 클리닝 적용)
+        # [신규] 스냅샷에 에셋 색인이 지정된 경우 생성된 경로의 파일 존재 여부 확인 (메모리 조회만 수행)
+        missing_assets = []
+        if self.ps_manager.check_portrait(portrait_path, snapshot) is False:
+            messages.append(f"경고: 포트레이트 파일 없음 ({portrait_path})")
+            missing_assets.append(portrait_path)
+        if self.ps_manager.check_sound(sound_path, snapshot) is False:
+            messages.append(f"경고: 사운드 파일 없음 ({sound_path})")
+            missing_assets.append(sound_path)
+
         line1 = f'스토리_대화상자_추가("[@{char_string_id}]","[@{dialogue_string_id}]","{portrait_path}","{sound_path}")'
-        line2 = f'#{self._clean_dialogue_text(row.get("대사", ""))}' # 수정된 부분
+        return None, line1, messages, missing_assets
+
+    def _format_dialogue(self, command, messages, text, missing_assets=()):
+        """
+        [신규] 5. 최종 3줄 텍스트 조합 (대사 클리닝 적용). 언어마다 '#대사' 줄만 다릅니다.
+        [수정] 'missing_assets'에 에셋 색인에 없는 경로를 담습니다 (메시지 문구를 해석하지 않고 집계할 수 있도록).
+        """
+        line2 = f'#{self._clean_dialogue_text(text)}' # 수정된 부분
         line3 = '대기()'
-        result_text = f"{line1}\n{line2}\n{line3}"
+        result_text = f"{command}\n{line2}\n{line3}"
         status = "warning" if messages else "success"
         message_text = " | ".join(messages) if messages else "성공"
-        return {"status": status, "result": result_text, "message": message_text}
+        return {"status": status, "result": result_text, "message": message_text, "missing_assets": tuple(missing_assets)}
 
-    def _convert_default(self, row):
-        dialogue_text = self._clean_dialogue_text(row.get("대사", ""))
+    def _convert_default(self, row, column="대사"):
+        dialogue_text = self._clean_dialogue_text(row.get(column, ""))
         return {"status": "success", "result": f"#{dialogue_text}", "message": "기본 주석 처리"}
 
 
-    def convert_scene_data(self, scene_df):
-        """[수정] 사용자 정의 지시문 규칙 적용 로직을 _apply_template으로 일원화합니다."""
+    def _text_column(self, df, column, strip=True, categorical=True):
+        """
+        [수정] 컬럼을 문자열 Series로 반환합니다. 컬럼이 없으면 빈 문자열로 채웁니다.
+        범주형 컬럼은 범주(고유값)만 정리하고 코드는 그대로 두므로 이후 isin/비교/그룹화가 범주 코드 위에서 수행됩니다.
+        categorical=False이면 문자열 연산(연결 등)을 위해 일반 문자열 Series로 반환합니다.
+        """
+        if column not in df.columns:
+            return pd.Series("", index=df.index, dtype=object)
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = pd.Index(values.cat.categories.astype(str))
+            if strip:
+                categories = categories.str.strip()
+            # 정리 후 같아진 범주는 합치고, 결측(코드 -1)은 마지막에 덧붙인 ""를 가리키게 함
+            merged_codes, merged = pd.factorize(np.append(categories.to_numpy(dtype=object), ""))
+            cleaned = pd.Series(pd.Categorical.from_codes(merged_codes[values.cat.codes.to_numpy()], merged), index=df.index)
+            return cleaned if categorical else cleaned.astype(str)
+        values = values.fillna("").astype(str)
+        return values.str.strip() if strip else values
+
+    def _rows_by_value(self, values, row_numbers, mask):
+        """[신규] mask에 해당하는 행 번호를 값별로 묶어 {값: [행 번호...]} 형태로 반환합니다 (등장 순서 유지)."""
+        if not mask.any():
+            return {}
+        grouped = row_numbers[mask].groupby(values[mask], sort=False, observed=True)
+        return {key: group.tolist() for key, group in grouped}
+
+    def _find_missing_assets(self, df, char_names, expressions, sound_files, row_numbers, mask, snapshot):
+        """
+        [신규] mask에 해당하는 대사 행의 포트레이트/사운드 경로 중 스냅샷의 에셋 색인에 없는 경로를 찾습니다.
+        반환값: ({경로: [행 번호...]}, 에셋이 없는 행 마스크)
+        """
+        missing = {}
+        is_missing = pd.Series(False, index=df.index)
+        if snapshot.portrait_assets is not None and mask.any():
+            pairs = list(zip(char_names[mask], expressions[mask]))
+            paths = {pair: self.ps_manager.generate_portrait_path(*pair, snapshot) for pair in dict.fromkeys(pairs)}
+            portrait_paths = pd.Series([paths[pair] for pair in pairs], index=char_names[mask].index)
+            checked = {path: self.ps_manager.check_portrait(path, snapshot) for path in portrait_paths.unique()}
+            portrait_missing = portrait_paths.map(lambda path: checked[path] is False).reindex(df.index, fill_value=False).astype(bool)
+            missing.update(self._rows_by_value(portrait_paths.reindex(df.index, fill_value=""), row_numbers, portrait_missing))
+            is_missing |= portrait_missing
+        if snapshot.sound_assets is not None and mask.any():
+            addresses = self._text_column(df, "사운드 주소", strip=False, categorical=False)
+            has_sound = mask & (addresses != "") & (sound_files != "")
+            sound_paths = (addresses + sound_files).where(has_sound, "")
+            checked = {path: self.ps_manager.check_sound(path, snapshot) for path in sound_paths[has_sound].unique()}
+            sound_missing = has_sound & sound_paths.map(lambda path: checked.get(path) is False)
+            for path, rows in self._rows_by_value(sound_paths, row_numbers, sound_missing).items():
+                missing.setdefault(path, []).extend(rows)
+            is_missing |= sound_missing
+        return missing, is_missing
+
+    def validate_scene_data(self, df, snapshot=None):
+        """
+        [신규] 변환 전에 씬(또는 시트 전체) 데이터를 일괄 검증합니다.
+        행 단위 변환 없이 컬럼 마스크와 집합 연산만으로 한 번에 검사하며,
+        결과는 UI의 캐릭터 일괄 추가 폼에서 바로 사용할 수 있는 구조화된 리포트(dict)입니다.
+        """
+        snapshot = snapshot or self.snapshot()
+        row_numbers = df['원본 행 번호'] if '원본 행 번호' in df.columns else pd.Series(df.index, index=df.index)
+
+        # 1. 지시문 분류 (convert_scene_data와 같은 우선순위: 사용자 정의 > 내장 > 기본)
+        directives = self._text_column(df, "지시문")
+        custom_directives = set(snapshot.directive_rules)
+        is_custom = directives.isin(custom_directives)
+        is_dialogue = ~is_custom & (directives == "대사")
+        is_unknown_directive = (directives != "") & ~is_custom & ~directives.isin(set(self.builtin_rules))
+
+        # 2. 캐릭터 검증 (한글 이름 정확히 일치 또는 영문 이름 대소문자 무시)
+        char_names = self._text_column(df, "캐릭터", strip=False)
+        index = snapshot.characters.index
+        is_registered = char_names.isin(index.by_kr.keys()) | char_names.str.lower().isin(index.by_name.keys())
+        is_empty_character = is_dialogue & (char_names == "")
+        is_unregistered = is_dialogue & (char_names != "") & ~is_registered
+
+        # 3. STRING_ID 검증 ('사운드 파일' 기반 자동 생성 여부 포함)
+        string_ids = self._text_column(df, "string_id", categorical=False)
+        sound_files = self._text_column(df, "사운드 파일", strip=False, categorical=False)
+        has_string_id = string_ids != ""
+        is_missing_string_id = is_dialogue & ~has_string_id & (sound_files == "")
+        effective_ids = string_ids.where(has_string_id, "cs_" + sound_files)
+        has_effective_id = is_dialogue & (has_string_id | (sound_files != ""))
+        is_duplicate_id = has_effective_id & effective_ids.where(has_effective_id).duplicated(keep=False)
+
+        # 4. 표정 검증 (매핑되지 않은 값은 Default 포트레이트로 대체됨)
+        # [수정] 변환과 같은 트라이 색인으로 고유한 값마다 한 번씩 조회하여, 근사 일치(정규화/접두어)도 따로 보고
+        expressions = self._text_column(df, "표정", strip=False)
+        expression_index = snapshot.expression_index
+        expression_kinds = expressions.map(lambda value: expression_index.lookup(value)[2]).astype(object)
+        is_unmapped_expression = is_dialogue & (expression_kinds == UNMATCHED)
+        is_approximate_expression = is_dialogue & expression_kinds.isin([NORMALIZED, PREFIX])
+        approximate_expressions = self._rows_by_value(expressions, row_numbers, is_approximate_expression)
+
+        # 5. 에셋 존재 여부 검증 (에셋 색인이 설정된 경우, 고유 경로별로 한 번씩 메모리 조회)
+        missing_assets, is_missing_asset = self._find_missing_assets(
+            df, char_names, expressions, sound_files, row_numbers, is_dialogue & is_registered, snapshot)
+
+        unregistered_rows = self._rows_by_value(char_names, row_numbers, is_unregistered)
+        report = {
+            "total_rows": len(df),
+            "dialogue_rows": int(is_dialogue.sum()),
+            "unregistered_characters": list(unregistered_rows),
+            "unregistered_character_rows": unregistered_rows,
+            "character_suggestions": {name: index.suggest(name) for name in unregistered_rows},
+            "empty_character_rows": row_numbers[is_empty_character].tolist(),
+            "missing_string_id_rows": row_numbers[is_missing_string_id].tolist(),
+            "unknown_directives": self._rows_by_value(directives, row_numbers, is_unknown_directive),
+            "unmapped_expressions": self._rows_by_value(expressions, row_numbers, is_unmapped_expression),
+            "approximate_expressions": approximate_expressions,
+            "expression_matches": {value: expression_index.lookup(value)[1] for value in approximate_expressions},
+            "duplicate_string_ids": self._rows_by_value(effective_ids, row_numbers, is_duplicate_id),
+            "missing_assets": missing_assets,
+        }
+        report["error_count"] = int((is_unregistered | is_empty_character | is_missing_string_id).sum())
+        report["warning_count"] = int((is_unknown_directive | is_unmapped_expression | is_approximate_expression | is_duplicate_id | is_missing_asset).sum())
+        report["is_valid"] = report["error_count"] == 0
+        return report
+
+    def convert_scene_data(self, scene_df, snapshot=None):
+        """
+        [수정] 사용자 정의 지시문 규칙 적용 로직을 _apply_template으로 일원화합니다.
+        모든 행을 같은 설정 스냅샷으로 변환하므로, 도중에 다른 세션이 캐릭터/규칙을 바꿔도 결과가 섞이지 않습니다.
+        """
         results = []
-        custom_directives = self.settings_manager.get_directive_rules()
+        snapshot = snapshot or self.snapshot()
+        custom_directives = snapshot.directive_rules
         for index, row in scene_df.iterrows():
             directive = row.get("지시문", "")
             directive = directive.strip() if isinstance(directive, str) else ""
@@ -115,13 +338,70 @@ class ConverterLogic:
             result_dict = None
             if directive in custom_directives:
                 rule = custom_directives[directive]
-                result_text = self._apply_template(rule['template'], row)
+                compiled = self._get_compiled_template(directive, rule['template'], snapshot)
+                result_text = self._apply_template(rule['template'], row, compiled)
                 result_dict = {"status": "success", "result": result_text, "message": f"사용자 정의 규칙 '{directive}' 적용"}
             elif directive in self.builtin_rules:
                 convert_function = self.builtin_rules[directive]
-                result_dict = convert_function(row)
+                result_dict = convert_function(row, snapshot)
             else:
                 result_dict = self._convert_default(row)
             
             results.append(result_dict)
-        return results
\ No newline at end of file
+        return results
+
+    def convert_scene_locales(self, scene_df, dialogue_columns, snapshot=None):
+        """
+        [신규] 같은 씬을 여러 언어의 대사 컬럼으로 한 번에 변환합니다. 반환값: {대사 컬럼: 결과 목록(convert_scene_data와 같은 형식)}
+        행마다 캐릭터 확인, STRING_ID, 포트레이트/사운드 경로는 한 번만 계산하여 모든 언어가 공유하고,
+        언어마다 '#대사' 줄(사용자 정의 규칙은 {{대사}} 자리)만 해당 컬럼 값으로 바꿉니다.
+        '대사' 행인데 원문은 있고 해당 언어 컬럼이 비어 있으면 경고로 표시하고, 결과에 "missing_translation": True를 넣습니다.
+        """
+        snapshot = snapshot or self.snapshot()
+        columns = list(dict.fromkeys(column.strip().lower() for column in dialogue_columns))
+        results = {column: [] for column in columns}
+        custom_directives = snapshot.directive_rules
+        for index, row in scene_df.iterrows():
+            directive = row.get("지시문", "")
+            directive = directive.strip() if isinstance(directive, str) else ""
+
+            if directive in custom_directives:
+                rule = custom_directives[directive]
+                compiled = self._get_compiled_template(directive, rule['template'], snapshot)
+                message = f"사용자 정의 규칙 '{directive}' 적용"
+                if "대사" not in (ph.strip().lower() for ph in compiled[0] + compiled[1]):
+                    shared = {"status": "success", "result": self._apply_template(rule['template'], row, compiled), "message": message}
+                    for column in columns:
+                        results[column].append(shared)
+                    continue
+                values = row.to_dict()
+                for column in columns:
+                    localized = {**values, "대사": row.get(column, "")}
+                    results[column].append({"status": "success", "result": self._apply_template(rule['template'], localized, compiled), "message": message})
+            elif directive == "대사":
+                error, command, messages, missing_assets = self._resolve_dialogue(row, snapshot)
+                source_text = row.get("대사", "")
+                for column in columns:
+                    if error:
+                        results[column].append(error)
+                        continue
+                    text = row.get(column, "")
+                    missing_translation = column != "대사" and self._has_text(source_text) and not self._has_text(text)
+                    column_messages = messages + [f"경고: '{column}' 번역 없음"] if missing_translation else messages
+                    result = self._format_dialogue(command, column_messages, text, missing_assets)
+                    result["missing_translation"] = missing_translation
+                    results[column].append(result)
+            else:
+                for column in columns:
+                    results[column].append(self._convert_default(row, column))
+        return results
+
+    def convert_windows(self, windows, snapshot=None):
+        """
+        [신규] 창 단위로 들어오는 DataFrame(GoogleSheetsManager.read_sheet_windows 참고)을 받는 대로 변환하여
+        (창 DataFrame, 결과 목록)을 하나씩 내줍니다. 모든 창을 시작할 때 만든 같은 설정 스냅샷으로 변환합니다.
+        """
+        snapshot = snapshot or self.snapshot()
+        for window_df in windows:
+            if len(window_df):
+                yield window_df, self.convert_scene_data(window_df, snapshot)
\ No newline at end of file
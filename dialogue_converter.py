@@ -1,12 +1,25 @@
 import streamlit as st
 import pandas as pd
-from character_manager import CharacterManager
-from portrait_sound_manager import PortraitSoundManager
-from google_sheets_manager import GoogleSheetsManager
-from converter_logic import ConverterLogic
-from settings_manager import SettingsManager
+from google_sheets_manager import GoogleSheetsManager, scene_numbers, scene_mask, STATUS_COLUMN, MESSAGE_COLUMN, STREAM_WINDOW_ROWS
+from manager_registry import ManagerRegistry
+from conversion_cache import convert_scene_cached, get_conversion_cache, read_options_id
+from sheet_config_manager import SheetConfigManager
+from session_store import SharedSheetStore, SessionLease, estimate_size
+from asset_manifest import AssetManifest, default_manifest_file
+from api_metrics import get_api_metrics, set_api_action
+from sheet_prefetcher import SheetPrefetcher, prefetch_candidates
+from sampling_profiler import SamplingProfiler
+from workbook_manifest import ManifestService
+from contextlib import nullcontext
+from collections import deque
+import os
+import uuid
 import pyperclip
 
+DEBUG_LOG_LIMIT = 20  # 디버그 로그 링 버퍼 크기 (화면에 표시되는 개수와 동일)
+RESULT_COLUMNS = ['원본 행 번호', '지시문', '캐릭터', '대사', 'string_id']
+PREFETCH_WAIT_SECONDS = 10  # 미리 읽는 중인 시트를 기다리는 최대 시간 (넘으면 직접 읽음)
+
 # --- 페이지 설정 ---
 st.set_page_config(page_title="대사 변환기 v3.6 (Final)", page_icon="🎬", layout="wide")
 
@@ -17,24 +30,45 @@ def get_sheets_manager():
     return GoogleSheetsManager()
 
 @st.cache_resource
-def get_cached_managers(_sheets_manager, _settings_url):
-    """매니저들을 캐싱하여 API 호출 최소화"""
-    if _sheets_manager and _sheets_manager.is_available() and _settings_url:
-        try:
-            char_manager = CharacterManager(_sheets_manager.gc, _settings_url)
-            settings_manager = SettingsManager(_sheets_manager.gc, _settings_url)
-            
-            if not char_manager.is_loaded() or not settings_manager.is_loaded():
-                st.sidebar.warning("설정 시트의 'character' 또는 'settings' 관련 시트를 찾거나 읽는 데 실패했습니다.")
-                return None, None, None, None
-
-            ps_manager = PortraitSoundManager(char_manager, settings_manager.get_expression_map())
-            converter = ConverterLogic(char_manager, ps_manager, settings_manager)
-            st.sidebar.success("상태: 설정 시트 연결 완료")
-            return char_manager, settings_manager, ps_manager, converter
-        except Exception as e:
-            st.sidebar.error(f"매니저 초기화 오류: {e}")
-            return None, None, None, None
+def get_sheet_store():
+    """[신규] 세션 간에 공유되는 시트 데이터 저장소 (시트 revision별로 한 벌만 보관)"""
+    return SharedSheetStore()
+
+@st.cache_resource
+def get_sheet_prefetcher():
+    """[신규] 다음에 선택할 시트를 공유 시트 저장소에 미리 읽어 두는 백그라운드 작업자 (프로세스 전체에서 하나)"""
+    return SheetPrefetcher(get_sheet_store())
+
+@st.cache_resource
+def get_manifest_service():
+    """[신규] 시나리오 워크북의 시트별 씬/캐릭터/지시문 색인을 백그라운드에서 만드는 서비스 (프로세스 전체에서 하나)"""
+    return ManifestService(get_sheets_manager())
+
+@st.cache_resource
+def get_sheet_config_manager():
+    """[신규] 시트별 컬럼 매핑/최근 접근 설정은 프로세스 전체에서 하나만 사용합니다."""
+    return SheetConfigManager()
+
+@st.cache_resource
+def get_manager_registry():
+    """[신규] 설정 시트 URL별 매니저 세트 레지스트리 (LRU/TTL/메모리 한도 적용, 세션 간 공유)"""
+    return ManagerRegistry()
+
+@st.cache_resource
+def get_asset_manifest(root):
+    """[신규] 에셋 폴더별 파일 색인 (프로세스 전체에서 폴더당 하나, 이후에는 mtime 기준 증분 갱신)"""
+    manifest = AssetManifest(root, default_manifest_file(root))
+    manifest.refresh()
+    return manifest
+
+def get_cached_managers(sheets_manager, settings_url):
+    """[수정] 매니저들을 레지스트리에서 가져와 API 호출 최소화"""
+    if sheets_manager and sheets_manager.is_available() and settings_url:
+        success, message, managers = get_manager_registry().get(sheets_manager.gc, settings_url)
+        if success:
+            st.sidebar.success(f"상태: {message}")
+            return managers
+        st.sidebar.warning(message)
     return None, None, None, None
 
 def add_debug_log(message, data=None):
@@ -47,32 +81,297 @@ def add_debug_log(message, data=None):
         "data": data
     }
     if 'debug_log' not in st.session_state:
-        st.session_state.debug_log = []
+        st.session_state.debug_log = deque(maxlen=DEBUG_LOG_LIMIT)
     st.session_state.debug_log.append(log_entry)
 
+def make_sheet_key(url, sheet_name, column_mapping, columns, revision=None):
+    """[수정] 공유 저장소 키: (spreadsheet id, 시트 이름, revision, 읽기 옵션 해시). revision을 생략하면 조회합니다."""
+    sheet_id = sheets_manager.extract_sheet_id(url)
+    if revision is None:
+        revision = sheets_manager.get_spreadsheet_revision(sheet_id)
+    if revision is None:
+        # revision을 알 수 없으면 다른 세션과 공유하지 않음
+        revision = f"local-{uuid.uuid4().hex}"
+    return (sheet_id, sheet_name, revision, read_options_id(column_mapping, columns))
+
+def render_memory_panel():
+    """[신규] 세션별 메모리 사용량과 공유 저장소 현황을 표시합니다."""
+    session_sizes = {}
+    for key in list(st.session_state.keys()):
+        if key == 'sheet_lease':
+            continue
+        session_sizes[str(key)] = estimate_size(st.session_state[key])
+    shared_sheet = st.session_state.sheet_lease.data()
+    st.write(f"**이 세션 고유 데이터:** {sum(session_sizes.values()) / 1024:,.1f} KB")
+    st.dataframe(
+        pd.DataFrame(sorted(session_sizes.items(), key=lambda item: -item[1]), columns=['항목', 'bytes']),
+        use_container_width=True, hide_index=True
+    )
+    if shared_sheet is not None:
+        st.write(f"**참조 중인 공유 시트 데이터:** {estimate_size(shared_sheet) / 1024:,.1f} KB (세션 간 공유)")
+    store_stats = sheet_store.stats()
+    st.write(f"**공유 저장소:** {store_stats['항목수']}개 항목 (유휴 {store_stats['유휴항목수']}개), 총 {store_stats['총용량(bytes)'] / 1024:,.1f} KB")
+    if store_stats['항목']:
+        st.dataframe(pd.DataFrame(store_stats['항목']), use_container_width=True, hide_index=True)
+    registry_stats = get_manager_registry().stats()
+    st.write(
+        f"**매니저 레지스트리:** {registry_stats['entries']}개 프로젝트, {registry_stats['total_bytes'] / 1024:,.1f} KB | "
+        f"적중 {registry_stats['hits']} / 실패 {registry_stats['misses']} | 제거 {registry_stats['evictions']}"
+    )
+    if registry_stats['items']:
+        st.dataframe(pd.DataFrame(registry_stats['items']), use_container_width=True, hide_index=True)
+    prefetch_stats = get_sheet_prefetcher().stats()
+    st.write(
+        f"**시트 미리 읽기:** 예약 {prefetch_stats['scheduled']} / 완료 {prefetch_stats['completed']} / 실패 {prefetch_stats['failed']} | "
+        f"사용 {prefetch_stats['used']} (진행 중 대기 {prefetch_stats['waited']}, 시작 전 취소 {prefetch_stats['cancelled']}) | 예산 초과로 건너뜀 {prefetch_stats['skipped']} | 진행 중 {prefetch_stats['inflight']}"
+    )
+    manifest_stats = get_manifest_service().stats()
+    st.write(
+        f"**워크북 색인:** {manifest_stats['workbooks']}개 워크북 | 갱신 {manifest_stats['scans']}회 (시트 읽음 {manifest_stats['sheets_read']} / "
+        f"내용 같아 재사용 {manifest_stats['sheets_reused']} / 세션 데이터로 갱신 {manifest_stats['recorded']}) | 실패 {manifest_stats['failed']} | 진행 중 {manifest_stats['inflight']}"
+    )
+    cache_stats = get_conversion_cache().stats()
+    st.write(
+        f"**변환 결과 캐시:** {cache_stats['entries']}개 씬, {cache_stats['total_bytes'] / 1024:,.1f} KB | "
+        f"적중률 {cache_stats['hit_rate']:.0%} (적중 {cache_stats['hits']} / 실패 {cache_stats['misses']}) | 제거 {cache_stats['evictions']}"
+    )
+
+def render_api_panel():
+    """[신규] 업스트림 API 호출 수를 UI 동작/매니저 메서드별로 표시하고, 최근 1분 할당량 사용률과 Prometheus 내보내기를 제공합니다."""
+    metrics = get_api_metrics()
+    usage = metrics.quota_usage()
+    st.write(f"**최근 1분 읽기:** {usage['read']} / {metrics.read_quota}")
+    st.progress(min(usage['read_ratio'], 1.0))
+    st.write(f"**최근 1분 쓰기:** {usage['write']} / {metrics.write_quota}")
+    st.progress(min(usage['write_ratio'], 1.0))
+    if usage['drive']:
+        st.caption(f"Drive API (revision 조회): 최근 1분 {usage['drive']}회")
+    for by, label in (("action", "UI 동작"), ("method", "매니저 메서드"), ("endpoint", "엔드포인트")):
+        summary = metrics.summarize(by)
+        if not summary:
+            continue
+        st.write(f"**{label}별 호출**")
+        summary_df = pd.DataFrame(summary)[[by, 'calls', 'errors', 'avg_ms', 'request_bytes', 'response_bytes']]
+        summary_df.columns = [label, '호출', '오류', '평균(ms)', '요청(bytes)', '응답(bytes)']
+        st.dataframe(summary_df.round({'평균(ms)': 1}), use_container_width=True, hide_index=True)
+    st.download_button("📥 Prometheus 형식 내보내기", metrics.to_prometheus(), file_name="sheets_api_metrics.prom", mime="text/plain")
+    if st.button("API 집계 초기화"):
+        metrics.reset()
+        st.rerun()
+
+def render_validation_report(report, title):
+    """[신규] 변환 전 검증 리포트를 요약해 표시합니다."""
+    if report["is_valid"] and report["warning_count"] == 0:
+        st.success(f"{title}: 총 {report['total_rows']}개 행에서 문제가 발견되지 않았습니다.")
+        return
+    summary = f"{title}: ❌ 오류 {report['error_count']}개 | ⚠️ 경고 {report['warning_count']}개 (총 {report['total_rows']}개 행)"
+    if report["is_valid"]:
+        st.warning(summary)
+    else:
+        st.error(summary)
+    with st.expander("🔍 검증 상세 결과", expanded=not report["is_valid"]):
+        sections = [
+            ("미등록 캐릭터", report["unregistered_character_rows"]),
+            ("매핑되지 않은 표정 (Default 사용)", report["unmapped_expressions"]),
+            ("근사 일치한 표정 (가장 가까운 표현 사용)", {f"{value} → {report['expression_matches'][value]}": rows
+                                                   for value, rows in report["approximate_expressions"].items()}),
+            ("알 수 없는 지시문 (기본 주석 처리)", report["unknown_directives"]),
+            ("중복된 대사 STRING_ID", report["duplicate_string_ids"]),
+            ("존재하지 않는 에셋 파일", report["missing_assets"]),
+        ]
+        for label, rows_by_value in sections:
+            if rows_by_value:
+                st.markdown(f"**{label}**")
+                for value, rows in rows_by_value.items():
+                    suggestions = report["character_suggestions"].get(value) if label == "미등록 캐릭터" else None
+                    hint = f" (추천: {', '.join(suggestions)})" if suggestions else ""
+                    st.text(f"- {value}: {', '.join(map(str, rows))}행{hint}")
+        if report["empty_character_rows"]:
+            st.markdown("**'캐릭터' 정보가 비어있는 행**")
+            st.text(", ".join(map(str, report["empty_character_rows"])))
+        if report["missing_string_id_rows"]:
+            st.markdown("**STRING_ID와 '사운드 파일'이 모두 비어있는 행**")
+            st.text(", ".join(map(str, report["missing_string_id_rows"])))
+
 # --- 세션 상태 관리 ---
 if 'settings_url' not in st.session_state: 
     st.session_state.settings_url = "https://docs.google.com/spreadsheets/d/1neSBv_r_ZM9-FoHjC73THZyJ1ytawjqg9aem9muBkhs/edit#gid=0"
 if 'current_url' not in st.session_state: st.session_state.current_url = ""
 if 'sheet_names' not in st.session_state: st.session_state.sheet_names = []
 if 'selected_sheet' not in st.session_state: st.session_state.selected_sheet = None
-if 'sheet_data' not in st.session_state: st.session_state.sheet_data = None
+if 'session_uid' not in st.session_state: st.session_state.session_uid = uuid.uuid4().hex
+if 'sheet_lease' not in st.session_state: st.session_state.sheet_lease = SessionLease(get_sheet_store(), st.session_state.session_uid)
 if 'scene_numbers' not in st.session_state: st.session_state.scene_numbers = []
 if 'result_df' not in st.session_state: st.session_state.result_df = None
+if 'result_revision' not in st.session_state: st.session_state.result_revision = None
 if 'editing_char_id' not in st.session_state: st.session_state.editing_char_id = None
-if 'debug_log' not in st.session_state: st.session_state.debug_log = []  # 여기 추가
+if 'debug_log' not in st.session_state: st.session_state.debug_log = deque(maxlen=DEBUG_LOG_LIMIT)  # 링 버퍼
+if 'validation_report' not in st.session_state: st.session_state.validation_report = None
+if 'profile_result' not in st.session_state: st.session_state.profile_result = None
+if 'locale_columns' not in st.session_state: st.session_state.locale_columns = []
+if 'locale_scripts' not in st.session_state: st.session_state.locale_scripts = None
+if 'pending_scene' not in st.session_state: st.session_state.pending_scene = None
 
 st.title("🎬 대사 변환기 v3.7 (Final)")
+set_api_action("페이지 로드")  # [신규] 이후 API 호출은 아래의 각 동작 이름으로 집계됨
 
 # --- 사이드바 ---
 st.sidebar.header("⚙️ 공통 설정")
 # 디버그 모드 토글 추가
 debug_mode = st.sidebar.checkbox("🐛 디버그 모드", help="상세 로그를 표시합니다")
 
-if 'debug_log' not in st.session_state:
-    st.session_state.debug_log = []
-
 sheets_manager = get_sheets_manager() # 1. API 클라이언트 먼저 생성
+sheet_config = get_sheet_config_manager()
+sheet_store = get_sheet_store()
+sheet_data = st.session_state.sheet_lease.data()  # 세션 간 공유되는 시트 데이터 (복사본을 세션에 두지 않음)
+selected_scene = None
+asset_manifests = (None, None)  # 이 세션의 (포트레이트, 사운드) 에셋 색인. 사이드바에서 폴더를 지정하면 설정됨
+
+def conversion_snapshot():
+    """[신규] 이 세션의 변환/검증에 쓸 설정 스냅샷 (에셋 색인은 공유 매니저에 두지 않고 스냅샷에 지정)"""
+    return converter.snapshot(*asset_manifests)
+
+def sheet_columns():
+    """[신규] 시트에서 읽을 컬럼: 변환에 필요한 컬럼 + 다국어 변환으로 선택한 언어별 대사 컬럼"""
+    return converter.get_required_columns(st.session_state.locale_columns)
+
+def load_shared_sheet(url, sheet_name):
+    """
+    [수정] 같은 revision의 시트를 다른 세션이 이미 읽었거나 미리 읽어 두었다면 공유 데이터를 재사용하고, 없으면 읽어서 공유 저장소에 등록합니다.
+    미리 읽는 중인 시트라면 새로 읽지 않고 그 결과를 기다립니다. (PREFETCH_WAIT_SECONDS 안에 끝나지 않으면 직접 읽음)
+    """
+    column_mapping = sheet_config.get_header_mapping(url)
+    columns = sheet_columns()
+    key = make_sheet_key(url, sheet_name, column_mapping, columns)
+    lease = st.session_state.sheet_lease
+    shared = sheet_store.get(key)
+    if shared is None:
+        shared = get_sheet_prefetcher().wait(key, timeout=PREFETCH_WAIT_SECONDS)
+    if shared is not None:
+        note = " (미리 읽어 둔 데이터)" if get_sheet_prefetcher().claim(key) else ""
+        return True, f"'{sheet_name}' 시트의 공유 데이터({len(shared)}개 행)를 사용합니다.{note}", lease.hold(key, shared)
+    success, message, df = sheets_manager.read_sheet_data(url, sheet_name, column_mapping, columns)
+    if not success:
+        return False, message, None
+    return True, message, lease.hold(key, df)
+
+def ensure_required_columns(df):
+    """
+    [신규] 시트를 읽은 뒤 지시문 템플릿이 추가/수정되어 변환에 필요한 컬럼이 데이터에 없으면, 그 컬럼을 포함해 시트를 다시 읽습니다.
+    (읽을 때 쓴 컬럼 목록이 지금과 같다면 컬럼이 시트에 없는 것이므로 다시 읽지 않습니다.)
+    반환값: (변환에 쓸 DataFrame, 시트에 없어 템플릿에 그대로 남을 placeholder 컬럼 목록)
+    """
+    url = st.session_state.current_url
+    columns = sheet_columns()
+    missing = set(columns) - set(df.columns)
+    lease_key = st.session_state.sheet_lease.key
+    if missing and lease_key and lease_key[3] != read_options_id(sheet_config.get_header_mapping(url), columns):
+        success, message, fresh = load_shared_sheet(url, st.session_state.selected_sheet)
+        if success:
+            add_debug_log("필요 컬럼 추가로 시트 다시 읽기", {"컬럼": sorted(missing)})
+            df = fresh
+            missing = set(columns) - set(df.columns)
+        else:
+            st.error(message)
+    builtin = set(converter.BASE_COLUMNS) | set(converter.DIALOGUE_COLUMNS) | set(st.session_state.locale_columns)
+    return df, sorted(missing - builtin)
+
+def render_manifest_search(url):
+    """
+    [신규] 워크북 색인에서 씬 번호/캐릭터/지시문이 나오는 씬을 찾아, 선택한 씬을 바로 엽니다 (시트를 하나씩 열지 않음).
+    색인이 아직 없으면 진행 상태만 표시합니다.
+    """
+    manifest_service = get_manifest_service()
+    manifest = manifest_service.get(url)
+    with st.expander("🔎 씬/캐릭터 찾기 (워크북 색인)", expanded=False):
+        if manifest is None:
+            if manifest_service.is_scanning(url):
+                st.caption("워크북 색인을 만드는 중입니다. 잠시 후 다시 열어 주세요.")
+            else:
+                st.caption(f"워크북 색인이 없습니다. {manifest_service.last_error or ''}")
+            return
+        indexed = sum(1 for entry in manifest.sheets.values() if entry)
+        st.caption(f"시트 {indexed}/{len(manifest.sheet_names)}개 색인됨 (revision {manifest.revision})"
+                   + (" - 갱신 중..." if manifest_service.is_scanning(url) else ""))
+        query = st.text_input("씬 번호, 캐릭터 또는 지시문", key="manifest_query")
+        hits = manifest.search(query)
+        if not query:
+            return
+        if not hits:
+            st.info("일치하는 씬이 없습니다.")
+            return
+        st.dataframe(pd.DataFrame(hits), use_container_width=True, hide_index=True)
+        choice = st.selectbox("열 씬", options=range(len(hits)), format_func=lambda i: f"{hits[i]['시트']} / 씬 {hits[i]['씬']}", key="manifest_choice")
+        if st.button("이 씬 열기") and hits[choice]['시트'] in st.session_state.sheet_names:
+            # 시트 선택 위젯보다 먼저 실행되므로 위젯 값을 바로 바꿀 수 있음. 씬은 시트를 읽은 뒤 선택됨
+            st.session_state.sheet_selector = hits[choice]['시트']
+            st.session_state.pending_scene = hits[choice]['씬']
+
+def build_result_df(df, conversion_results):
+    """[신규] 변환한 행과 결과로 결과 표시에 필요한 컬럼만 담은 작은 DataFrame을 만듭니다."""
+    result_df = df.reindex(columns=RESULT_COLUMNS, fill_value='')
+    result_df['상태'] = [res['status'] for res in conversion_results]
+    result_df['결과 메시지'] = [res['message'] for res in conversion_results]
+    result_df['변환 스크립트'] = [res['result'] for res in conversion_results]
+    result_df['에셋 누락'] = [len(res.get('missing_assets', ())) for res in conversion_results]
+    return result_df
+
+def stream_convert_sheet(url, sheet_name):
+    """
+    [신규] 대용량 시트용: 시트를 통째로 불러오지 않고 창 단위로 읽는 대로 변환하며 진행 상황을 바로 표시합니다.
+    끝나면 시트 전체의 결과를 result_df로 저장합니다 (도중에 실패하면 그때까지의 결과를 저장).
+    """
+    # 변환 상태 기록 시 행 위치가 그대로인지 확인하도록 읽기 전의 revision을 기록
+    revision = sheets_manager.get_spreadsheet_revision(sheets_manager.extract_sheet_id(url))
+    success, message, windows = sheets_manager.read_sheet_windows(
+        url, sheet_name, sheet_config.get_header_mapping(url), converter.get_required_columns())
+    if not success:
+        st.error(message)
+        return
+    st.caption(message)
+    progress = st.empty()
+    parts = []
+    counts = {'success': 0, 'warning': 0, 'error': 0}
+    try:
+        for window_df, conversion_results in converter.convert_windows(windows, conversion_snapshot()):
+            part = build_result_df(window_df, conversion_results)
+            parts.append(part)
+            for status in part['상태']:
+                counts[status] = counts.get(status, 0) + 1
+            progress.info(f"{sum(counts.values())}개 행 변환 ({part['원본 행 번호'].iloc[-1]}행까지 읽음): "
+                          f"✅ {counts['success']}개 | ⚠️ {counts['warning']}개 | ❌ {counts['error']}개")
+    except Exception as e:
+        st.error(f"스트리밍 변환 중 오류 발생: {e} (그때까지 변환한 {sum(counts.values())}개 행의 결과를 표시합니다.)")
+    add_debug_log("스트리밍 변환", {"시트": sheet_name, "창수": len(parts), "행수": sum(counts.values())})
+    st.session_state.locale_scripts = None
+    st.session_state.result_df = pd.concat(parts, ignore_index=True) if parts else None
+    st.session_state.result_revision = revision
+    if not parts:
+        st.warning("변환할 데이터가 없습니다.")
+
+def prefetch_sheets(url, sheet_names, selected=None, revision=None):
+    """
+    [신규] 선택한 시트의 다음/이전 시트와 최근 사용한 시트를 백그라운드에서 미리 읽어 공유 저장소에 넣어 둡니다.
+    revision(방금 읽은 시트의 키에 쓴 값)을 넘기면 다시 조회하지 않습니다.
+    revision을 알 수 없으면 다른 세션과 공유할 수 없으므로 미리 읽지 않습니다.
+    """
+    candidates = prefetch_candidates(sheet_names, selected, sheet_config.get_recent_sheets(url))
+    if not candidates:
+        return
+    if revision is None:
+        revision = sheets_manager.get_spreadsheet_revision(sheets_manager.extract_sheet_id(url))
+    if revision is None or str(revision).startswith("local-"):
+        return
+    column_mapping = sheet_config.get_header_mapping(url)
+    columns = sheet_columns()
+    prefetcher = get_sheet_prefetcher()
+    for name in candidates:
+        key = make_sheet_key(url, name, column_mapping, columns, revision)
+        prefetcher.schedule(key, lambda name=name: sheets_manager.read_sheet_data(url, name, column_mapping, columns))
+
+if debug_mode:
+    with st.sidebar.expander("🧠 메모리 사용량", expanded=False):
+        render_memory_panel()
 
 settings_url_input = st.sidebar.text_input(
     "설정 시트 URL", 
@@ -89,11 +388,47 @@ char_manager, settings_manager, ps_manager, converter = get_cached_managers(
 )
 
 if st.sidebar.button("⚙️ 설정 및 캐릭터 새로고침"):
-    # 캐시 삭제
-    get_cached_managers.clear()
-    st.toast("최신 설정과 캐릭터 목록을 다시 불러옵니다.")
+    # [수정] 매니저를 새로 만들지 않고, 한 번의 요청으로 탭 버전을 확인해 바뀐 탭만 다시 불러옵니다.
+    set_api_action("설정 새로고침")
+    if settings_manager:
+        # 설정 시트 revision이 마지막 확인 때와 같으면 탭을 내려받지 않음
+        settings_revision = sheets_manager.get_spreadsheet_revision(sheets_manager.extract_sheet_id(st.session_state.settings_url))
+        success, message, changed_tabs = settings_manager.refresh_changed_tabs(char_manager, settings_revision)
+        if not success:
+            get_manager_registry().invalidate(st.session_state.settings_url)
+            message = "탭 버전 확인에 실패하여 전체 설정을 다시 불러옵니다."
+        st.toast(message)
+    else:
+        # 연결에 실패한 상태라면 캐시를 삭제하고 전체를 다시 생성
+        get_manager_registry().invalidate(st.session_state.settings_url)
+        st.toast("최신 설정과 캐릭터 목록을 다시 불러옵니다.")
     st.rerun()
     
+# [신규] 에셋 존재 여부 검사: 폴더가 지정되면 생성된 포트레이트/사운드 경로를 색인에서 확인합니다.
+with st.sidebar.expander("🗂️ 에셋 검사", expanded=False):
+    asset_dirs = sheet_config.get_asset_dirs()
+    portrait_dir = st.text_input("포트레이트 폴더", value=asset_dirs["portrait"], help="포트레이트 경로(예: avin/avin_Angry.rux)의 기준 폴더. 비워두면 검사하지 않습니다.")
+    sound_dir = st.text_input("사운드 폴더", value=asset_dirs["sound"], help="사운드 경로(사운드 주소 + 사운드 파일)의 기준 폴더. 확장자는 생략해도 됩니다.")
+    if (portrait_dir, sound_dir) != (asset_dirs["portrait"], asset_dirs["sound"]):
+        sheet_config.save_asset_dirs(portrait_dir, sound_dir)
+    manifests = []
+    for label, folder in (("포트레이트", portrait_dir), ("사운드", sound_dir)):
+        if folder and not os.path.isdir(folder):
+            st.warning(f"{label} 폴더를 찾을 수 없습니다: {folder}")
+            folder = ""
+        manifests.append(get_asset_manifest(os.path.abspath(folder)) if folder else None)
+    rescan = st.button("🔄 에셋 다시 스캔", disabled=not any(manifests))
+    for label, manifest in zip(("포트레이트", "사운드"), manifests):
+        if manifest is None:
+            continue
+        if rescan:
+            manifest.refresh(force=True)
+        else:
+            manifest.ensure_fresh()  # 마지막 갱신 후 일정 시간이 지났을 때만 바뀐 폴더를 다시 읽음
+        stats = manifest.stats()
+        st.caption(f"{label}: 파일 {stats['files']:,}개 / 폴더 {stats['dirs']:,}개 (마지막 갱신: 다시 읽은 폴더 {stats['scanned_dirs']}개, {stats['seconds'] * 1000:.0f}ms)")
+    asset_manifests = tuple(manifests)
+
 # =======================
 # ===== 탭 생성 =====
 # =======================
@@ -108,7 +443,8 @@ with main_tab:
     # 세션 초기화 버튼 추가 (여기에 추가)
     if st.button("🔄 세션 초기화", help="문제 발생 시 클릭"):
         st.session_state.result_df = None
-        st.session_state.sheet_data = None
+        st.session_state.sheet_lease.drop()
+        st.session_state.validation_report = None
         st.rerun()
             
     if not settings_manager:
@@ -117,17 +453,21 @@ with main_tab:
         st.subheader("1단계: 변환할 시나리오 시트 연결")
         url_input = st.text_input("시나리오 시트의 URL을 입력하세요", st.session_state.current_url)
         if st.button("시트 목록 불러오기", type="primary"):
+            set_api_action("시트 목록 불러오기")
             if url_input:
                 with st.spinner("시트 목록을 가져오는 중..."):
                     st.session_state.current_url = url_input
                     st.session_state.sheet_names = []
                     st.session_state.selected_sheet = None
-                    st.session_state.sheet_data = None
+                    st.session_state.sheet_lease.drop(); sheet_data = None
                     st.session_state.result_df = None
+                    st.session_state.validation_report = None
                     success, message, names = sheets_manager.get_sheet_names(url_input)
                     if success:
                         st.success(message)
                         st.session_state.sheet_names = names
+                        prefetch_sheets(url_input, names)  # [신규] 최근에 사용한 시트부터 미리 읽기
+                        get_manifest_service().refresh(url_input, sheet_config.get_header_mapping(url_input))  # [신규] 워크북 색인
                     else:
                         st.error(message)
             else:
@@ -135,33 +475,111 @@ with main_tab:
 
         if st.session_state.sheet_names:
             st.subheader("2단계: 변환할 시트 선택")
-            selected_sheet = st.selectbox("목록에서 시트를 선택하세요.", options=[""] + st.session_state.sheet_names, index=0, key="sheet_selector")
-            if selected_sheet and selected_sheet != st.session_state.selected_sheet:
+            # [신규] 대용량 시트는 불러오기 없이 창 단위로 읽으면서 바로 변환 (씬 선택 없이 시트 전체)
+            stream_mode = st.checkbox("🌊 스트리밍 변환 (대용량 시트)", key="stream_mode",
+                                      help=f"시트를 먼저 불러오지 않고 {STREAM_WINDOW_ROWS}행씩 읽는 대로 시트 전체를 변환합니다. 첫 결과가 빨리 나오고 메모리 사용량이 일정합니다.")
+            render_manifest_search(st.session_state.current_url)
+            # [신규] 워크북 색인이 있으면 시트마다 씬 수/행 수를 함께 표시 (시트를 열지 않고)
+            manifest = get_manifest_service().get(st.session_state.current_url)
+            selected_sheet = st.selectbox("목록에서 시트를 선택하세요.", options=[""] + st.session_state.sheet_names, index=0, key="sheet_selector",
+                                          format_func=lambda name: manifest.label(name) if manifest and name else name)
+            if stream_mode:
+                if selected_sheet and st.button("🌊 시트 전체 스트리밍 변환", type="primary"):
+                    set_api_action("스트리밍 변환")
+                    st.session_state.selected_sheet = selected_sheet
+                    st.session_state.sheet_lease.drop(); sheet_data = None
+                    st.session_state.validation_report = None
+                    st.session_state.result_df = None
+                    stream_convert_sheet(st.session_state.current_url, selected_sheet)
+            elif selected_sheet and selected_sheet != st.session_state.selected_sheet:
                 st.session_state.selected_sheet = selected_sheet
+                set_api_action("시트 선택")
                 st.session_state.result_df = None  # 시트 변경 시 결과 초기화
+                st.session_state.validation_report = None
                 with st.spinner(f"'{selected_sheet}' 시트 데이터를 불러오는 중..."):
-                    success, message, df = sheets_manager.read_sheet_data(st.session_state.current_url, selected_sheet)
+                    success, message, df = load_shared_sheet(st.session_state.current_url, selected_sheet)
                     if success:
-                        st.success(message); st.session_state.sheet_data = df
+                        sheet_config.save_last_access(st.session_state.current_url, selected_sheet)
+                        st.success(message); sheet_data = df
                         if '씬 번호' in df.columns:
-                            scenes = df['씬 번호'].replace(r'^\s*$', pd.NA, regex=True).dropna()
-                            unique_scenes = pd.to_numeric(scenes, errors='coerce').dropna().astype(int).unique(); unique_scenes.sort()
+                            unique_scenes = scene_numbers(df).dropna().astype(int).unique(); unique_scenes.sort()
                             st.session_state.scene_numbers = unique_scenes
                         else:
                             st.warning("'씬 번호' 컬럼을 찾을 수 없습니다."); st.session_state.scene_numbers = []
                         st.session_state.result_df = None
+                        # [신규] 다음 시트 미리 읽기 (방금 읽은 시트 키의 revision 재사용)
+                        revision = st.session_state.sheet_lease.key[2]
+                        prefetch_sheets(st.session_state.current_url, st.session_state.sheet_names, selected_sheet, revision)
+                        # [신규] 방금 읽은 데이터로 색인의 이 시트 항목을 갱신하고, revision이 바뀌었으면 나머지 시트도 갱신
+                        if not str(revision).startswith("local-"):
+                            column_mapping = sheet_config.get_header_mapping(st.session_state.current_url)
+                            get_manifest_service().record_sheet(st.session_state.current_url, selected_sheet, revision, df, column_mapping)
+                            get_manifest_service().refresh(st.session_state.current_url, column_mapping, revision)
                     else:
-                        st.error(message); st.session_state.sheet_data = None; st.session_state.scene_numbers = []
+                        st.error(message); st.session_state.sheet_lease.drop(); sheet_data = None; st.session_state.scene_numbers = []
         
-        if st.session_state.sheet_data is not None and len(st.session_state.scene_numbers) > 0:
+        if sheet_data is not None and len(st.session_state.scene_numbers) > 0:
             st.subheader("3단계: 변환할 씬(Scene) 선택")
+            # [신규] 찾기에서 고른 씬이 있으면 시트를 읽은 뒤 바로 선택
+            if st.session_state.pending_scene is not None:
+                if st.session_state.pending_scene in list(st.session_state.scene_numbers):
+                    st.session_state.scene_selector = st.session_state.pending_scene
+                st.session_state.pending_scene = None
             selected_scene = st.selectbox("변환할 씬 번호를 선택하세요.", options=st.session_state.scene_numbers, key="scene_selector")
             if selected_scene:
-                scene_df = st.session_state.sheet_data[pd.to_numeric(st.session_state.sheet_data['씬 번호'], errors='coerce') == selected_scene].copy()
+                # 불리언 인덱싱 결과는 이미 새 DataFrame이므로 별도 복사하지 않음
+                scene_df = sheet_data[scene_mask(sheet_data, selected_scene)]
                 with st.expander(f"씬 {selected_scene} 데이터 미리보기 ({len(scene_df)} 행)", expanded=False): 
                     st.dataframe(scene_df)
                 
-                if st.button("🚀 변환 실행", type="primary", use_container_width=True):
+                # [신규] 다국어 변환: 선택한 언어별 대사 컬럼도 같은 패스에서 변환 (캐릭터/경로/STRING_ID 계산은 공유)
+                required = set(converter.get_required_columns())
+                locale_options = [col for col in sheet_data.attrs.get('all_columns', []) if col not in required]
+                if 'locale_selector' not in st.session_state:
+                    st.session_state.locale_selector = [col for col in st.session_state.locale_columns if col in locale_options]
+                locale_columns = st.multiselect("🌐 함께 변환할 언어별 대사 컬럼", options=list(dict.fromkeys(locale_options)), key="locale_selector",
+                                                help="선택한 컬럼마다 '#대사' 줄만 바꾼 스크립트를 한 번에 만듭니다.")
+                if locale_columns != st.session_state.locale_columns:
+                    st.session_state.locale_columns = locale_columns
+                    if any(column not in sheet_data.columns for column in locale_columns):
+                        # 언어 컬럼은 읽을 때 제외되었으므로 해당 컬럼을 포함해 다시 읽음 (같은 구성은 세션 간 공유)
+                        success, message, df = load_shared_sheet(st.session_state.current_url, st.session_state.selected_sheet)
+                        if success:
+                            sheet_data = df
+                            scene_df = sheet_data[scene_mask(sheet_data, selected_scene)]
+                        else:
+                            st.error(message)
+
+                # [신규] 디버그 모드에서만 표시: 켜면 다음 변환 한 번을 샘플링 프로파일러로 측정 (끄면 프로파일러를 만들지 않음)
+                profile_run = debug_mode and st.checkbox("🔬 다음 변환 프로파일링", key="profile_next",
+                                                         help="시트 읽기 → 변환 → 결과 조립을 캐시 없이 실행하며 호출 스택을 샘플링합니다.")
+                action_cols = st.columns([3, 1])
+                if action_cols[1].button("🔍 시트 전체 검증", use_container_width=True):
+                    sheet_data, absent_columns = ensure_required_columns(sheet_data)
+                    if absent_columns:
+                        st.warning(f"지시문 템플릿이 사용하는 컬럼이 시트에 없습니다: {', '.join(absent_columns)} (placeholder가 그대로 남습니다)")
+                    report = converter.validate_scene_data(sheet_data, conversion_snapshot())
+                    report["scope"] = f"'{st.session_state.selected_sheet}' 시트 전체"
+                    st.session_state.validation_report = report
+
+                if action_cols[0].button("🚀 변환 실행", type="primary", use_container_width=True):
+                    set_api_action("변환 실행")
+                    # [신규] 시트를 읽은 뒤 추가/수정된 지시문 템플릿의 컬럼이 빠져 있으면 다시 읽음
+                    sheet_data, absent_columns = ensure_required_columns(sheet_data)
+                    scene_df = sheet_data[scene_mask(sheet_data, selected_scene)]
+                    if absent_columns:
+                        st.warning(f"지시문 템플릿이 사용하는 컬럼이 시트에 없습니다: {', '.join(absent_columns)} (placeholder가 그대로 남습니다)")
+                    # [신규] 변환 전 검증 (검증과 변환은 같은 스냅샷 사용)
+                    snapshot = conversion_snapshot()
+                    report = converter.validate_scene_data(scene_df, snapshot)
+                    report["scope"] = f"씬 {selected_scene}"
+                    st.session_state.validation_report = report
+                    add_debug_log("변환 전 검증", {
+                        "오류수": report["error_count"],
+                        "경고수": report["warning_count"],
+                        "미등록캐릭터": report["unregistered_characters"]
+                    })
+
                     # 디버그 로그
                     add_debug_log(f"변환 시작 - 씬 {selected_scene}", {
                         "씬번호": selected_scene,
@@ -169,70 +587,85 @@ with main_tab:
                         "기존결과유무": st.session_state.result_df is not None
                     })
                     
-                    with st.spinner(f"씬 {selected_scene} 변환 중..."):
-                        conversion_results = converter.convert_scene_data(scene_df)
+                    profiler = SamplingProfiler() if profile_run else None
+                    with st.spinner(f"씬 {selected_scene} 변환 중..."), profiler or nullcontext():
+                        # [신규] 같은 revision/설정으로 다른 세션이 이미 변환한 씬이면 결과를 재사용
+                        sheet_id, sheet_name, revision, read_options = st.session_state.sheet_lease.key
+                        if str(revision).startswith("local-"):
+                            revision = None  # revision을 알 수 없는 데이터는 캐시하지 않음
+                        if profiler is not None:
+                            # [신규] 프로파일링: 공유 데이터/변환 캐시 대신 시트를 다시 읽고 직접 변환하여 전체 경로를 측정
+                            url = st.session_state.current_url
+                            success, message, fresh_df = sheets_manager.read_sheet_data(
+                                url, sheet_name, sheet_config.get_header_mapping(url), sheet_columns())
+                            if success:
+                                scene_df = fresh_df[scene_mask(fresh_df, selected_scene)]
+                            conversion_results, from_cache = converter.convert_scene_data(scene_df, snapshot), False
+                        elif locale_columns:
+                            # [신규] 다국어 변환은 한 번의 패스로 모든 언어 결과를 만듦 (변환 캐시는 기본 언어 결과만 보관하므로 사용하지 않음)
+                            results_by_locale = converter.convert_scene_locales(scene_df, ["대사"] + locale_columns, snapshot)
+                            conversion_results, from_cache = results_by_locale.pop("대사"), False
+                        else:
+                            conversion_results, from_cache = convert_scene_cached(
+                                converter, scene_df, sheet_id, sheet_name, selected_scene, revision, read_options, snapshot
+                            )
+                        if from_cache:
+                            st.toast("같은 버전의 변환 결과를 재사용했습니다.")
                         
                         # 변환 결과 로깅
                         add_debug_log("변환 완료", {
                             "결과개수": len(conversion_results),
+                            "캐시사용": from_cache,
                             "첫번째결과": conversion_results[0] if conversion_results else None
                         })
                         
-                        scene_df['상태'] = [res['status'] for res in conversion_results]
-                        scene_df['결과 메시지'] = [res['message'] for res in conversion_results]
-                        scene_df['변환 스크립트'] = [res['result'] for res in conversion_results]
+                        # [수정] 씬 전체 복사본 대신, 결과 표시에 필요한 컬럼만 담은 작은 DataFrame을 세션에 저장
+                        result_df = build_result_df(scene_df, conversion_results)
+                        st.session_state.locale_scripts = None
+                        if locale_columns and profiler is None:
+                            st.session_state.locale_scripts = {
+                                column: {
+                                    "script": "\n\n".join(res['result'] for res in results if res['status'] in ('success', 'warning')),
+                                    "missing": sum(1 for res in results if res.get('missing_translation')),
+                                }
+                                for column, results in results_by_locale.items()
+                            }
                         
                         # 세션 저장 전 로깅
                         add_debug_log("세션 저장 전", {
-                            "변환스크립트샘플": scene_df['변환 스크립트'].iloc[0] if len(scene_df) > 0 else None
+                            "변환스크립트샘플": result_df['변환 스크립트'].iloc[0] if len(result_df) > 0 else None
                         })
                         
-                        st.session_state.result_df = scene_df
+                        st.session_state.result_df = result_df
+                        st.session_state.result_revision = st.session_state.sheet_lease.key[2]  # 결과의 행 번호를 얻은 시트 데이터의 revision
                         
                         # 세션 저장 후 확인
                         add_debug_log("세션 저장 후", {
                             "저장된행수": len(st.session_state.result_df),
                             "저장된스크립트샘플": st.session_state.result_df['변환 스크립트'].iloc[0] if len(st.session_state.result_df) > 0 else None
                         })
+                    if profiler is not None:
+                        st.session_state.profile_result = {
+                            "scope": f"'{st.session_state.selected_sheet}' 씬 {selected_scene} ({len(conversion_results)}개 행)",
+                            "seconds": profiler.elapsed,
+                            "samples": profiler.samples,
+                            "top": profiler.top_functions(),
+                            "folded": profiler.folded(),
+                        }
 
-    # --- 4단계: 결과 확인 ---
-    if st.session_state.result_df is not None:
+    # --- [신규] 변환 전 검증 결과 ---
+    report = st.session_state.validation_report
+    if report is not None and settings_manager:
         st.markdown("---")
-        st.subheader("✅ 변환 결과 리포트")
-        result_df = st.session_state.result_df
-        status_counts = result_df['상태'].value_counts()
-        success_count = status_counts.get('success', 0)
-        warning_count = status_counts.get('warning', 0)
-        error_count = status_counts.get('error', 0)
-        st.info(f"총 {len(result_df)}개 행 변환 완료: ✅ 성공: {success_count}개 | ⚠️ 경고: {warning_count}개 | ❌ 오류: {error_count}개")
-
-        # [신규] 오류/경고 필터링 UI
-        filter_errors = st.checkbox("오류/경고가 있는 행만 보기")
-        
-        display_df = result_df.copy()
-        if filter_errors:
-            display_df = display_df[display_df['상태'].isin(['error', 'warning'])]
+        st.subheader("🔍 변환 전 검증 리포트")
+        render_validation_report(report, report.get("scope", "검증 결과"))
 
-        # KeyError 방지를 위한 컬럼 추가 로직
-        display_columns = ['원본 행 번호', '지시문', '캐릭터', '대사', 'string_id', '상태', '결과 메시지', '변환 스크립트']
-        for col in display_columns:
-            if col not in display_df.columns:
-                display_df[col] = ''
-        
-        status_map = {'success': '✅', 'warning': '⚠️', 'error': '❌'}
-        display_df_final = display_df[display_columns].copy()
-        display_df_final['상태'] = display_df_final['상태'].map(status_map)
-        st.dataframe(display_df_final, use_container_width=True)
-
-        # [신규] 등록되지 않은 캐릭터 일괄 추가 기능
-        unregistered_chars = result_df[result_df['결과 메시지'].str.startswith("미등록 캐릭터:", na=False)]
-        if not unregistered_chars.empty:
-            # 중복 제거된 캐릭터 이름 목록 추출
-            char_names_to_add = unregistered_chars['캐릭터'].unique()
-            
+        # 등록되지 않은 캐릭터 일괄 추가 기능 (검증 리포트 기반)
+        char_names_to_add = report["unregistered_characters"]
+        if char_names_to_add:
             with st.expander("⚠️ 등록되지 않은 캐릭터 일괄 추가", expanded=True):
                 st.warning(f"총 {len(char_names_to_add)}명의 캐릭터가 등록되어 있지 않습니다. 아래에서 정보를 입력하고 한 번에 추가하세요.")
-                
+            
                 with st.form("batch_add_char_form"):
                     new_char_data = []
                     for char_kr in char_names_to_add:
@@ -241,8 +674,9 @@ with main_tab:
                         name_en = cols[0].text_input("Name (영문)", key=f"en_{char_kr}")
                         string_id = cols[1].text_input("String_ID", value=name_en.lower(), key=f"id_{char_kr}")
                         new_char_data.append({"kr": char_kr, "name": name_en, "string_id": string_id})
-                    
+                
                     if st.form_submit_button("✨ 일괄 등록 실행", type="primary"):
+                        set_api_action("캐릭터 일괄 추가")
                         success_count, error_messages = char_manager.add_characters_batch(new_char_data)
                         if success_count > 0:
                             st.success(f"{success_count}명의 캐릭터를 성공적으로 추가했습니다!")
@@ -251,8 +685,48 @@ with main_tab:
                             for msg in error_messages:
                                 st.error(f"- {msg}")
                         st.info("캐릭터 추가 후, [변환 실행] 버튼을 다시 눌러 결과를 갱신하세요.")
+                        st.session_state.validation_report = None
                         st.rerun()
 
+    # --- 4단계: 결과 확인 ---
+    if st.session_state.result_df is not None:
+        st.markdown("---")
+        st.subheader("✅ 변환 결과 리포트")
+        result_df = st.session_state.result_df
+        status_counts = result_df['상태'].value_counts()
+        success_count = status_counts.get('success', 0)
+        warning_count = status_counts.get('warning', 0)
+        error_count = status_counts.get('error', 0)
+        st.info(f"총 {len(result_df)}개 행 변환 완료: ✅ 성공: {success_count}개 | ⚠️ 경고: {warning_count}개 | ❌ 오류: {error_count}개")
+        missing_asset_count = int((result_df['에셋 누락'] > 0).sum()) if '에셋 누락' in result_df.columns else 0
+        if missing_asset_count:
+            st.warning(f"🗂️ 포트레이트/사운드 파일이 없는 행: {missing_asset_count}개 (결과 메시지 참고)")
+
+        # [신규] 오류/경고 필터링 UI
+        filter_errors = st.checkbox("오류/경고가 있는 행만 보기")
+        
+        # [수정] result_df는 표시용 컬럼을 모두 갖고 있으므로, 필터링/상태 아이콘 변환 외에는 복사하지 않음
+        display_df = result_df
+        if filter_errors:
+            display_df = display_df[display_df['상태'].isin(['error', 'warning'])]
+        
+        status_map = {'success': '✅', 'warning': '⚠️', 'error': '❌'}
+        display_df_final = display_df.assign(상태=display_df['상태'].map(status_map))
+        st.dataframe(display_df_final, use_container_width=True)
+
+        # [신규] 행별 변환 상태/메시지를 시나리오 시트에 한 번의 일괄 요청으로 기록 (작가가 시트에서 바로 확인)
+        if st.button("📝 시트에 변환 상태 기록", help=f"각 행의 상태와 결과 메시지를 '{STATUS_COLUMN}', '{MESSAGE_COLUMN}' 컬럼에 기록합니다 (없으면 헤더 끝에 추가). 변환 후 시트가 수정되었으면 행 위치가 바뀌었을 수 있으므로 기록하지 않습니다."):
+            set_api_action("변환 상태 기록")
+            status_results = result_df[['상태', '결과 메시지']].rename(columns={'상태': 'status', '결과 메시지': 'message'}).to_dict('records')
+            with st.spinner("시트에 변환 상태를 기록하는 중..."):
+                success, message, _ = sheets_manager.write_conversion_status(
+                    st.session_state.current_url, st.session_state.selected_sheet, result_df['원본 행 번호'].tolist(), status_results,
+                    st.session_state.result_revision)
+            if success:
+                st.success(message)
+            else:
+                st.error(message)
+
         st.write("#### ✨ 성공 및 경고 스크립트 모음")
         if st.session_state.result_df is not None:
             successful_scripts = st.session_state.result_df[
@@ -283,16 +757,42 @@ with main_tab:
             else:
                 st.warning("복사할 수 있는 성공적인 스크립트가 없습니다.")
 
+        # [신규] 다국어 변환 결과 (언어별 스크립트)
+        if st.session_state.locale_scripts:
+            st.write("#### 🌐 언어별 스크립트")
+            locale_tabs = st.tabs(list(st.session_state.locale_scripts))
+            for tab, (column, locale) in zip(locale_tabs, st.session_state.locale_scripts.items()):
+                with tab:
+                    if locale["missing"]:
+                        st.warning(f"'{column}' 번역이 비어 있는 대사 행: {locale['missing']}개 (원문 대신 빈 대사로 변환됨)")
+                    st.text_area(f"📋 {column} 스크립트", value=locale["script"], height=300,
+                                 key=f"locale_script_{column}_{len(locale['script'])}")
+                    st.download_button(f"📥 {column} 스크립트 내려받기", locale["script"], file_name=f"{st.session_state.selected_sheet}_{column}.txt",
+                                       mime="text/plain", key=f"locale_download_{column}")
+
+        # [신규] 디버그 모드일 때 마지막 프로파일링 결과 표시
+        profile = st.session_state.profile_result
+        if debug_mode and profile:
+            with st.expander("🔬 변환 프로파일", expanded=True):
+                st.caption(f"{profile['scope']} | {profile['seconds'] * 1000:,.0f}ms, 샘플 {profile['samples']:,}개 (시트 읽기 → 변환 → 결과 조립)")
+                if profile['top']:
+                    st.dataframe(pd.DataFrame(profile['top']).round(1), use_container_width=True, hide_index=True)
+                st.download_button("📥 flamegraph용 프로파일 (folded)", profile['folded'], file_name="conversion_profile.folded",
+                                   mime="text/plain", help="flamegraph.pl, speedscope, inferno 등에서 열 수 있는 folded stack 형식")
+                if st.button("프로파일 닫기"):
+                    st.session_state.profile_result = None
+                    st.rerun()
+
         # 디버그 모드일 때 로그 표시
         if debug_mode and st.session_state.debug_log:
             with st.expander("🐛 디버그 로그", expanded=False):
-                for log in st.session_state.debug_log[-20:]:  # 최근 20개만 표시
+                for log in st.session_state.debug_log:  # 링 버퍼이므로 최근 DEBUG_LOG_LIMIT개만 보관됨
                     st.text(f"[{log['time']}] {log['message']}")
                     if log['data']:
                         st.json(log['data'])
                 
                 if st.button("로그 초기화"):
-                    st.session_state.debug_log = []
+                    st.session_state.debug_log = deque(maxlen=DEBUG_LOG_LIMIT)
                     st.rerun()
 
 
@@ -318,6 +818,7 @@ with char_tab:
             portrait_path = st.text_input("포트레이트 기본 경로 (선택사항)", help="예: avin/avin_")
             
             if st.form_submit_button("추가하기", type="primary"):
+                set_api_action("캐릭터 추가")
                 if name and kr_name and string_id:
                     success, message = char_manager.add_character(name, kr_name, string_id, portrait_path)
                     if success: 
@@ -359,15 +860,11 @@ with char_tab:
             search_term = st.text_input("🔍 캐릭터 검색 (이름 또는 KR)", placeholder="이름으로 검색...", key="char_search")
             
             if search_term:
-                search_term_lower = search_term.lower()
-                # DataFrame에 'name'과 'kr' 컬럼이 있는지 확인 후 검색
-                if 'name' in valid_characters_df.columns and 'kr' in valid_characters_df.columns:
-                    filtered_df = valid_characters_df[
-                        valid_characters_df['name'].str.lower().str.contains(search_term_lower, na=False) | 
-                        valid_characters_df['kr'].str.lower().str.contains(search_term_lower, na=False)
-                    ]
-                else:
-                    filtered_df = valid_characters_df
+                # [수정] 로드 시 만든 색인으로 검색 (일치 항목이 없으면 비슷한 이름을 표시)
+                matched_df, is_suggestion = char_manager.search_characters(search_term)
+                filtered_df = valid_characters_df[valid_characters_df['string_id'].isin(matched_df['string_id'])]
+                if is_suggestion and not filtered_df.empty:
+                    st.caption(f"'{search_term}'와(과) 일치하는 캐릭터가 없어 비슷한 이름의 캐릭터를 표시합니다.")
             else:
                 filtered_df = valid_characters_df
             
@@ -392,6 +889,7 @@ with char_tab:
                             st.rerun()
                             
                         if c3.button("🗑️", key=f"delete_{char_id}_{idx}", help="삭제"):
+                            set_api_action("캐릭터 삭제")
                             success, msg = char_manager.delete_character(char_id)
                             if success:
                                 st.success(msg)
@@ -432,6 +930,7 @@ with char_tab:
                     portrait_path = st.text_input("포트레이트 기본 경로 (선택사항)", help="예: avin/avin_")
                     
                     if st.form_submit_button("추가하기", type="primary"):
+                        set_api_action("캐릭터 추가")
                         if name and kr_name and string_id:
                             success, message = char_manager.add_character(name, kr_name, string_id, portrait_path)
                             if success: 
@@ -459,6 +958,7 @@ with settings_tab:
         exp_df = pd.DataFrame(list(exp_map.items()), columns=['한글 표현', '영문 변환 값'])
         edited_exp_df = st.data_editor(exp_df, num_rows="dynamic", key="exp_editor", use_container_width=True)
         if st.button("🎭 감정 표현 규칙 저장", use_container_width=True):
+            set_api_action("감정 표현 저장")
             if not edited_exp_df.equals(exp_df):
                 new_exp_map = dict(zip(edited_exp_df['한글 표현'], edited_exp_df['영문 변환 값']))
                 success, msg = settings_manager.save_expression_map(new_exp_map)
@@ -485,6 +985,7 @@ with settings_tab:
                 cols[0].text_area("템플릿 내용", value=rule['template'], key=f"tpl_{name}", disabled=True, height=100)
                 is_default = name in default_rules
                 if cols[1].button("🗑️", key=f"del_dir_{name}", help=f"'{name}' 규칙 삭제", disabled=is_default):
+                    set_api_action("지시문 삭제")
                     success, msg = settings_manager.delete_directive_rule(name)
                     if success: st.success(msg); st.rerun()
                     else: st.error(msg)
@@ -501,15 +1002,18 @@ with settings_tab:
                     new_dir_template = st.text_area("변환 템플릿", height=150, help='예: 효과음_재생("0.1", "{{사운드 주소}}{{사운드 파일}}")\n- 줄바꿈은 \\n을 사용하세요.\n- {컬럼명}을 입력하려면 {{컬럼명}}처럼 중괄호를 두 번 사용해야 합니다.')
                 
                 if st.form_submit_button("규칙 추가"):
+                    set_api_action("지시문 추가")
                     success, msg = settings_manager.add_directive_rule(new_dir_name, new_dir_type, new_dir_template)
                     if success: st.success(msg); st.rerun()
                     else: st.error(msg)
             
             # [수정] 템플릿 변수 복사 UI를 st.code를 사용하는 방식으로 변경
             if new_dir_type == 'template':
-                if st.session_state.sheet_data is not None:
+                if sheet_data is not None:
                     st.info("💡 **사용 가능한 템플릿 변수 (클릭하여 복사):**")
-                    valid_columns = [col for col in st.session_state.sheet_data.columns if col and not col.startswith('unnamed:')]
+                    # 변환에 필요한 컬럼만 읽어오므로, 전체 헤더는 attrs에 보관된 목록을 사용
+                    all_columns = sheet_data.attrs.get('all_columns', sheet_data.columns)
+                    valid_columns = [col for col in all_columns if col and not col.startswith('unnamed:')]
                     
                     # 컬럼을 4열로 나누어 표시
                     cols = st.columns(4)
@@ -518,4 +1022,9 @@ with settings_tab:
                             # 각 컬럼명을 st.code로 감싸면 자동으로 복사 버튼이 생김
                             st.code(f"{{{{{col_name}}}}}", language="text")
                 else:
-                    st.warning("템플릿에 사용할 컬럼 목록을 보려면, 먼저 '변환 작업' 탭에서 데이터를 불러와주세요.")
\ No newline at end of file
+                    st.warning("템플릿에 사용할 컬럼 목록을 보려면, 먼저 '변환 작업' 탭에서 데이터를 불러와주세요.")
+
+# [신규] API 호출 집계는 이번 실행의 동작까지 반영되도록 스크립트 마지막에 표시
+if debug_mode:
+    with st.sidebar.expander("📡 API 호출", expanded=False):
+        render_api_panel()
@@ -0,0 +1,86 @@
+from character_index import normalize_name
+
+DEFAULT_EXPRESSION = "Default"
+
+# 표정 조회 결과 종류
+EXACT = "exact"            # 표정 값이 맵의 키와 정확히 일치
+NORMALIZED = "normalized"  # 공백/기호/대소문자를 무시하면 일치 ('슬픔 ' -> '슬픔')
+PREFIX = "prefix"          # 정규화한 값이 가장 긴 키로 시작 ('화남(약간)' -> '화남')
+UNMATCHED = "unmatched"    # 일치하는 키 없음 (Default 사용)
+EMPTY = "empty"            # 표정 값이 비어 있음 (Default 사용, 보고하지 않음)
+
+_TERMINAL = ""  # 트라이 노드에서 키가 끝나는 위치 표시 (정규화한 문자열에는 빈 문자가 없으므로 충돌하지 않음)
+
+
+class ExpressionIndex:
+    """
+    감정 표현 맵 {한글 표현: 영문 변환 값}의 정규화 트라이 색인
+    - 키를 normalize_name으로 정규화해 글자 단위 트라이에 넣고, 조회 시 값의 길이만큼만 따라가며 가장 긴 일치 키를 찾습니다.
+    - 같은 원본 값의 조회 결과는 메모하므로 행이 많아도 고유한 표정 값마다 한 번만 계산합니다.
+    - 정확히 일치하지 않은 조회(정규화/접두어 일치, 일치 없음)는 non_exact_matches()로 확인할 수 있습니다.
+    맵과 함께 설정 스냅샷에 보관되며, 맵이 바뀌면 새 색인을 만듭니다.
+    """
+
+    def __init__(self, expression_map=None):
+        self.expression_map = dict(expression_map or {})
+        self.root = {}
+        for key, value in self.expression_map.items():
+            normalized = normalize_name(key)
+            if not normalized:
+                continue
+            node = self.root
+            for char in normalized:
+                node = node.setdefault(char, {})
+            node.setdefault(_TERMINAL, (key, value))  # 정규화하면 같아지는 키는 먼저 나온 키를 사용
+        self._memo = {}  # {원본 표정 값: (영문 값, 일치한 키, 종류)}
+
+    def __len__(self):
+        return len(self.expression_map)
+
+    def lookup(self, expression):
+        """
+        표정 값에 해당하는 (영문 값, 일치한 키, 종류)를 반환합니다.
+        일치하는 키가 없거나 값이 비어 있으면 영문 값은 DEFAULT_EXPRESSION, 일치한 키는 None입니다.
+        """
+        match = self._memo.get(expression)
+        if match is None:
+            match = self._match(expression)
+            self._memo[expression] = match
+        return match
+
+    def translate(self, expression):
+        """표정 값의 영문 변환 값 (없으면 DEFAULT_EXPRESSION)"""
+        return self.lookup(expression)[0]
+
+    def _match(self, expression):
+        if not isinstance(expression, str) or not expression.strip():
+            return (DEFAULT_EXPRESSION, None, EMPTY)
+        if expression in self.expression_map:
+            return (self.expression_map[expression], expression, EXACT)
+        normalized = normalize_name(expression)
+        node = self.root
+        longest = None
+        for position, char in enumerate(normalized, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if _TERMINAL in node:
+                longest = (node[_TERMINAL], position)
+        if longest is None:
+            return (DEFAULT_EXPRESSION, None, UNMATCHED)
+        (key, value), length = longest
+        return (value, key, NORMALIZED if length == len(normalized) else PREFIX)
+
+    def non_exact_matches(self):
+        """지금까지 조회한 값 중 정확히 일치하지 않은 값 {원본 값: (영문 값, 일치한 키, 종류)}"""
+        return {expression: match for expression, match in list(self._memo.items()) if match[2] not in (EXACT, EMPTY)}
+
+
+def describe_match(expression, match):
+    """정확히 일치하지 않은 표정 조회 결과를 리포트/경고 메시지용 문장으로 만듭니다 (정확히 일치하거나 비어 있으면 None)."""
+    value, key, kind = match
+    if kind == UNMATCHED:
+        return f"표정 '{expression}' 매핑 없음 (Default 사용)"
+    if kind in (NORMALIZED, PREFIX):
+        return f"표정 '{expression}' → '{key}'({value})로 해석"
+    return None
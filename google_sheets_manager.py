@@ -1,31 +1,245 @@
+import numpy as np
 import pandas as pd
 import re
 import os
+import datetime
+import threading
+import time
+import warnings
 import streamlit as st
 import json
 
+from bounded_cache import BoundedCache
+from api_metrics import get_api_metrics, tracked
+
 # 구글 시트 라이브러리 선택적 가져오기
 try:
     import gspread
     from google.oauth2.service_account import Credentials
+    from google.auth.transport.requests import AuthorizedSession
+    from google.auth.credentials import AnonymousCredentials
+    from google.auth.transport.requests import Request as AuthRequest
+    from requests.adapters import HTTPAdapter
     GSPREAD_AVAILABLE = True
 except ImportError:
     GSPREAD_AVAILABLE = False
     gspread = None
     Credentials = None
+    AuthorizedSession = None
+    AnonymousCredentials = None
+    AuthRequest = None
+    HTTPAdapter = object
+
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files/{}"
+GOOGLE_API_PREFIXES = ("https://sheets.googleapis.com", "https://www.googleapis.com")
+HTTP_POOL_SIZE = 16  # [신규] keep-alive 연결 풀 크기 (동시 요청 수)
+TOKEN_REFRESH_MARGIN = 300  # [신규] 액세스 토큰 만료 몇 초 전에 미리 갱신할지
+SPREADSHEET_HANDLE_TTL = 300  # [신규] 사용하지 않은 스프레드시트 핸들(메타데이터)을 보관하는 시간(초)
+STREAM_WINDOW_ROWS = 500  # [신규] 스트리밍 읽기(read_sheet_windows)에서 한 번에 요청하는 데이터 행 수
+WORKBOOK_SCAN_CHUNK = 20  # [신규] 워크북 전체 읽기(read_workbook_columns)에서 batchGet 한 번에 묶는 시트 수
+
+# [신규] 변환 상태 기록(write_conversion_status) 대상 컬럼 이름과 상태 표시 문자열
+STATUS_COLUMN = "변환 상태"
+MESSAGE_COLUMN = "변환 메시지"
+STATUS_LABELS = {"success": "성공", "warning": "경고", "error": "오류"}
+
+# [신규] 고유값 수가 행 수의 이 비율 이하인 컬럼(캐릭터, 지시문, 표정, 사운드 주소, 씬 번호 등)은 범주형으로 저장
+CATEGORY_MAX_RATIO = 0.5
+
+# [신규] 나머지 문자열 컬럼은 결측값이 NaN인 Arrow 기반 문자열로 저장 (pyarrow가 없으면 경고 후 object 유지)
+# pandas 2.3 이상(pandas 3의 기본 str과 같은 타입)은 na_value=np.nan, pandas 2.1~2.2는 같은 의미의 "pyarrow_numpy" 저장 방식을 사용합니다.
+def _arrow_string_dtype():
+    for make_dtype in (lambda: pd.StringDtype("pyarrow", na_value=np.nan), lambda: pd.StringDtype("pyarrow_numpy")):
+        try:
+            return make_dtype()
+        except ImportError as e:
+            warnings.warn(f"pyarrow를 불러올 수 없어 문자열 컬럼을 object로 유지합니다: {e}")
+            return None
+        except (TypeError, ValueError):
+            continue
+    warnings.warn(f"pandas {pd.__version__}는 Arrow 문자열 타입을 지원하지 않아 문자열 컬럼을 object로 유지합니다 (pandas 2.1 이상 필요).")
+    return None
+
+ARROW_STRING_DTYPE = _arrow_string_dtype()
+
+
+def compact_string_columns(df, max_ratio=CATEGORY_MAX_RATIO):
+    """[신규] 반복 값이 많은 문자열 컬럼은 범주형으로, 나머지는 Arrow 문자열로 변환합니다 (제자리 변환)."""
+    for position in range(df.shape[1]):
+        values = df.iloc[:, position]
+        if isinstance(values.dtype, pd.CategoricalDtype) or not (
+                values.dtype == object or pd.api.types.is_string_dtype(values.dtype)):
+            continue
+        if len(values) and values.nunique(dropna=False) <= len(values) * max_ratio:
+            df.isetitem(position, values.astype("category"))
+        elif ARROW_STRING_DTYPE is not None and values.dtype != ARROW_STRING_DTYPE:
+            df.isetitem(position, values.astype(ARROW_STRING_DTYPE))
+    return df
+
+
+def scene_numbers(df):
+    """
+    [신규] '씬 번호' 컬럼을 숫자 Series로 변환합니다 (숫자가 아니면 NaN).
+    범주형이면 고유값(범주)만 변환한 뒤 범주 코드로 펼치므로 행마다 문자열을 파싱하지 않습니다.
+    """
+    column = df['씬 번호']
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        numeric = pd.to_numeric(pd.Series(column.cat.categories.astype(str)), errors='coerce').to_numpy(dtype=float)
+        codes = column.cat.codes.to_numpy()
+        return pd.Series(np.where(codes >= 0, numeric[codes], np.nan), index=df.index)
+    return pd.to_numeric(column, errors='coerce')
+
+
+def scene_mask(df, scene):
+    """[신규] 씬 번호가 scene인 행의 불리언 마스크 (범주형이면 해당 범주 코드 비교만 수행)"""
+    column = df['씬 번호']
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        numeric = pd.to_numeric(pd.Series(column.cat.categories.astype(str)), errors='coerce').to_numpy(dtype=float)
+        return pd.Series(np.isin(column.cat.codes.to_numpy(), np.flatnonzero(numeric == scene)), index=df.index)
+    return pd.to_numeric(column, errors='coerce') == scene
+
+
+def _update_cells_request(sheet_id, start_row, start_col, rows):
+    """[신규] 0부터 시작하는 (행, 열) 위치에 문자열 행 목록을 쓰는 updateCells 요청"""
+    return {"updateCells": {
+        "range": {"sheetId": sheet_id, "startRowIndex": start_row, "endRowIndex": start_row + len(rows),
+                  "startColumnIndex": start_col, "endColumnIndex": start_col + len(rows[0])},
+        "rows": [{"values": [{"userEnteredValue": {"stringValue": value}} for value in row]} for row in rows],
+        "fields": "userEnteredValue",
+    }}
+
+
+class MeteredAdapter(HTTPAdapter):
+    """[신규] 모든 업스트림 요청의 지연 시간, 요청/응답 크기, 상태 코드를 api_metrics에 기록하는 어댑터"""
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        status = None
+        response_bytes = 0
+        try:
+            response = super().send(request, **kwargs)
+            status = response.status_code
+            if kwargs.get("stream"):
+                response_bytes = int(response.headers.get("Content-Length") or 0)
+            else:
+                response_bytes = len(response.content or b"")
+            return response
+        finally:
+            body = request.body or b""
+            get_api_metrics().record(
+                request.method, request.url, status, time.perf_counter() - started,
+                len(body) if isinstance(body, (bytes, str)) else 0, response_bytes,
+            )
+
+
+class RedirectingAdapter(MeteredAdapter):
+    """[신규] 구글 API 요청을 다른 서버(로컬 스텁 서버 등)로 보내는 어댑터"""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        for prefix in GOOGLE_API_PREFIXES:
+            if request.url.startswith(prefix):
+                request.url = self.base_url + request.url[len(prefix):]
+                break
+        return super().send(request, **kwargs)
+
+
+class TokenRefresher:
+    """
+    [신규] 액세스 토큰을 만료 margin초 전에 백그라운드 스레드에서 미리 갱신합니다.
+    요청 경로에서는 항상 유효한 캐시 토큰을 사용하므로 만료 직후 첫 요청이 토큰 갱신을 기다리지 않습니다.
+    """
+
+    def __init__(self, credentials, margin=TOKEN_REFRESH_MARGIN, retry_interval=60):
+        self.credentials = credentials
+        self.margin = margin
+        self.retry_interval = retry_interval
+        self.request = AuthRequest()
+        self.refresh_count = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """토큰을 즉시 갱신합니다."""
+        with self._lock:
+            self.credentials.refresh(self.request)
+            self.refresh_count += 1
+            self.last_error = None
+
+    def seconds_until_refresh(self):
+        expiry = self.credentials.expiry  # google-auth는 naive UTC datetime 사용
+        if not self.credentials.token or expiry is None:
+            return 0
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (expiry - now).total_seconds() - self.margin
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            wait = self.seconds_until_refresh()
+            if wait <= 0:
+                try:
+                    self.refresh()
+                    continue
+                except Exception as e:
+                    self.last_error = str(e)
+                    wait = self.retry_interval
+            self._stop_event.wait(wait)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="token-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+
 
 class GoogleSheetsManager:
     """
     구글 시트 API 관리 클래스 (v2.9 - 최종)
     """
 
-    def __init__(self, service_account_file="service_account_key.json"):
-        # [함수명: __init__]: 변경 없음
+    def __init__(self, service_account_file="service_account_key.json", api_base_url=None):
+        """
+        [수정] api_base_url(또는 환경 변수 SHEETS_API_BASE_URL)이 주어지면
+        실제 구글 API 대신 해당 서버(sheets_stub_server.py 등)에 인증 없이 연결합니다.
+        """
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.service_account_file = os.path.join(base_dir, service_account_file)
+        self.api_base_url = api_base_url or os.environ.get("SHEETS_API_BASE_URL")
         self.gc = None
+        self.credentials = None
+        self.session = None
+        self.token_refresher = None
+        # [신규] 스프레드시트 ID별 핸들 캐시 {"spreadsheet": Spreadsheet, "worksheets": {제목: Worksheet}}
+        self._handles = BoundedCache(max_entries=32, ttl_seconds=SPREADSHEET_HANDLE_TTL)
         self._initialize_client()
 
+    def _authorize(self, credentials):
+        """
+        [수정] 인증 정보로 HTTP 세션과 gspread 클라이언트를 만듭니다. (Drive API 호출에도 같은 세션 사용)
+        세션에는 keep-alive 연결 풀을 연결하고, 서비스 계정 토큰은 만료 전에 백그라운드에서 미리 갱신합니다.
+        모든 요청은 MeteredAdapter를 거쳐 호출 수/지연 시간/크기가 집계됩니다.
+        """
+        self.credentials = credentials
+        self.session = AuthorizedSession(credentials)
+        if self.api_base_url:
+            adapter = RedirectingAdapter(self.api_base_url, pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            for prefix in GOOGLE_API_PREFIXES:
+                self.session.mount(prefix, adapter)
+        else:
+            self.session.mount("https://", MeteredAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE))
+            self.token_refresher = TokenRefresher(credentials)
+            self.token_refresher.refresh()  # 첫 요청 전에 토큰을 받아 둠
+            self.token_refresher.start()
+        self.gc = gspread.Client(auth=credentials, session=self.session)
+
     def _initialize_client(self):
         """
         [수정] 상세 디버깅 로그를 제거하고, 사이드바에 최종 상태만 표시합니다.
@@ -34,13 +248,19 @@ class GoogleSheetsManager:
             st.sidebar.error("라이브러리 없음: `gspread`")
             return False
 
+        # 0. 대체 API 서버(로컬 스텁 서버 등) 지정 시 인증 없이 연결
+        if self.api_base_url:
+            self._authorize(AnonymousCredentials())
+            st.sidebar.info(f"상태: 대체 API 서버 ({self.api_base_url})")
+            return True
+
         try:
             # 1. 웹 배포 환경(Secrets) 우선 시도
             if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
                 creds_json = st.secrets["gcp_service_account"]
                 scope = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
                 credentials = Credentials.from_service_account_info(creds_json, scopes=scope)
-                self.gc = gspread.authorize(credentials)
+                self._authorize(credentials)
                 st.sidebar.success("상태: 웹 배포 환경")
                 return True
         except Exception:
@@ -52,7 +272,7 @@ class GoogleSheetsManager:
             if os.path.exists(self.service_account_file):
                 scope = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
                 credentials = Credentials.from_service_account_file(self.service_account_file, scopes=scope)
-                self.gc = gspread.authorize(credentials)
+                self._authorize(credentials)
                 st.sidebar.success("상태: 로컬 환경")
                 return True
         except Exception:
@@ -77,47 +297,357 @@ class GoogleSheetsManager:
                 return match.group(1)
         return None
 
+    @tracked
+    def get_spreadsheet_revision(self, sheet_id):
+        """
+        [신규] Drive API로 스프레드시트의 revision(version)을 조회합니다.
+        내용이 바뀔 때마다 증가하므로 시트 데이터 캐시 키로 사용합니다. 조회 실패 시 None
+        """
+        if not self.is_available() or not sheet_id:
+            return None
+        try:
+            response = self.session.get(
+                DRIVE_FILES_URL.format(sheet_id),
+                params={"fields": "version,modifiedTime", "supportsAllDrives": "true"},
+            )
+            response.raise_for_status()
+            return response.json().get("version")
+        except Exception:
+            return None
+
+    @tracked
+    def open_spreadsheet(self, sheet_id, refresh=False):
+        """
+        [신규] 스프레드시트 핸들(시트 메타데이터 + 워크시트 객체)을 ID별로 캐시하여 반환합니다.
+        같은 스프레드시트를 반복해서 읽을 때 open_by_key/worksheet의 메타데이터 조회를 생략합니다.
+        """
+        if refresh:
+            self._handles.pop(sheet_id)
+
+        def open_handle():
+            spreadsheet = self.gc.open_by_key(sheet_id)
+            return {"spreadsheet": spreadsheet, "worksheets": {ws.title: ws for ws in spreadsheet.worksheets()}}
+
+        return self._handles.get_or_create(sheet_id, open_handle)
+
+    def get_worksheet(self, sheet_id, sheet_name):
+        """[신규] 캐시된 핸들에서 워크시트를 찾습니다. 없으면 메타데이터를 한 번 다시 조회합니다 (시트 추가/이름 변경 대응)."""
+        worksheet = self.open_spreadsheet(sheet_id)["worksheets"].get(sheet_name)
+        if worksheet is None:
+            worksheet = self.open_spreadsheet(sheet_id, refresh=True)["worksheets"].get(sheet_name)
+        if worksheet is None:
+            raise gspread.exceptions.WorksheetNotFound(sheet_name)
+        return worksheet
+
+    def invalidate_spreadsheet(self, sheet_id):
+        """[신규] 캐시된 스프레드시트 핸들을 버립니다 (읽기 오류 시 다음 요청에서 메타데이터를 다시 조회)."""
+        self._handles.pop(sheet_id)
+
+    @tracked
     def get_sheet_names(self, url):
+        """[수정] 시트 목록은 사용자가 명시적으로 요청하므로 항상 메타데이터를 새로 조회하고 핸들 캐시를 갱신합니다."""
         if not self.is_available():
             return False, "구글 시트 API가 설정되지 않았습니다.", None
         try:
             sheet_id = self.extract_sheet_id(url)
             if not sheet_id:
                 return False, "올바르지 않은 구글 시트 URL입니다.", None
-            spreadsheet = self.gc.open_by_key(sheet_id)
-            worksheets = spreadsheet.worksheets()
-            sheet_names = [ws.title for ws in worksheets]
+            sheet_names = list(self.open_spreadsheet(sheet_id, refresh=True)["worksheets"])
             return True, "시트 목록을 성공적으로 불러왔습니다.", sheet_names
         except Exception as e:
             st.error(f"시트 목록 가져오기 실패: 이 단계에서 오류가 발생했다면, 서비스 계정이 시트에 '편집자'로 공유되었는지, 'Google Drive API'와 'Google Sheets API'가 활성화되었는지 확인하세요.")
             return False, f"시트 목록을 가져오는 중 오류 발생: {e}", None
 
-    def read_sheet_data(self, url, sheet_name):
+    def _map_header(self, header, column_mapping=None):
+        """
+        [신규] 헤더를 정규화(공백 제거, 소문자)하고 컬럼 매핑 {실제컬럼: 역할컬럼}을 적용합니다.
+        매핑된 역할명과 같은 이름의 원래 컬럼은 '(원본)' 접미사를 붙여 충돌을 피합니다.
+        """
+        normalized = [str(col).strip().lower() for col in header]
+        if not column_mapping:
+            return normalized
+        mapped_roles = {column_mapping[col] for col in normalized if col in column_mapping}
+        mapped_header = []
+        for col in normalized:
+            if col in column_mapping:
+                mapped_header.append(column_mapping[col])
+            elif col in mapped_roles:
+                mapped_header.append(f"{col} (원본)")
+            else:
+                mapped_header.append(col)
+        return mapped_header
+
+    def _build_dataframe(self, header, rows, data_start_row, column_mapping=None):
+        """
+        [신규] 헤더와 원시 행 목록으로 DataFrame을 한 번에 생성합니다. 매핑된 역할 컬럼이 없으면 빈 컬럼을 추가합니다.
+        [수정] 문자열 컬럼은 compact_string_columns로 범주형/Arrow 문자열로 저장합니다.
+        """
+        columns = self._map_header(header, column_mapping)
+        df = pd.DataFrame(rows, columns=columns)
+        if column_mapping:
+            for role in dict.fromkeys(column_mapping.values()):
+                if role not in df.columns:
+                    df[role] = ""
+        compact_string_columns(df)
+        df.insert(0, '원본 행 번호', range(data_start_row + 1, data_start_row + 1 + len(df)))
+        return df
+
+    def _column_spans(self, indices):
+        """[신규] 0부터 시작하는 컬럼 인덱스 목록을 연속 구간 [(시작, 끝), ...]으로 묶습니다."""
+        spans = []
+        for index in sorted(indices):
+            if spans and index == spans[-1][1] + 1:
+                spans[-1] = (spans[-1][0], index)
+            else:
+                spans.append((index, index))
+        return spans
+
+    def _span_ranges(self, spans, first_row, last_row=None):
+        """[신규] 컬럼 구간별 A1 범위 목록 (last_row가 없으면 시트 끝까지)"""
+        ranges = []
+        for start, end in spans:
+            end_letter = re.sub(r'\d', '', gspread.utils.rowcol_to_a1(1, end + 1))
+            ranges.append(f"{gspread.utils.rowcol_to_a1(first_row, start + 1)}:{end_letter}{last_row or ''}")
+        return ranges
+
+    def _read_projected_rows(self, worksheet, spans, first_row, last_row=None):
+        """
+        [신규] 컬럼 구간별 A1 범위를 한 번의 batch_get으로 읽고, 행 단위로 다시 이어 붙입니다.
+        [수정] last_row가 주어지면 first_row~last_row 행만 요청합니다 (스트리밍 읽기의 창).
+        """
+        return self._merge_span_values(spans, worksheet.batch_get(self._span_ranges(spans, first_row, last_row)))
+
+    def _merge_span_values(self, spans, value_ranges):
+        """[신규] 컬럼 구간별로 받은 값 목록을 행 단위로 이어 붙입니다 (짧은 행은 빈 문자열로 채움)."""
+        row_count = max((len(values) for values in value_ranges), default=0)
+        rows = [[] for _ in range(row_count)]
+        for (start, end), values in zip(spans, value_ranges):
+            width = end - start + 1
+            for i, row in enumerate(rows):
+                cells = list(values[i]) if i < len(values) else []
+                row.extend(cells + [""] * (width - len(cells)))
+        return rows
+
+    @tracked
+    def write_conversion_status(self, url, sheet_name, row_numbers, results, revision,
+                                status_column=STATUS_COLUMN, message_column=MESSAGE_COLUMN):
+        """
+        [신규] 변환 결과(convert_scene_data 반환값)의 상태와 메시지를 시나리오 시트의 상태/메시지 컬럼에 기록합니다.
+        row_numbers는 results와 같은 순서의 '원본 행 번호'(시트의 1부터 시작하는 행 번호)입니다.
+        - 헤더(4행)에서 두 컬럼을 찾고, 없으면 헤더 오른쪽 끝에 추가합니다 (열이 부족하면 열도 함께 추가).
+        - 연속된 행은 하나의 범위로 묶고, 두 컬럼이 붙어 있으면 한 범위에 함께 써서 모든 쓰기를 batchUpdate 한 번으로 보냅니다.
+        - 결과가 없는 행(다른 씬 등)은 건드리지 않습니다.
+        - revision은 row_numbers를 얻은 시트 데이터의 revision입니다. 보내기 직전에 현재 revision과 비교해
+          다르거나 확인할 수 없으면 (그 사이 행이 추가/삭제되었을 수 있으므로) 기록하지 않습니다.
+        """
         if not self.is_available():
             return False, "구글 시트 API가 설정되지 않았습니다.", None
+        sheet_id = self.extract_sheet_id(url)
+        if not sheet_id:
+            return False, "올바르지 않은 구글 시트 URL입니다.", None
+        cells_by_row = {}
+        for row_number, result in zip(row_numbers, results):
+            if pd.notna(row_number):
+                cells_by_row[int(row_number)] = [STATUS_LABELS.get(result['status'], str(result['status'])), str(result['message'])]
+        if not cells_by_row:
+            return False, "기록할 변환 결과가 없습니다.", None
+        try:
+            worksheet = self.get_worksheet(sheet_id, sheet_name)
+            header_row_index = 3
+            header = worksheet.row_values(header_row_index + 1)
+            normalized = [str(col).strip().lower() for col in header]
+            requests = []
+            new_header_cells = {}
+            positions = []
+            for name in (status_column, message_column):
+                key = name.strip().lower()
+                if key in normalized:
+                    positions.append(normalized.index(key))
+                else:
+                    positions.append(len(normalized) + len(new_header_cells))
+                    new_header_cells[positions[-1]] = name
+            needed_columns = max(positions) + 1
+            if needed_columns > worksheet.col_count:
+                requests.append({"appendDimension": {"sheetId": worksheet.id, "dimension": "COLUMNS",
+                                                     "length": needed_columns - worksheet.col_count}})
+            for start, end in self._column_spans(new_header_cells):
+                requests.append(_update_cells_request(worksheet.id, header_row_index, start,
+                                                      [[new_header_cells[col] for col in range(start, end + 1)]]))
+
+            status_col, message_col = positions
+            for start, end in self._column_spans(cells_by_row):
+                rows = [cells_by_row[row_number] for row_number in range(start, end + 1)]
+                if message_col == status_col + 1:
+                    requests.append(_update_cells_request(worksheet.id, start - 1, status_col, rows))
+                else:
+                    requests.append(_update_cells_request(worksheet.id, start - 1, status_col, [row[:1] for row in rows]))
+                    requests.append(_update_cells_request(worksheet.id, start - 1, message_col, [row[1:] for row in rows]))
+            current_revision = self.get_spreadsheet_revision(sheet_id)
+            if revision is None or current_revision is None or str(current_revision) != str(revision):
+                return False, (f"변환에 사용한 시트 데이터(revision {revision})가 현재 시트(revision {current_revision})와 달라 기록하지 않았습니다. "
+                               "행 위치가 바뀌었을 수 있으니 시트를 다시 불러와 변환한 뒤 기록하세요."), None
+            self.open_spreadsheet(sheet_id)["spreadsheet"].batch_update({"requests": requests})
+            if needed_columns > worksheet.col_count:
+                self.invalidate_spreadsheet(sheet_id)  # 열 수가 바뀌었으므로 다음 요청에서 메타데이터를 다시 조회
+            ranges = sum(1 for request in requests if "updateCells" in request)
+            return True, f"'{sheet_name}' 시트에 {len(cells_by_row)}개 행의 변환 상태를 기록했습니다. (범위 {ranges}개, 요청 1회)", {
+                "rows": len(cells_by_row), "ranges": ranges, "added_columns": list(new_header_cells.values()),
+            }
+        except Exception as e:
+            if not isinstance(e, gspread.exceptions.WorksheetNotFound):
+                self.invalidate_spreadsheet(sheet_id)
+            return False, f"변환 상태를 기록하는 중 오류 발생: {e}", None
+
+    @tracked
+    def read_sheet_window(self, worksheet, spans, first_row, last_row):
+        """[신규] 스트리밍 읽기의 창 하나(first_row~last_row 행)를 읽습니다. API 호출이 이 메서드로 집계되도록 분리했습니다."""
+        return self._read_projected_rows(worksheet, spans, first_row, last_row)
+
+    @tracked
+    def read_workbook_columns(self, url, columns, column_mapping=None, sheet_names=None, chunk_size=WORKBOOK_SCAN_CHUNK):
+        """
+        [신규] 여러 시트의 지정 컬럼만 시트별 호출 없이 읽습니다 (워크북 색인용).
+        시트 chunk_size개마다 헤더 행 batchGet 한 번 + 필요한 컬럼 범위 batchGet 한 번을 보냅니다.
+        반환 데이터: {시트 이름: DataFrame(read_sheet_data와 같은 형식) 또는 None(필요한 컬럼이 하나도 없는 시트)}
+        """
+        if not self.is_available():
+            return False, "구글 시트 API가 설정되지 않았습니다.", None
+        sheet_id = self.extract_sheet_id(url)
+        if not sheet_id:
+            return False, "올바르지 않은 구글 시트 URL입니다.", None
+        try:
+            handle = self.open_spreadsheet(sheet_id)
+            spreadsheet = handle["spreadsheet"]
+            names = list(sheet_names) if sheet_names is not None else list(handle["worksheets"])
+            header_row_index = 3
+            data_start_row = 4
+            wanted = set(columns)
+            frames = {}
+            for offset in range(0, len(names), chunk_size):
+                chunk = names[offset:offset + chunk_size]
+                header_ranges = [gspread.utils.absolute_range_name(name, f"{header_row_index + 1}:{header_row_index + 1}") for name in chunk]
+                headers = spreadsheet.values_batch_get(header_ranges).get("valueRanges", [])
+                plans = []
+                data_ranges = []
+                for name, value_range in zip(chunk, headers):
+                    header = (value_range.get("values") or [[]])[0]
+                    indices = [i for i, col in enumerate(self._map_header(header, column_mapping)) if col in wanted]
+                    if not indices:
+                        frames[name] = None
+                        continue
+                    spans = self._column_spans(indices)
+                    plans.append((name, [header[i] for i in indices], spans, len(data_ranges)))
+                    data_ranges.extend(gspread.utils.absolute_range_name(name, cells)
+                                       for cells in self._span_ranges(spans, data_start_row + 1))
+                if not data_ranges:
+                    continue
+                value_ranges = spreadsheet.values_batch_get(data_ranges).get("valueRanges", [])
+                for name, header, spans, first in plans:
+                    values = [value_range.get("values", []) for value_range in value_ranges[first:first + len(spans)]]
+                    frames[name] = self._build_dataframe(header, self._merge_span_values(spans, values), data_start_row, column_mapping)
+            return True, f"시트 {len(names)}개의 컬럼 {len(wanted)}개를 읽었습니다.", frames
+        except Exception as e:
+            self.invalidate_spreadsheet(sheet_id)
+            return False, f"워크북을 읽는 중 오류 발생: {e}", None
+
+    @tracked
+    def read_sheet_windows(self, url, sheet_name, column_mapping=None, columns=None, window_rows=STREAM_WINDOW_ROWS):
+        """
+        [신규] 대용량 시트용 스트리밍 읽기: 헤더 행만 먼저 읽고, 데이터는 window_rows행씩 나눈 A1 범위로 차례로 요청합니다.
+        반환 데이터는 창마다 DataFrame(read_sheet_data와 같은 형식, '원본 행 번호' 포함)을 하나씩 내주는 제너레이터이므로
+        첫 창을 받자마자 변환을 시작할 수 있고, 시트 전체를 원시 값 목록과 DataFrame으로 이중으로 들고 있지 않습니다.
+        시트 그리드 끝(마지막 창은 끝을 열어 두고 요청)에 도달하면 끝나며, 중간의 완전히 빈 창은 건너뛰고 계속 읽습니다 (read_sheet_data와 같은 행).
+        창을 읽다가 실패하면 제너레이터에서 예외가 발생합니다.
+        """
+        if not self.is_available():
+            return False, "구글 시트 API가 설정되지 않았습니다.", None
+        sheet_id = self.extract_sheet_id(url)
         try:
-            sheet_id = self.extract_sheet_id(url)
             if not sheet_id:
                 return False, "올바르지 않은 구글 시트 URL입니다.", None
+            worksheet = self.get_worksheet(sheet_id, sheet_name)
+            header_row_index = 3
+            data_start_row = 4
+            header = worksheet.row_values(header_row_index + 1)
+            all_columns = self._map_header(header, column_mapping)
+            if columns:
+                wanted = set(columns)
+                indices = [i for i, col in enumerate(all_columns) if col in wanted]
+            else:
+                indices = list(range(len(header)))
+            if not indices:
+                return False, "시트 헤더(4행)에서 변환에 필요한 컬럼을 찾을 수 없습니다.", None
+        except Exception as e:
+            if sheet_id and not isinstance(e, gspread.exceptions.WorksheetNotFound):
+                self.invalidate_spreadsheet(sheet_id)
+            return False, f"데이터를 읽어오는 중 오류 발생: {e}", None
 
-            spreadsheet = self.gc.open_by_key(sheet_id)
-            worksheet = spreadsheet.worksheet(sheet_name)
-            data = worksheet.get_all_values()
+        spans = self._column_spans(indices)
+        window_header = [header[i] for i in indices]
+
+        def windows():
+            first_row = data_start_row + 1
+            while True:
+                last_row = first_row + window_rows - 1
+                # 캐시된 그리드 크기는 오래됐을 수 있으므로 마지막 창은 끝을 열어 두고 요청
+                final = last_row >= worksheet.row_count
+                rows = self.read_sheet_window(worksheet, spans, first_row, None if final else last_row)
+                if rows:
+                    df = self._build_dataframe(window_header, rows, first_row - 1, column_mapping)
+                    df.dropna(how='all', inplace=True)
+                    df.attrs['all_columns'] = all_columns
+                    yield df
+                if final:
+                    return
+                first_row = last_row + 1
+
+        total_rows = max(0, worksheet.row_count - data_start_row)
+        return True, f"'{sheet_name}' 시트를 {window_rows}행씩 나눠 읽습니다. (그리드 최대 {total_rows}행, 컬럼 {len(indices)}/{len(all_columns)}개)", windows()
+
+    @tracked
+    def read_sheet_data(self, url, sheet_name, column_mapping=None, columns=None):
+        """
+        [수정] 시트 데이터를 읽어 DataFrame으로 반환합니다.
+        column_mapping({정규화된 실제컬럼: 역할컬럼}, SheetConfigManager.get_header_mapping 참고)이 주어지면
+        파싱 단계에서 헤더에 바로 적용합니다.
+        columns(ConverterLogic.get_required_columns 참고)가 주어지면 헤더 행을 먼저 읽고 해당 컬럼 범위만 가져옵니다.
+        전체 헤더는 df.attrs['all_columns']에 보관됩니다.
+        """
+        if not self.is_available():
+            return False, "구글 시트 API가 설정되지 않았습니다.", None
+        sheet_id = self.extract_sheet_id(url)
+        try:
+            if not sheet_id:
+                return False, "올바르지 않은 구글 시트 URL입니다.", None
+
+            worksheet = self.get_worksheet(sheet_id, sheet_name)
             
             header_row_index = 3
             data_start_row = 4
 
-            if not data or len(data) < data_start_row + 1:
-                return False, "시트에 데이터가 부족합니다. (최소 5줄 필요)", None
-            
-            header = data[header_row_index]
-            actual_data = data[data_start_row:]
-            df = pd.DataFrame(actual_data, columns=header)
-            
-            df.columns = [str(col).strip().lower() for col in df.columns]
-            df.insert(0, '원본 행 번호', range(data_start_row + 1, data_start_row + 1 + len(df)))
+            if columns:
+                # [신규] 컬럼 프로젝션: 헤더 행 + 필요한 컬럼 범위만 요청
+                header = worksheet.row_values(header_row_index + 1)
+                all_columns = self._map_header(header, column_mapping)
+                wanted = set(columns)
+                indices = [i for i, col in enumerate(all_columns) if col in wanted]
+                if not indices:
+                    return False, "시트 헤더(4행)에서 변환에 필요한 컬럼을 찾을 수 없습니다.", None
+                rows = self._read_projected_rows(worksheet, self._column_spans(indices), data_start_row + 1)
+                if not rows:
+                    return False, "시트에 데이터가 부족합니다. (최소 5줄 필요)", None
+                df = self._build_dataframe([header[i] for i in indices], rows, data_start_row, column_mapping)
+            else:
+                data = worksheet.get_all_values()
+                if not data or len(data) < data_start_row + 1:
+                    return False, "시트에 데이터가 부족합니다. (최소 5줄 필요)", None
+                all_columns = self._map_header(data[header_row_index], column_mapping)
+                df = self._build_dataframe(data[header_row_index], data[data_start_row:], data_start_row, column_mapping)
 
             df.dropna(how='all', inplace=True)
-            return True, f"'{sheet_name}' 시트에서 {len(df)}개 행을 성공적으로 읽었습니다. (헤더: 4행)", df
+            df.attrs['all_columns'] = all_columns
+            return True, f"'{sheet_name}' 시트에서 {len(df)}개 행을 성공적으로 읽었습니다. (헤더: 4행, 컬럼 {len(df.columns) - 1}/{len(all_columns)}개)", df
         except Exception as e:
-            return False, f"데이터를 읽어오는 중 오류 발생: {e}", None
\ No newline at end of file
+            if sheet_id and not isinstance(e, gspread.exceptions.WorksheetNotFound):
+                self.invalidate_spreadsheet(sheet_id)
+            return False, f"데이터를 읽어오는 중 오류 발생: {e}", None
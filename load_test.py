@@ -0,0 +1,157 @@
+import argparse
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from google_sheets_manager import GoogleSheetsManager
+from manager_registry import build_manager_set
+from scene_watcher import split_scenes
+from sheets_stub_server import SheetsStubServer
+
+OUTPUT_SPREADSHEET_ID = "stub-output"
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))]
+
+
+class LoadTestRunner:
+    """
+    로드 → 변환 → 쓰기 전체 경로의 처리량을 측정합니다.
+    각 반복은 시나리오 시트 하나를 읽고(read_sheet_data), 모든 씬을 변환한 뒤(convert_scene_data),
+    씬별 스크립트를 출력 스프레드시트에 기록합니다.
+    """
+
+    def __init__(self, sheets_manager, converter, scenario_url, output_url, sheet_names):
+        self.sheets_manager = sheets_manager
+        self.converter = converter
+        self.scenario_url = scenario_url
+        self.output_url = output_url
+        self.sheet_names = sheet_names
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def run_iteration(self, iteration):
+        sheet_name = self.sheet_names[iteration % len(self.sheet_names)]
+        timings = {}
+        started = time.perf_counter()
+        success, message, df = self.sheets_manager.read_sheet_data(
+            self.scenario_url, sheet_name, None, self.converter.get_required_columns()
+        )
+        timings["load"] = time.perf_counter() - started
+        if not success:
+            return self._record_error("load", message)
+
+        stage_started = time.perf_counter()
+        output_rows = [["씬 번호", "행 수", "오류 수", "스크립트"]]
+        for scene, scene_df in split_scenes(df).items():
+            results = self.converter.convert_scene_data(scene_df)
+            scripts = [res['result'] for res in results if res['status'] in ('success', 'warning')]
+            errors = sum(1 for res in results if res['status'] == 'error')
+            output_rows.append([str(scene), str(len(results)), str(errors), "\n\n".join(scripts)])
+        timings["convert"] = time.perf_counter() - stage_started
+
+        stage_started = time.perf_counter()
+        try:
+            worksheet = self.sheets_manager.gc.open_by_url(self.output_url).worksheet(sheet_name)
+            worksheet.update(output_rows, "A1")
+        except Exception as e:
+            return self._record_error("write", str(e))
+        timings["write"] = time.perf_counter() - stage_started
+        timings["total"] = time.perf_counter() - started
+
+        with self._lock:
+            for stage, seconds in timings.items():
+                self.timings[stage].append(seconds)
+            self.rows += len(df)
+
+    def _record_error(self, stage, message):
+        with self._lock:
+            self.errors[f"{stage}: {message[:80]}"] += 1
+
+    def run(self, iterations, workers):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self.run_iteration, range(iterations)))
+        elapsed = time.perf_counter() - started
+        completed = len(self.timings["total"])
+        return {
+            "elapsed": elapsed,
+            "completed": completed,
+            "failed": sum(self.errors.values()),
+            "iterations_per_second": completed / elapsed if elapsed else 0.0,
+            "rows_per_second": self.rows / elapsed if elapsed else 0.0,
+            "stages": {
+                stage: {
+                    "p50_ms": percentile(values, 0.5) * 1000,
+                    "p95_ms": percentile(values, 0.95) * 1000,
+                    "max_ms": max(values) * 1000,
+                    "mean_ms": statistics.mean(values) * 1000,
+                }
+                for stage, values in self.timings.items() if values
+            },
+            "errors": dict(self.errors),
+        }
+
+
+def print_report(report, server_stats=None):
+    print(f"\n완료 {report['completed']}회 / 실패 {report['failed']}회, 소요 {report['elapsed']:.2f}초")
+    print(f"처리량: {report['iterations_per_second']:.2f} 시트/초, {report['rows_per_second']:,.0f} 행/초")
+    print(f"{'단계':<10}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}{'평균(ms)':>10}")
+    for stage in ("load", "convert", "write", "total"):
+        if stage in report["stages"]:
+            s = report["stages"][stage]
+            print(f"{stage:<10}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}{s['mean_ms']:>10.1f}")
+    for message, count in report["errors"].items():
+        print(f"  오류 {count}회 - {message}")
+    if server_stats:
+        print("\n스텁 서버 요청 수:")
+        for endpoint, count in sorted(server_stats["counts"].items()):
+            print(f"  {endpoint}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 스텁 서버를 이용한 로드 → 변환 → 쓰기 부하 테스트")
+    parser.add_argument("--iterations", type=int, default=30, help="읽기/변환/쓰기 반복 횟수")
+    parser.add_argument("--workers", type=int, default=4, help="동시 작업 수")
+    parser.add_argument("--sheets", type=int, default=3, help="시나리오 시트 수")
+    parser.add_argument("--rows", type=int, default=2000, help="시트당 데이터 행 수")
+    parser.add_argument("--characters", type=int, default=200, help="캐릭터 수")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="요청당 지연(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="지연 편차(ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 오류 비율")
+    parser.add_argument("--quota-per-minute", type=int, default=None, help="분당 허용 요청 수")
+    args = parser.parse_args()
+
+    server = SheetsStubServer(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, quota_per_minute=args.quota_per_minute,
+    ).start()
+    settings_url, scenario_url = server.add_synthetic_workbooks(args.sheets, args.rows, args.characters)
+    sheet_names = [f"03_{index + 1:02d}" for index in range(args.sheets)]
+    server.add_workbook(OUTPUT_SPREADSHEET_ID, "변환 결과", {name: [] for name in sheet_names})
+
+    try:
+        sheets_manager = GoogleSheetsManager(api_base_url=server.base_url)
+        success, message, managers = build_manager_set(sheets_manager.gc, settings_url)
+        if not success:
+            raise SystemExit(message)
+        runner = LoadTestRunner(sheets_manager, managers[3], scenario_url, server.sheet_url(OUTPUT_SPREADSHEET_ID), sheet_names)
+        print(f"부하 테스트: 시트 {args.sheets}개 x {args.rows}행, {args.iterations}회, 동시 {args.workers}개, "
+              f"지연 {args.latency_ms}±{args.jitter_ms}ms")
+        report = runner.run(args.iterations, args.workers)
+        print_report(report, server.stats())
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from bounded_cache import BoundedCache
+from session_store import estimate_size
+from character_manager import CharacterManager
+from settings_manager import SettingsManager
+from portrait_sound_manager import PortraitSoundManager
+from converter_logic import ConverterLogic
+
+
+def build_manager_set(gspread_client, settings_url):
+    """
+    설정 시트 URL로 (CharacterManager, SettingsManager, PortraitSoundManager, ConverterLogic)을 생성합니다.
+    반환값: (성공 여부, 메시지, 매니저 튜플 또는 None)
+    """
+    if not gspread_client or not settings_url:
+        return False, "구글 API 클라이언트 또는 설정 시트 URL이 없습니다.", None
+    try:
+        char_manager = CharacterManager(gspread_client, settings_url)
+        settings_manager = SettingsManager(gspread_client, settings_url)
+        if not char_manager.is_loaded() or not settings_manager.is_loaded():
+            return False, "설정 시트의 'character' 또는 'settings' 관련 시트를 찾거나 읽는 데 실패했습니다.", None
+        ps_manager = PortraitSoundManager(char_manager, settings_manager.get_expression_map(), settings_manager)
+        converter = ConverterLogic(char_manager, ps_manager, settings_manager)
+        return True, "설정 시트 연결 완료", (char_manager, settings_manager, ps_manager, converter)
+    except Exception as e:
+        return False, f"매니저 초기화 오류: {e}", None
+
+
+def manager_set_size(managers):
+    """매니저 세트가 보유한 설정 데이터(캐릭터 표, 표정 맵, 지시문 규칙)의 대략적인 용량"""
+    char_manager, settings_manager, _, _ = managers
+    return (
+        estimate_size(char_manager.get_characters_dataframe())
+        + estimate_size(settings_manager.get_expression_map())
+        + estimate_size(settings_manager.get_directive_rules())
+    )
+
+
+class ManagerRegistry:
+    """
+    설정 시트 URL별 매니저 세트 레지스트리
+    자주 쓰는 프로젝트는 세션 간에 유지하고, 오래 쓰지 않은 프로젝트는 LRU/TTL/메모리 한도에 따라 해제합니다.
+    생성에 실패한 URL은 failure_ttl초 동안 실패 메시지를 기억해, 그동안은 다시 생성하지 않고 같은 실패를 반환합니다.
+    """
+
+    def __init__(self, max_entries=4, ttl_seconds=3600, max_bytes=256 * 1024 * 1024, failure_ttl=30):
+        self._cache = BoundedCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            size_fn=manager_set_size,
+        )
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._failures = {}  # {설정 시트 URL: (만료 시각, 실패 메시지)}
+
+    def _recent_failure(self, settings_url):
+        """failure_ttl 안에 기록된 생성 실패 메시지 (없으면 None)"""
+        with self._lock:
+            failure = self._failures.get(settings_url)
+            if failure is None:
+                return None
+            if failure[0] <= time.time():
+                del self._failures[settings_url]
+                return None
+            return failure[1]
+
+    def get(self, gspread_client, settings_url):
+        """
+        매니저 세트를 반환합니다. 없으면 생성하며, 같은 URL을 동시에 요청해도 한 번만 생성합니다.
+        최근에 생성에 실패한 URL이면 다시 생성하지 않고 그 실패를 반환합니다.
+        반환값: (성공 여부, 메시지, 매니저 튜플 또는 None)
+        """
+        errors = []  # 이 호출의 생성 실패 메시지 (세션 간에 공유하지 않음)
+
+        def factory():
+            # 생성 잠금을 기다리는 동안 다른 요청이 실패를 기록했으면 다시 생성하지 않음
+            message = self._recent_failure(settings_url)
+            if message is None:
+                success, message, managers = build_manager_set(gspread_client, settings_url)
+                if success:
+                    return managers
+                with self._lock:
+                    self._failures[settings_url] = (time.time() + self.failure_ttl, message)
+            errors.append(message)
+            return None
+
+        message = self._recent_failure(settings_url)
+        if message is not None:
+            return False, message, None
+        managers = self._cache.get_or_create(settings_url, factory)
+        if managers is None:
+            return False, errors[0] if errors else "매니저를 생성하지 못했습니다.", None
+        return True, "설정 시트 연결 완료", managers
+
+    def invalidate(self, settings_url):
+        """해당 URL의 매니저 세트와 기억한 생성 실패를 해제합니다 (다음 요청 시 새로 생성)."""
+        self._cache.pop(settings_url)
+        with self._lock:
+            self._failures.pop(settings_url, None)
+
+    def clear(self):
+        """모든 매니저 세트와 기억한 생성 실패를 해제합니다."""
+        self._cache.clear()
+        with self._lock:
+            self._failures.clear()
+
+    def stats(self):
+        """적중/실패/제거 통계를 반환합니다."""
+        return self._cache.stats()
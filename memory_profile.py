@@ -0,0 +1,170 @@
+import argparse
+import gc
+import json
+import math
+import time
+import tracemalloc
+
+# Arrow 기반 문자열 컬럼은 tracemalloc에 잡히지 않으므로, pyarrow가 있으면 별도로 측정
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from character_manager import CharacterManager
+from settings_manager import SettingsManager
+from portrait_sound_manager import PortraitSoundManager
+from converter_logic import ConverterLogic
+from google_sheets_manager import GoogleSheetsManager
+from scene_watcher import split_scenes
+from synthetic_data import make_scenario_values, make_settings_values
+
+RESULT_COLUMNS = ['원본 행 번호', '지시문', '캐릭터', '대사', 'string_id']
+STAGES = ("read", "scene_filter", "convert", "assemble")
+SUPERLINEAR_SLOPE = 1.15  # log(메모리)/log(행 수) 기울기가 이 값보다 크면 초선형 증가로 표시
+
+
+def build_offline_converter(character_count):
+    """네트워크 없이 합성 설정 값으로 매니저 세트를 만듭니다."""
+    settings_values = make_settings_values(character_count)
+    char_manager = CharacterManager(None, None)
+    char_manager.load_characters(settings_values["character"])
+    settings_manager = SettingsManager(None, None)
+    settings_manager._load_expressions(settings_values["expressions"])
+    settings_manager._load_directives(settings_values["directives"])
+    ps_manager = PortraitSoundManager(char_manager, settings_manager.get_expression_map(), settings_manager)
+    return ConverterLogic(char_manager, ps_manager, settings_manager)
+
+
+class StageProfiler:
+    """tracemalloc 스냅샷으로 단계별 최대 메모리와 할당 위치를 기록합니다."""
+
+    def __init__(self, top=5):
+        self.top = top
+        self.results = {}
+
+    def run(self, stage, func):
+        gc.collect()
+        tracemalloc.reset_peak()
+        before_current, _ = tracemalloc.get_traced_memory()
+        before = tracemalloc.take_snapshot()
+        arrow_before = pyarrow.total_allocated_bytes() if pyarrow else 0
+        started = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        arrow_retained = (pyarrow.total_allocated_bytes() - arrow_before) if pyarrow else 0
+        after = tracemalloc.take_snapshot()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        hotspots = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")[:self.top]
+        self.results[stage] = {
+            "peak_bytes": max(0, peak - before_current),
+            "retained_bytes": current - before_current,
+            "arrow_retained_bytes": arrow_retained,
+            "seconds": elapsed,
+            "hotspots": [
+                (f"{stat.traceback[0].filename.split('/')[-1]}:{stat.traceback[0].lineno}", stat.size_diff)
+                for stat in hotspots if stat.size_diff > 0
+            ],
+        }
+        return value
+
+
+def profile_size(converter, sheets_manager, row_count, top):
+    """한 크기의 합성 시트로 read → scene filter → convert → assemble 경로를 측정합니다."""
+    payload = json.dumps(make_scenario_values(row_count, character_count=200), ensure_ascii=False)
+    profiler = StageProfiler(top)
+
+    def read():
+        data = json.loads(payload)  # gspread 응답 JSON -> 리스트 변환까지 포함
+        return sheets_manager._build_dataframe(data[3], data[4:], 4)
+
+    df = profiler.run("read", read)
+    scenes = profiler.run("scene_filter", lambda: split_scenes(df))
+    results = profiler.run("convert", lambda: {scene: converter.convert_scene_data(scene_df) for scene, scene_df in scenes.items()})
+
+    def assemble():
+        assembled = []
+        for scene, scene_df in scenes.items():
+            scene_results = results[scene]
+            result_df = scene_df.reindex(columns=RESULT_COLUMNS, fill_value='')
+            result_df['상태'] = [res['status'] for res in scene_results]
+            result_df['결과 메시지'] = [res['message'] for res in scene_results]
+            result_df['변환 스크립트'] = [res['result'] for res in scene_results]
+            scripts = result_df.loc[result_df['상태'].isin(['success', 'warning']), '변환 스크립트'].tolist()
+            assembled.append((result_df, "\n\n".join(scripts)))
+        return assembled
+
+    profiler.run("assemble", assemble)
+    return profiler.results
+
+
+def growth_slope(sizes, values):
+    """log-log 최소제곱 기울기 (1이면 선형, 1보다 크면 초선형)"""
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if value > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator if denominator else None
+
+
+def run_suite(sizes, top=5, character_count=200):
+    converter = build_offline_converter(character_count)
+    sheets_manager = GoogleSheetsManager(api_base_url="http://127.0.0.1:9")  # 파싱만 사용 (네트워크 호출 없음)
+    tracemalloc.start(10)
+    try:
+        by_size = {size: profile_size(converter, sheets_manager, size, top) for size in sizes}
+    finally:
+        tracemalloc.stop()
+
+    summary = {}
+    for stage in STAGES:
+        peaks = [by_size[size][stage]["peak_bytes"] for size in sizes]
+        slope = growth_slope(sizes, peaks)
+        summary[stage] = {
+            "bytes_per_row": [peak / size for peak, size in zip(peaks, sizes)],
+            "slope": slope,
+            "superlinear": slope is not None and slope > SUPERLINEAR_SLOPE,
+        }
+    return by_size, summary
+
+
+def print_report(sizes, by_size, summary):
+    for size in sizes:
+        print(f"\n=== {size:,}행 ===")
+        print(f"{'단계':<14}{'최대(KB)':>12}{'유지(KB)':>12}{'Arrow(KB)':>12}{'bytes/행':>12}{'시간(ms)':>10}")
+        for stage in STAGES:
+            r = by_size[size][stage]
+            print(f"{stage:<14}{r['peak_bytes'] / 1024:>12,.1f}{r['retained_bytes'] / 1024:>12,.1f}"
+                  f"{r['arrow_retained_bytes'] / 1024:>12,.1f}{r['peak_bytes'] / size:>12,.0f}{r['seconds'] * 1000:>10,.1f}")
+    largest = sizes[-1]
+    print(f"\n=== 할당 위치 상위 ({largest:,}행, 단계 종료 시점에 남은 메모리 기준) ===")
+    for stage in STAGES:
+        print(f"[{stage}]")
+        for location, size_diff in by_size[largest][stage]["hotspots"]:
+            print(f"  {location:<40}{size_diff / 1024:>12,.1f} KB")
+    print("\n=== 증가율 (log-log 기울기, 1.0 = 선형) ===")
+    for stage in STAGES:
+        s = summary[stage]
+        slope = "n/a" if s["slope"] is None else f"{s['slope']:.2f}"
+        flag = "  ⚠️ 초선형 증가" if s["superlinear"] else ""
+        print(f"{stage:<14}{slope:>8}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대규모 변환 경로의 단계별 메모리 프로파일링")
+    parser.add_argument("--sizes", default="1000,2000,4000,8000", help="측정할 행 수 목록 (쉼표 구분)")
+    parser.add_argument("--top", type=int, default=5, help="단계별로 표시할 할당 위치 수")
+    parser.add_argument("--characters", type=int, default=200, help="합성 캐릭터 수")
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    by_size, summary = run_suite(sizes, args.top, args.characters)
+    print_report(sizes, by_size, summary)
+    if any(s["superlinear"] for s in summary.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
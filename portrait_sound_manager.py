@@ -1,29 +1,84 @@
 import re
 import pandas as pd
+from settings_snapshot import CharacterSnapshot, SettingsSnapshot, ConversionSnapshot
+from expression_index import ExpressionIndex
 
 class PortraitSoundManager:
     """
     포트레이트와 사운드 주소 생성 관리 클래스 (v2.1)
     """
-    def __init__(self, character_manager=None, expression_map=None):
-        """[수정] expression_map을 외부(SettingsManager)에서 주입받습니다."""
+    def __init__(self, character_manager=None, expression_map=None, settings_manager=None):
+        """
+        [수정] expression_map을 외부(SettingsManager)에서 주입받습니다.
+        settings_manager가 주어지면 변환할 때마다 설정 스냅샷의 최신 맵을 사용하고, expression_map은 설정 시트가 없을 때만 씁니다.
+        """
         self.character_manager = character_manager
+        self.settings_manager = settings_manager
         # 외부에서 받은 감정 표현 맵 사용, 없으면 기본값
         self.expression_map = expression_map if expression_map is not None else {
             "화남": "Angry", "슬픔": "Sad", "기쁨": "Happy", "고통": "Pain", "부끄": "Shy"
         }
+        # [수정] (버전 스탬프, {(캐릭터, 표정): 포트레이트 경로}) 메모. 스탬프가 바뀌면 새 dict로 통째로 교체합니다.
+        self._portrait_memo = (None, {})
+        # [신규] 설정 시트 없이 주입된 expression_map의 (맵, 색인). 맵 객체가 바뀌면 다시 만듭니다.
+        self._fallback_index = (None, None)
+
+    def check_portrait(self, portrait_path, snapshot):
+        """[신규] 포트레이트 파일이 있으면 True, 없으면 False, 검사할 수 없으면(스냅샷에 에셋 색인 없음/빈 경로) None"""
+        if snapshot.portrait_assets is None or not portrait_path:
+            return None
+        return snapshot.portrait_assets.contains(portrait_path)
 
-    def generate_portrait_path(self, character_name, expression):
+    def check_sound(self, sound_path, snapshot):
+        """[신규] 사운드 파일이 있으면 True, 없으면 False, 검사할 수 없으면 None (확장자 없는 경로도 허용)"""
+        if snapshot.sound_assets is None or not sound_path:
+            return None
+        return snapshot.sound_assets.contains_stem(sound_path)
+
+    def current_snapshot(self, portrait_assets=None, sound_assets=None):
         """
-        [수정] 캐릭터별 커스텀 포트레이트 경로 설정을 우선 적용합니다.
+        [신규] 현재 캐릭터 표/설정 스냅샷과 사용할 감정 표현 맵을 묶은 변환용 스냅샷
+        에셋 색인은 매니저에 보관하지 않고(세션 간 공유되므로) 변환을 요청한 세션이 스냅샷에 지정합니다.
         """
+        characters = self.character_manager.snapshot() if self.character_manager else CharacterSnapshot()
+        settings = self.settings_manager.snapshot() if self.settings_manager else SettingsSnapshot()
+        if self.settings_manager:
+            return ConversionSnapshot(characters, settings, settings.expression_map, None, portrait_assets, sound_assets)
+        expression_map, expression_index = self._fallback_index
+        if expression_map is not self.expression_map:
+            expression_index = ExpressionIndex(self.expression_map)
+            self._fallback_index = (self.expression_map, expression_index)
+        return ConversionSnapshot(characters, settings, self.expression_map, expression_index, portrait_assets, sound_assets)
+
+    def _memo_for(self, snapshot):
+        """[신규] 스냅샷의 버전 스탬프에 해당하는 경로 메모. 기존 메모는 비우지 않고 새 dict로 교체하므로 이전 스냅샷으로 변환 중인 세션과 섞이지 않습니다."""
+        stamp, memo = self._portrait_memo
+        if stamp != snapshot.portrait_stamp:
+            memo = {}
+            self._portrait_memo = (snapshot.portrait_stamp, memo)
+        return memo
+
+    def generate_portrait_path(self, character_name, expression, snapshot=None):
+        """[수정] 버전 스탬프 기반 메모를 거쳐 포트레이트 경로를 생성합니다. snapshot을 생략하면 현재 스냅샷을 사용합니다."""
         if not character_name: return ""
+        snapshot = snapshot or self.current_snapshot()
+        memo = self._memo_for(snapshot)
+        key = (character_name, expression)
+        if key not in memo:
+            memo[key] = self._build_portrait_path(character_name, expression, snapshot)
+        return memo[key]
 
-        char_data = self.character_manager.get_character_by_name(character_name) or self.character_manager.get_character_by_kr(character_name)
+    def _build_portrait_path(self, character_name, expression, snapshot):
+        """
+        [수정] 캐릭터별 커스텀 포트레이트 경로 설정을 우선 적용합니다.
+        """
+        characters = snapshot.characters
+        char_data = characters.get_character_by_name(character_name) or characters.get_character_by_kr(character_name)
         if not char_data: return "" # 등록된 캐릭터가 없으면 빈 값 반환
 
         custom_path = char_data.get('portrait_path')
-        expression_eng = self.expression_map.get(expression, "Default")
+        # [수정] 정확히 일치하지 않아도 정규화/가장 긴 접두어 일치로 찾음 ('화남(약간)' -> 화남, '슬픔 ' -> 슬픔)
+        expression_eng = snapshot.expression_index.translate(expression)
 
         # 1. 커스텀 경로가 ""로 설정된 경우 (의도적으로 비우기)
         if custom_path == "":
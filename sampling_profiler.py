@@ -0,0 +1,141 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# GIL 전환 주기는 프로세스 전역 값이므로, 동시에 측정 중인 프로파일러 수를 세어 마지막 프로파일러가 끝날 때만 원래 값으로 되돌립니다.
+_switch_lock = threading.Lock()
+_switch_users = 0
+_saved_switch_interval = None
+
+
+def _acquire_switch_interval(interval):
+    global _switch_users, _saved_switch_interval
+    with _switch_lock:
+        if _switch_users == 0:
+            _saved_switch_interval = sys.getswitchinterval()
+        _switch_users += 1
+        sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+
+
+def _release_switch_interval():
+    global _switch_users, _saved_switch_interval
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_saved_switch_interval)
+            _saved_switch_interval = None
+
+
+def _frame_label(code):
+    """스택 프레임 표시 이름: '함수 (파일:시작 줄)' (folded 형식의 구분자 ';'는 사용하지 않음)"""
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    대상 스레드의 호출 스택을 interval초마다 샘플링하는 프로파일러
+    - 별도 스레드에서 sys._current_frames()로 스택만 읽으므로 대상 코드에 훅을 걸지 않습니다.
+      (만들지 않으면 아무 비용도 없고, 실행 중에도 샘플링 스레드 하나만 추가됩니다.)
+    - 결과는 상위 함수 표(top_functions)와 flamegraph.pl / speedscope / inferno에서 읽을 수 있는 folded 형식(folded)으로 제공합니다.
+    with 블록으로 사용하면 블록을 실행하는 스레드를 측정합니다.
+    측정 중에는 GIL 전환 주기(sys.setswitchinterval)를 샘플 간격보다 짧게 줄여, 샘플이 GIL을 놓는 지점에만 몰리지 않게 합니다.
+    (프로세스 전역 값이므로 동시에 측정 중인 프로파일러가 모두 끝나면 원래 값으로 되돌립니다.)
+    """
+
+    def __init__(self, interval=0.002, max_depth=128, thread_id=None):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.thread_id = thread_id
+        self.stacks = Counter()  # {(바깥 프레임, ..., 안쪽 프레임): 샘플 수}
+        self.samples = 0
+        self.elapsed = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._started = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop_event.clear()
+        _acquire_switch_interval(self.interval / 10)
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return self
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self._started
+        _release_switch_interval()
+        return self
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def trimmed_stacks(self):
+        """모든 샘플에 공통인 바깥 프레임(웹 서버/스크립트 실행기 등)을 잘라낸 스택 (공통 프레임 중 마지막 하나는 루트로 남김)"""
+        if not self.stacks:
+            return Counter()
+        stacks = list(self.stacks)
+        common = 0
+        shortest = min(len(stack) for stack in stacks)
+        while common < shortest - 1 and all(stack[common] == stacks[0][common] for stack in stacks):
+            common += 1
+        start = max(0, common - 1)
+        trimmed = Counter()
+        for stack, count in self.stacks.items():
+            trimmed[stack[start:]] += count
+        return trimmed
+
+    def top_functions(self, limit=20):
+        """
+        함수별 샘플 수 [{함수, self, total, self%, total%, 추정(ms)}]
+        self는 스택 맨 안쪽(직접 실행 중)이었던 샘플 수, total은 스택 어딘가에 있었던 샘플 수입니다.
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.trimmed_stacks().items():
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        samples = self.samples or 1
+        ms_per_sample = self.elapsed * 1000 / samples
+        rows = [
+            {
+                "함수": label,
+                "self": self_counts[label],
+                "total": total,
+                "self%": self_counts[label] / samples * 100,
+                "total%": total / samples * 100,
+                "추정(ms)": self_counts[label] * ms_per_sample,
+            }
+            for label, total in total_counts.items()
+        ]
+        rows.sort(key=lambda row: (-row["self"], -row["total"]))
+        return rows[:limit]
+
+    def folded(self):
+        """flamegraph 호환 folded 형식 ('바깥;...;안쪽 샘플수' 한 줄에 스택 하나)"""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.trimmed_stacks().most_common()) + "\n"
@@ -0,0 +1,269 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+import datetime
+
+import pandas as pd
+
+from google_sheets_manager import GoogleSheetsManager, scene_numbers
+from manager_registry import build_manager_set
+from sheet_config_manager import SheetConfigManager
+from conversion_cache import convert_scene_cached, read_options_id
+from api_metrics import get_api_metrics, set_api_action
+
+# read_sheet_data(컬럼 프로젝션) 한 번에 드는 최대 API 호출 수: 헤더 행, batch_get
+# (스프레드시트 핸들이 캐시되어 있지 않으면 open_by_key, worksheets 메타데이터 조회 2회 추가)
+READ_SHEET_COST = 4
+
+
+class RateLimiter:
+    """
+    토큰 버킷 방식의 API 호출 제한기
+    감시하는 시트가 아무리 많아도 분당 호출 수가 max_per_minute를 넘지 않도록 호출 전에 토큰을 기다립니다.
+    """
+
+    def __init__(self, max_per_minute=30):
+        self.capacity = max(1, max_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1, stop_event=None):
+        """cost만큼 토큰이 모일 때까지 기다립니다. stop_event가 설정되면 False를 반환합니다."""
+        cost = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return True
+                wait = (cost - self.tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+def split_scenes(df):
+    """DataFrame을 씬 번호별로 나눕니다. {씬 번호(int): 씬 DataFrame}"""
+    if '씬 번호' not in df.columns:
+        return {}
+    numbers = scene_numbers(df)
+    valid = numbers.notna()
+    return {int(scene): scene_df for scene, scene_df in df[valid].groupby(numbers[valid].astype(int), sort=True)}
+
+
+def scene_hash(scene_df):
+    """씬 내용의 해시 ('원본 행 번호'는 제외하므로 위쪽에 행이 추가되어도 내용이 같으면 같은 값)"""
+    content = scene_df.drop(columns=['원본 행 번호'], errors='ignore')
+    row_hashes = pd.util.hash_pandas_object(content, index=False).values
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(repr(list(content.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SceneWatcher:
+    """
+    시나리오 시트 감시 모드
+    - 주기적으로 스프레드시트 revision만 확인하고, 바뀐 스프레드시트의 감시 대상 시트만 다시 읽습니다.
+    - 씬별 행 해시를 비교하여 바뀐 씬만 다시 변환하고 출력합니다.
+    - 모든 API 호출은 하나의 RateLimiter를 거치므로 감시 대상 수와 관계없이 호출량이 제한됩니다.
+    """
+
+    def __init__(self, sheets_manager, converter, targets, interval=30.0, max_requests_per_minute=30,
+                 output_dir=None, column_mapping_provider=None, on_scene_changed=None, refresh_settings=True,
+                 metrics_file=None):
+        """
+        targets: [(시나리오 시트 URL, 시트 이름 목록 또는 None(전체 시트))]
+        on_scene_changed: 콜백 (sheet_name, scene, results, status) - status는 "changed" 또는 "removed"
+        metrics_file: [신규] 주기마다 API 호출 집계를 Prometheus 텍스트 형식으로 저장할 파일
+        """
+        self.sheets_manager = sheets_manager
+        self.converter = converter
+        self.interval = interval
+        self.limiter = RateLimiter(max_requests_per_minute)
+        self.output_dir = output_dir
+        self.column_mapping_provider = column_mapping_provider
+        self.on_scene_changed = on_scene_changed
+        self.refresh_settings = refresh_settings
+        self.metrics_file = metrics_file
+        self.stop_event = threading.Event()
+        self.spreadsheets = {}
+        for url, sheet_names in targets:
+            sheet_id = sheets_manager.extract_sheet_id(url)
+            if not sheet_id:
+                raise ValueError(f"올바르지 않은 구글 시트 URL입니다: {url}")
+            state = self.spreadsheets.setdefault(sheet_id, {
+                "url": url, "sheets": None if sheet_names is None else [], "revision": None, "fingerprint": None, "scenes": {},
+            })
+            if sheet_names is None:
+                state["sheets"] = None
+            elif state["sheets"] is not None:
+                state["sheets"].extend(name for name in sheet_names if name not in state["sheets"])
+
+    def log(self, message):
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        print(f"[{timestamp}] {message}", flush=True)
+
+    def _call(self, cost=1):
+        """API 호출 전에 토큰을 확보합니다. 감시가 중지되면 False"""
+        return self.limiter.acquire(cost, self.stop_event)
+
+    def _resolve_sheet_names(self, state):
+        if state["sheets"] is not None:
+            return state["sheets"]
+        if not self._call():
+            return []
+        success, message, names = self.sheets_manager.get_sheet_names(state["url"])
+        if not success:
+            self.log(message)
+            return []
+        return names
+
+    def poll_once(self):
+        """모든 감시 대상 스프레드시트를 한 번씩 확인합니다. 다시 변환한 씬 수를 반환합니다."""
+        if self.refresh_settings and self._call():
+            # 설정 시트 revision이 그대로면 탭을 내려받지 않음 (revision 조회 1회만 사용)
+            settings_manager = self.converter.settings_manager
+            revision = self.sheets_manager.get_spreadsheet_revision(self.sheets_manager.extract_sheet_id(settings_manager.sheet_url))
+            success, message, changed_tabs = settings_manager.refresh_changed_tabs(self.converter.character_manager, revision)
+            if changed_tabs:
+                self.log(message)
+
+        converted = 0
+        fingerprint = self.converter.get_settings_fingerprint()
+        for sheet_id, state in self.spreadsheets.items():
+            if self.stop_event.is_set() or not self._call():
+                break
+            revision = self.sheets_manager.get_spreadsheet_revision(sheet_id)
+            if revision is None:
+                self.log(f"{sheet_id}: revision 조회 실패, 다음 주기에 다시 시도합니다.")
+                continue
+            if revision == state["revision"] and fingerprint == state["fingerprint"]:
+                continue
+            sheet_names = self._resolve_sheet_names(state)
+            complete = True
+            for sheet_name in sheet_names:
+                if not self._call(READ_SHEET_COST):
+                    complete = False
+                    break
+                result = self._process_sheet(state, sheet_name, revision)
+                if result is None:
+                    complete = False
+                else:
+                    converted += result
+            if complete:
+                state["revision"] = revision
+                state["fingerprint"] = fingerprint
+        return converted
+
+    def _process_sheet(self, state, sheet_name, revision):
+        """시트를 읽어 바뀐 씬만 다시 변환합니다. 읽기에 실패하면 None"""
+        column_mapping = self.column_mapping_provider(state["url"]) if self.column_mapping_provider else {}
+        columns = self.converter.get_required_columns()
+        success, message, df = self.sheets_manager.read_sheet_data(state["url"], sheet_name, column_mapping, columns)
+        if not success:
+            self.log(f"'{sheet_name}': {message}")
+            return None
+
+        sheet_id = self.sheets_manager.extract_sheet_id(state["url"])
+        options = read_options_id(column_mapping, columns)
+        fingerprint = self.converter.get_settings_fingerprint()
+        previous = state["scenes"].get(sheet_name, {})
+        current = {}
+        converted = 0
+        for scene, scene_df in split_scenes(df).items():
+            digest = f"{scene_hash(scene_df)}:{fingerprint}"
+            current[scene] = digest
+            if previous.get(scene) == digest:
+                continue
+            results, _ = convert_scene_cached(self.converter, scene_df, sheet_id, sheet_name, scene, revision, options)
+            self._emit(sheet_id, sheet_name, scene, results, "changed")
+            converted += 1
+        for scene in previous.keys() - current.keys():
+            self._emit(sheet_id, sheet_name, scene, [], "removed")
+        state["scenes"][sheet_name] = current
+        return converted
+
+    def _emit(self, sheet_id, sheet_name, scene, results, status):
+        """바뀐 씬을 파일/콜백으로 내보냅니다. 파일은 스프레드시트별 하위 폴더에 저장하므로 시트 이름이 같은 워크북끼리 덮어쓰지 않습니다."""
+        if status == "removed":
+            self.log(f"'{sheet_name}' 씬 {scene}: 삭제됨")
+        else:
+            errors = sum(1 for res in results if res['status'] == 'error')
+            self.log(f"'{sheet_name}' 씬 {scene}: 다시 변환 ({len(results)}개 행, 오류 {errors}개)")
+        if self.output_dir:
+            output_dir = os.path.join(self.output_dir, sheet_id)
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(output_dir, f"{sheet_name}_scene{scene}.txt")
+            if status == "removed":
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                scripts = [res['result'] for res in results if res['status'] in ('success', 'warning')]
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write("\n\n".join(scripts))
+        if self.on_scene_changed:
+            self.on_scene_changed(sheet_name, scene, results, status)
+
+    def run(self, max_cycles=None):
+        """stop()이 호출되거나 max_cycles에 도달할 때까지 interval 간격으로 감시합니다."""
+        cycle = 0
+        set_api_action("감시 모드")
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            converted = self.poll_once()
+            if converted:
+                self.log(f"이번 주기에 {converted}개 씬을 다시 변환했습니다.")
+            if self.metrics_file:
+                get_api_metrics().write_prometheus(self.metrics_file)
+            cycle += 1
+            if max_cycles is not None and cycle >= max_cycles:
+                break
+            self.stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시나리오 시트 감시 모드: 바뀐 씬만 자동으로 다시 변환합니다.")
+    parser.add_argument("--settings-url", required=True, help="character, expressions, directives 시트가 포함된 설정 시트 URL")
+    parser.add_argument("--url", required=True, action="append", help="감시할 시나리오 시트 URL (여러 번 지정 가능)")
+    parser.add_argument("--sheet", action="append", help="감시할 시트 이름 (여러 번 지정 가능, 생략하면 전체 시트)")
+    parser.add_argument("--interval", type=float, default=30.0, help="revision 확인 주기(초)")
+    parser.add_argument("--max-rpm", type=int, default=30, help="분당 최대 API 호출 수")
+    parser.add_argument("--output-dir", default="watch_output", help="변환 결과를 저장할 폴더")
+    parser.add_argument("--metrics-file", help="주기마다 API 호출 집계를 Prometheus 텍스트 형식으로 저장할 파일")
+    args = parser.parse_args()
+
+    sheets_manager = GoogleSheetsManager()
+    if not sheets_manager.is_available():
+        raise SystemExit("구글 시트 API가 설정되지 않았습니다.")
+    success, message, managers = build_manager_set(sheets_manager.gc, args.settings_url)
+    if not success:
+        raise SystemExit(message)
+    converter = managers[3]
+    sheet_config = SheetConfigManager()
+
+    watcher = SceneWatcher(
+        sheets_manager, converter, [(url, args.sheet) for url in args.url],
+        interval=args.interval, max_requests_per_minute=args.max_rpm, output_dir=args.output_dir,
+        column_mapping_provider=sheet_config.get_header_mapping, metrics_file=args.metrics_file,
+    )
+    watcher.log(f"감시 시작: 스프레드시트 {len(watcher.spreadsheets)}개, 주기 {args.interval}초, 분당 최대 {args.max_rpm}회 호출")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+        watcher.log("감시를 종료합니다.")
+
+
+if __name__ == "__main__":
+    main()
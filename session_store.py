@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from types import MappingProxyType
+
+import pandas as pd
+
+
+def estimate_size(obj):
+    """객체의 대략적인 메모리 사용량(bytes)을 계산합니다. DataFrame/Series는 deep 기준으로 계산합니다."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, (dict, MappingProxyType)):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class SharedSheetStore:
+    """
+    여러 Streamlit 세션이 같은 시트 데이터를 한 벌만 공유하도록 하는 참조 카운트 저장소
+    - 키: (spreadsheet id, 시트 이름, 시트 revision, 읽기 옵션)
+    - 세션이 참조하는 동안 유지되며, 참조가 모두 해제되면 유휴 LRU로 옮겨져 일정 개수만 보관됩니다.
+    """
+
+    def __init__(self, max_idle_entries=4):
+        self.max_idle_entries = max_idle_entries
+        self._lock = threading.Lock()
+        self._entries = {}  # {key: {"data": df, "refs": set(session_id), "bytes": int, "created": float}}
+        self._idle = OrderedDict()  # 참조가 없는 키 (오래된 순)
+
+    def get(self, key):
+        """키에 해당하는 데이터를 반환합니다. 없으면 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if key in self._idle:
+                self._idle.move_to_end(key)
+            return entry["data"]
+
+    def put(self, key, data):
+        """참조 없이 데이터를 보관합니다 (이미 있으면 기존 데이터를 유지). 보관된 데이터를 반환합니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"data": data, "refs": set(), "bytes": estimate_size(data), "created": time.time()}
+                self._entries[key] = entry
+                self._idle[key] = None
+                self._evict_idle()
+            return entry["data"]
+
+    def acquire(self, key, session_id, data=None):
+        """
+        세션이 키를 참조하도록 등록하고 공유 데이터를 반환합니다.
+        아직 보관된 데이터가 없으면 data를 보관합니다 (data도 없으면 None 반환).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if data is None:
+                    return None
+                entry = {"data": data, "refs": set(), "bytes": estimate_size(data), "created": time.time()}
+                self._entries[key] = entry
+            entry["refs"].add(session_id)
+            self._idle.pop(key, None)
+            return entry["data"]
+
+    def release(self, key, session_id):
+        """세션의 참조를 해제합니다. 참조가 모두 없어지면 유휴 LRU로 옮깁니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry["refs"].discard(session_id)
+            if not entry["refs"]:
+                self._idle[key] = None
+                self._idle.move_to_end(key)
+                self._evict_idle()
+
+    def release_session(self, session_id):
+        """세션이 참조하던 모든 키를 해제합니다 (세션 종료 시 호출)."""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if session_id in entry["refs"]]
+        for key in keys:
+            self.release(key, session_id)
+
+    def _evict_idle(self):
+        """유휴 항목이 max_idle_entries를 넘으면 오래된 것부터 제거합니다 (lock 안에서 호출)."""
+        while len(self._idle) > self.max_idle_entries:
+            key, _ = self._idle.popitem(last=False)
+            self._entries.pop(key, None)
+
+    def stats(self):
+        """저장소 상태 요약을 반환합니다."""
+        with self._lock:
+            return {
+                "항목수": len(self._entries),
+                "유휴항목수": len(self._idle),
+                "총용량(bytes)": sum(entry["bytes"] for entry in self._entries.values()),
+                "항목": [
+                    {
+                        "키": " / ".join(str(part) for part in key[:3]),
+                        "참조세션수": len(entry["refs"]),
+                        "용량(bytes)": entry["bytes"],
+                    }
+                    for key, entry in self._entries.items()
+                ],
+            }
+
+
+class SessionLease:
+    """
+    세션이 공유 저장소에서 참조 중인 키를 추적합니다.
+    st.session_state에 보관하면 세션이 정리될 때(가비지 컬렉션) 참조가 자동으로 해제됩니다.
+    """
+
+    def __init__(self, store, session_id):
+        self.store = store
+        self.session_id = session_id
+        self.key = None
+        self._finalizer = weakref.finalize(self, store.release_session, session_id)
+
+    def hold(self, key, data=None):
+        """이전 키의 참조를 해제하고 새 키를 참조합니다. 공유 데이터를 반환합니다."""
+        if self.key is not None and self.key != key:
+            self.store.release(self.key, self.session_id)
+        self.key = key
+        return self.store.acquire(key, self.session_id, data)
+
+    def drop(self):
+        """현재 참조 중인 키를 해제합니다."""
+        if self.key is not None:
+            self.store.release(self.key, self.session_id)
+            self.key = None
+
+    def data(self):
+        """현재 참조 중인 데이터를 반환합니다."""
+        return self.store.get(self.key) if self.key is not None else None
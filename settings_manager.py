@@ -1,18 +1,159 @@
 import json
 import os
+import hashlib
+import threading
 import gspread # gspread 임포트
 import pandas as pd
 
+from api_metrics import tracked
+from settings_snapshot import SettingsSnapshot, exclusive_write
+
+SETTINGS_TABS = ("character", "expressions", "directives")
+EXPRESSION_HEADER = ['한글 표현', '영문 변환 값']
+DIRECTIVE_HEADER = ['지시문', '타입', '템플릿']
+
+
+def records_from_values(values):
+    """[신규] get_all_values() 결과(헤더 + 데이터 행)를 get_all_records()와 같은 dict 목록으로 변환합니다."""
+    if not values:
+        return []
+    header = [str(col) for col in values[0]]
+    records = []
+    for row in values[1:]:
+        padded = list(row) + [""] * (len(header) - len(row))
+        records.append(dict(zip(header, padded)))
+    return records
+
+
+def content_hash(values):
+    """[신규] 시트 값 목록의 내용 해시를 계산합니다 (탭 버전 비교용)."""
+    payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _cell_text(value):
+    """[신규] 시트에 쓸 셀 값 (None/NaN은 빈 문자열)"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return str(value)
+
+
+def _trim_row(row):
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def diff_keyed_rows(values, header, new_rows):
+    """
+    [신규] 첫 번째 열을 키로 하는 설정 탭의 현재 값(values)과 새 행 목록(new_rows)을 비교합니다.
+    반환값: ({시트 행 인덱스(0부터): 새 행}, [추가할 행], [삭제할 행 인덱스], 적용 후 예상 값)
+    - 값이 바뀐 키는 그 자리에서 갱신하고, 삭제된 키의 행은 새 키로 재사용한 뒤 남은 행만 삭제합니다.
+    - 키가 비어있는 행(빈 줄, 메모)은 건드리지 않습니다.
+    """
+    width = len(header)
+    current = [list(row) for row in values]
+    padded = [(row + [""] * width)[:width] for row in current]
+    updates = {}
+    if not current or padded[0] != header:
+        updates[0] = list(header)
+
+    rows_by_key = {}
+    for index in range(1, len(padded)):
+        key = padded[index][0]
+        if key:
+            rows_by_key.setdefault(key, []).append(index)
+
+    new_by_key = {}
+    for row in new_rows:
+        row = ([_cell_text(value) for value in row] + [""] * width)[:width]
+        if row[0].strip():
+            new_by_key[row[0]] = row
+
+    free_rows = []
+    for key, indices in rows_by_key.items():
+        if key in new_by_key:
+            # 중복 키는 로드 시 마지막 행이 적용되므로 마지막 행만 남깁니다.
+            keep = indices[-1]
+            free_rows.extend(indices[:-1])
+            if padded[keep] != new_by_key[key]:
+                updates[keep] = new_by_key[key]
+        else:
+            free_rows.extend(indices)
+    free_rows.sort()
+    appends = []
+    for key, row in new_by_key.items():
+        if key in rows_by_key:
+            continue
+        if free_rows:
+            updates[free_rows.pop(0)] = row
+        else:
+            appends.append(row)
+
+    # 적용 후 예상 값 (API의 values 응답처럼 뒤쪽 빈 셀/빈 행은 제거)
+    result = [list(row) for row in current] or [[]]
+    for index, row in updates.items():
+        result[index] = row + result[index][width:]
+    while result and not any(result[-1]):
+        result.pop()
+    result.extend(appends)
+    for index in sorted(free_rows, reverse=True):
+        del result[index]
+    result = [_trim_row(row) for row in result]
+    while result and not result[-1]:
+        result.pop()
+    return updates, appends, free_rows, result
+
+
+def _contiguous_runs(indices):
+    """[신규] 정렬된 인덱스를 연속 구간 [(시작, 끝(미포함))]으로 묶습니다."""
+    runs = []
+    for index in sorted(indices):
+        if runs and runs[-1][1] == index:
+            runs[-1][1] = index + 1
+        else:
+            runs.append([index, index + 1])
+    return runs
+
+
+def _row_data(rows):
+    return [{"values": [{"userEnteredValue": {"stringValue": value}} for value in row]} for row in rows]
+
+
+def build_row_diff_requests(sheet_id, updates, appends, deletes):
+    """[신규] diff_keyed_rows 결과를 spreadsheets.batchUpdate 요청 목록으로 변환합니다 (삭제는 아래쪽부터 마지막에)."""
+    requests = []
+    for start, end in _contiguous_runs(updates):
+        rows = [updates[index] for index in range(start, end)]
+        requests.append({"updateCells": {
+            "range": {"sheetId": sheet_id, "startRowIndex": start, "endRowIndex": end,
+                      "startColumnIndex": 0, "endColumnIndex": max(len(row) for row in rows)},
+            "rows": _row_data(rows), "fields": "userEnteredValue",
+        }})
+    if appends:
+        requests.append({"appendCells": {"sheetId": sheet_id, "rows": _row_data(appends), "fields": "userEnteredValue"}})
+    for start, end in reversed(_contiguous_runs(deletes)):
+        requests.append({"deleteDimension": {
+            "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": start, "endIndex": end},
+        }})
+    return requests
+
+
 class SettingsManager:
     """
     [수정] 사용자 정의 설정을 이제 구글 시트에서 관리합니다.
     """
+    @tracked
     def __init__(self, gspread_client, sheet_url):
         self.gc = gspread_client
         self.sheet_url = sheet_url
         self.spreadsheet = None
-        self.expression_map = {}
-        self.directive_rules = {}
+        # [신규] 표정 맵/지시문 규칙/탭별 버전과 내용 해시는 불변 스냅샷으로 보관하고, 변경 시 통째로 교체합니다.
+        # 탭 버전은 내용이 실제로 바뀌었을 때만 증가하며, 의존 캐시 무효화에 사용됩니다.
+        self._snapshot = SettingsSnapshot()
+        self._write_lock = threading.RLock()  # 시트 쓰기와 스냅샷 교체는 한 번에 하나씩
+        self._worksheets = {}  # [신규] 탭 이름 -> 워크시트 핸들
+        self._checked_revision = (None, ())  # [신규] 마지막으로 탭을 모두 확인한 시점의 (스프레드시트 revision, 확인한 탭)
 
         if self.gc and self.sheet_url:
             try:
@@ -24,48 +165,165 @@ class SettingsManager:
             except Exception as e:
                 print(f"설정 시트 로드 중 오류: {e}")
 
+    def snapshot(self):
+        """[신규] 현재 설정 스냅샷 (변환 한 번 동안 이 객체만 사용하면 도중의 변경에 영향받지 않음)"""
+        return self._snapshot
+
+    @property
+    def expression_map(self):
+        return self._snapshot.expression_map
+
+    @property
+    def directive_rules(self):
+        return self._snapshot.directive_rules
+
+    @property
+    def tab_versions(self):
+        return self._snapshot.tab_versions
+
     def is_loaded(self):
         """[신규] 데이터가 성공적으로 로드되었는지 확인하는 메서드 (규칙이 하나라도 있으면 True)"""
         return bool(self.expression_map) or bool(self.directive_rules)
     
-    def _load_expressions(self):
-        """'expressions' 시트에서 감정 표현 규칙을 로드합니다."""
+    def _worksheet(self, tab_name):
+        """[신규] 워크시트 핸들을 캐시합니다. 처음 한 번 전체 탭 목록을 받아 두므로 탭마다 메타데이터를 다시 조회하지 않습니다."""
+        if tab_name not in self._worksheets:
+            self._worksheets.update({worksheet.title: worksheet for worksheet in self.spreadsheet.worksheets()})
+            if tab_name not in self._worksheets:
+                raise gspread.exceptions.WorksheetNotFound(tab_name)
+        return self._worksheets[tab_name]
+
+    def forget_worksheets(self):
+        """[신규] 캐시한 워크시트 핸들을 버립니다. 오류가 나거나 다시 불러올 때 호출하여, 탭이 삭제/재생성된 뒤 이전 시트 ID를 쓰지 않게 합니다."""
+        self._worksheets = {}
+
+    def _read_tab_values(self, tab_name, values):
+        """[수정] 값이 주어지지 않았으면 탭 전체를 읽고, 내용 해시와 변경 여부를 함께 반환합니다."""
+        if values is None:
+            values = self._worksheet(tab_name).get_all_values()
+        new_hash = content_hash(values)
+        return values, new_hash, self._snapshot.tab_hashes.get(tab_name) != new_hash
+
+    @exclusive_write
+    def _load_expressions(self, values=None):
+        """[수정] 'expressions' 시트에서 감정 표현 규칙을 로드하여 새 스냅샷으로 교체합니다."""
         try:
-            worksheet = self.spreadsheet.worksheet("expressions")
-            records = worksheet.get_all_records()
-            self.expression_map = {row['한글 표현']: row['영문 변환 값'] for row in records if row.get('한글 표현')}
+            values, new_hash, changed = self._read_tab_values("expressions", values)
+            if not changed:
+                return False
+            records = records_from_values(values)
+            expression_map = {row['한글 표현']: row['영문 변환 값'] for row in records if row.get('한글 표현')}
+            self._snapshot = self._snapshot.replace("expressions", new_hash, expression_map=expression_map)
+            return True
         except gspread.exceptions.WorksheetNotFound:
+            self.forget_worksheets()
             print("'expressions' 시트를 찾을 수 없습니다.")
         except Exception as e:
+            self.forget_worksheets()
             print(f"'expressions' 시트 로드 중 오류: {e}")
+        return False
 
-    def _load_directives(self):
-        """'directives' 시트에서 지시문 규칙을 로드합니다."""
+    @exclusive_write
+    def _load_directives(self, values=None):
+        """[수정] 'directives' 시트에서 지시문 규칙을 로드하여 새 스냅샷으로 교체합니다."""
         try:
-            worksheet = self.spreadsheet.worksheet("directives")
-            records = worksheet.get_all_records()
-            self.directive_rules = {row['지시문']: {'type': row['타입'], 'template': row['템플릿']} for row in records if row.get('지시문')}
+            values, new_hash, changed = self._read_tab_values("directives", values)
+            if not changed:
+                return False
+            records = records_from_values(values)
+            directive_rules = {row['지시문']: {'type': row['타입'], 'template': row['템플릿']} for row in records if row.get('지시문')}
+            self._snapshot = self._snapshot.replace("directives", new_hash, directive_rules=directive_rules)
+            return True
         except gspread.exceptions.WorksheetNotFound:
+            self.forget_worksheets()
             print("'directives' 시트를 찾을 수 없습니다.")
         except Exception as e:
+            self.forget_worksheets()
             print(f"'directives' 시트 로드 중 오류: {e}")
+        return False
+
+    def get_tab_version(self, tab_name):
+        """[신규] 탭의 현재 버전을 반환합니다."""
+        return self.tab_versions.get(tab_name, 0)
+
+    def get_tab_hash(self, tab_name):
+        """[신규] 마지막으로 로드한 탭 내용의 해시를 반환합니다 (로드 전이면 None)."""
+        return self._snapshot.tab_hashes.get(tab_name)
+
+    @tracked
+    @exclusive_write
+    def refresh_changed_tabs(self, character_manager=None, revision=None):
+        """
+        [신규] 설정 탭 전체를 한 번의 batchGet으로 읽어 내용 해시를 비교하고,
+        실제로 바뀐 탭만 다시 로드합니다. 매니저를 새로 만들지 않으므로 변경되지 않은 탭의 캐시는 유지됩니다.
+        [수정] revision(GoogleSheetsManager.get_spreadsheet_revision으로 조회한 설정 시트의 revision)을 넘기면,
+        마지막으로 확인한 revision과 같을 때 탭을 내려받지 않고 바로 반환합니다. None이면 항상 탭을 읽어 비교합니다.
+        """
+        if not self.spreadsheet: return False, "설정 시트에 연결되지 않았습니다.", []
+        tabs = SETTINGS_TABS if character_manager is not None else SETTINGS_TABS[1:]
+        checked_revision, checked_tabs = self._checked_revision
+        if revision is not None and revision == checked_revision and set(tabs) <= set(checked_tabs):
+            return True, "변경된 설정이 없습니다.", []
+        # 다시 불러올 때는 다음 쓰기에서 탭 목록(시트 ID)도 새로 조회
+        self.forget_worksheets()
+        if character_manager is not None:
+            character_manager.forget_worksheets()
+        try:
+            response = self.spreadsheet.values_batch_get([f"'{tab}'" for tab in tabs])
+        except Exception as e:
+            return False, f"설정 탭 버전 확인 중 오류: {e}", []
+
+        changed_tabs = []
+        for tab, value_range in zip(tabs, response.get("valueRanges", [])):
+            values = value_range.get("values", [])
+            if tab == "character":
+                previous_version = character_manager.version
+                character_manager.load_characters(values)
+                changed = character_manager.version != previous_version
+            elif tab == "expressions":
+                changed = self._load_expressions(values)
+            else:
+                changed = self._load_directives(values)
+            if changed:
+                changed_tabs.append(tab)
+
+        self._checked_revision = (revision, tuple(tabs))  # 읽기 전에 조회한 revision이므로 그 뒤의 변경은 다음에 다시 확인됨
+        if changed_tabs:
+            return True, f"변경된 탭을 다시 불러왔습니다: {', '.join(changed_tabs)}", changed_tabs
+        return True, "변경된 설정이 없습니다.", changed_tabs
 
     # --- 감정 표현 규칙 관리 ---
     def get_expression_map(self):
         return self.expression_map
 
+    def _save_keyed_rows(self, tab_name, header, make_rows):
+        """
+        [신규] 탭의 현재 값과 새 행 목록(make_rows(현재 값))을 비교하여 바뀐/추가된/삭제된 행만 한 번의 batchUpdate로 씁니다.
+        시트를 비우지 않으므로 저장 중에 다른 사용자가 읽어도 규칙이 사라져 보이지 않습니다.
+        반환값: (변경 여부, 적용 후 값)
+        """
+        try:
+            worksheet = self._worksheet(tab_name)
+            values = worksheet.get_all_values()
+            updates, appends, deletes, result = diff_keyed_rows(values, header, make_rows(values))
+            requests = build_row_diff_requests(worksheet.id, updates, appends, deletes)
+            if requests:
+                self.spreadsheet.batch_update({"requests": requests})
+        except Exception:
+            self.forget_worksheets()  # 탭이 삭제/재생성되었을 수 있으므로 다음 요청에서 시트 ID를 새로 조회
+            raise
+        return bool(requests), result
+
+    @tracked
+    @exclusive_write
     def save_expression_map(self, new_map):
-        """변경 사항을 'expressions' 시트 전체에 덮어씁니다."""
+        """[수정] 변경 사항(바뀐/추가된/삭제된 행)만 'expressions' 시트에 반영합니다."""
         if not self.spreadsheet: return False, "설정 시트에 연결되지 않았습니다."
         try:
-            worksheet = self.spreadsheet.worksheet("expressions")
-            # 기존 내용 삭제 후 새로 작성
-            worksheet.clear()
-            # 헤더 + 데이터
-            header = ['한글 표현', '영문 변환 값']
-            rows_to_insert = [header] + [[k, v] for k, v in new_map.items()]
-            worksheet.update(rows_to_insert, 'A1')
-            self._load_expressions() # 메모리에도 다시 로드
+            changed, values = self._save_keyed_rows("expressions", EXPRESSION_HEADER, lambda _: list(new_map.items()))
+            self._load_expressions(values) # 쓴 내용으로 메모리 갱신 (다시 읽지 않음)
+            if not changed:
+                return True, "변경된 감정 표현 규칙이 없습니다."
             return True, "감정 표현 규칙이 시트에 저장되었습니다."
         except Exception as e:
             return False, f"감정 표현 규칙 저장 중 오류: {e}"
@@ -74,31 +332,45 @@ class SettingsManager:
     def get_directive_rules(self):
         return self.directive_rules
     
+    @tracked
+    @exclusive_write
+    def save_directive_rules(self, new_rules):
+        """[신규] 지시문 규칙 전체({이름: {'type', 'template'}})를 받아 변경된 행만 'directives' 시트에 반영합니다."""
+        rows = [[name, rule['type'], rule['template']] for name, rule in new_rules.items()]
+        return self._edit_directive_rows(lambda _: rows)
+
+    def _edit_directive_rows(self, make_rows):
+        """[신규] 'directives' 탭의 현재 행을 기준으로 새 행 목록을 만들어 변경분만 저장하고 메모리를 갱신합니다."""
+        changed, values = self._save_keyed_rows("directives", DIRECTIVE_HEADER, make_rows)
+        self._load_directives(values) # 쓴 내용으로 메모리 갱신 (다시 읽지 않음)
+        return changed
+
+    @tracked
+    @exclusive_write
     def add_directive_rule(self, name, rule_type, template):
-        """새 지시문 규칙을 'directives' 시트의 마지막 행에 추가합니다."""
+        """[수정] 새 지시문 규칙을 'directives' 시트에 추가합니다 (변경된 행만 기록)."""
         if not self.spreadsheet: return False, "설정 시트에 연결되지 않았습니다."
         if not name or not rule_type or template is None: return False, "필수 항목이 비어있습니다."
         try:
-            worksheet = self.spreadsheet.worksheet("directives")
             # 중복 체크
             if name in self.directive_rules:
                 return False, f"'{name}' 규칙이 이미 존재합니다. 수정은 아직 지원되지 않습니다."
-            worksheet.append_row([name, rule_type, template])
-            self._load_directives() # 메모리 다시 로드
+            # 시트의 현재 행을 기준으로 하므로 그 사이 다른 사용자가 추가한 규칙도 유지됩니다.
+            self._edit_directive_rows(lambda values: values[1:] + [[name, rule_type, template]])
             return True, f"'{name}' 규칙이 시트에 추가되었습니다."
         except Exception as e:
             return False, f"지시문 규칙 추가 중 오류: {e}"
 
+    @tracked
+    @exclusive_write
     def delete_directive_rule(self, name):
-        """'directives' 시트에서 특정 규칙을 찾아 삭제합니다."""
+        """[수정] 'directives' 시트에서 특정 규칙의 행만 삭제합니다."""
         if not self.spreadsheet: return False, "설정 시트에 연결되지 않았습니다."
-        try:
-            worksheet = self.spreadsheet.worksheet("directives")
-            cell = worksheet.find(name, in_column=1) # 지시문 이름은 A열에 있다고 가정
-            if cell:
-                worksheet.delete_rows(cell.row)
-                self._load_directives() # 메모리 다시 로드
-                return True, f"'{name}' 규칙이 삭제되었습니다."
+        if name not in self.directive_rules:
             return False, "삭제할 규칙을 찾지 못했습니다."
+        try:
+            if not self._edit_directive_rows(lambda values: [row for row in values[1:] if row and row[0] != name]):
+                return False, "삭제할 규칙을 찾지 못했습니다."
+            return True, f"'{name}' 규칙이 삭제되었습니다."
         except Exception as e:
             return False, f"지시문 규칙 삭제 중 오류: {e}"
\ No newline at end of file
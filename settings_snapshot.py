@@ -0,0 +1,115 @@
+import functools
+from types import MappingProxyType
+
+import pandas as pd
+
+from character_index import CharacterIndex
+from expression_index import ExpressionIndex
+
+
+def exclusive_write(method):
+    """
+    매니저의 변경 메서드 데코레이터: self._write_lock(RLock)을 잡고 실행합니다.
+    쓰기끼리만 순서대로 실행되며(중복 검사 → 시트 쓰기 → 스냅샷 교체가 섞이지 않음), 읽기는 잠그지 않습니다.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class CharacterSnapshot:
+    """
+    캐릭터 표의 불변 스냅샷 (DataFrame + 이름 색인 + 버전/내용 해시)
+    만든 뒤에는 수정하지 않으며, 변경은 새 스냅샷을 만들어 매니저의 참조를 한 번에 바꾸는 방식으로만 합니다.
+    따라서 변환 중인 세션은 잠금 없이 읽어도 절반만 갱신된 표를 보지 않습니다.
+    """
+
+    def __init__(self, characters_df=None, version=0, content_hash=None):
+        self.characters_df = characters_df if characters_df is not None else pd.DataFrame()
+        self.index = CharacterIndex(self.characters_df)
+        # 행 -> dict 변환을 조회마다 하지 않도록 미리 만들어 둠 (Arrow 문자열 표에서 iloc 행 조회가 변환 시간의 대부분을 차지)
+        self.records = self.characters_df.to_dict('records')
+        self.version = version
+        self.content_hash = content_hash
+
+    def get_character_by_kr(self, kr_name):
+        """한글 이름이 정확히 일치하는 캐릭터 (dict, 없으면 None)"""
+        row = self.index.find_kr(kr_name)
+        return dict(self.records[row]) if row is not None else None
+
+    def get_character_by_name(self, name):
+        """영문 이름이 대소문자 무시하고 일치하는 캐릭터 (dict, 없으면 None)"""
+        row = self.index.find_name(name)
+        return dict(self.records[row]) if row is not None else None
+
+    def find_character(self, name):
+        """한글 이름 우선, 없으면 영문 이름으로 찾습니다."""
+        return self.get_character_by_kr(name) or self.get_character_by_name(name)
+
+
+class SettingsSnapshot:
+    """
+    설정 탭(expressions, directives)의 불변 스냅샷
+    표정 맵과 지시문 규칙은 읽기 전용 매핑(MappingProxyType)으로 보관합니다.
+    표정 맵은 불러올 때 정규화 트라이 색인(ExpressionIndex)으로도 만들어 두며, 맵이 바뀌지 않으면 색인을 재사용합니다.
+    """
+
+    def __init__(self, expression_map=None, directive_rules=None, tab_versions=None, tab_hashes=None, expression_index=None):
+        self.expression_map = MappingProxyType(dict(expression_map or {}))
+        self.expression_index = expression_index or ExpressionIndex(self.expression_map)
+        self.directive_rules = MappingProxyType({
+            name: MappingProxyType(dict(rule)) for name, rule in (directive_rules or {}).items()
+        })
+        self.tab_versions = MappingProxyType({"expressions": 0, "directives": 0, **(tab_versions or {})})
+        self.tab_hashes = MappingProxyType(dict(tab_hashes or {}))
+
+    def replace(self, tab_name=None, tab_hash=None, **changes):
+        """
+        일부 항목만 바꾼 새 스냅샷을 만듭니다. tab_name이 주어지면 해당 탭의 버전을 올리고 내용 해시를 기록합니다.
+        """
+        tab_versions = dict(self.tab_versions)
+        tab_hashes = dict(self.tab_hashes)
+        if tab_name is not None:
+            tab_versions[tab_name] = tab_versions.get(tab_name, 0) + 1
+            tab_hashes[tab_name] = tab_hash
+        return SettingsSnapshot(
+            changes.get("expression_map", self.expression_map),
+            changes.get("directive_rules", self.directive_rules),
+            tab_versions,
+            tab_hashes,
+            None if "expression_map" in changes else self.expression_index,
+        )
+
+
+class ConversionSnapshot:
+    """
+    변환/검증 한 번이 처음부터 끝까지 사용하는 설정 묶음 (캐릭터 표, 표정 맵, 지시문 규칙, 에셋 색인)
+    시작할 때 한 번 만들어 넘기므로, 도중에 다른 세션이 설정을 바꿔도 결과가 섞이지 않습니다.
+    portrait_assets/sound_assets는 세션이 지정한 에셋 폴더 색인(AssetManifest)이며, None이면 해당 검사를 하지 않습니다.
+    """
+
+    def __init__(self, characters, settings, expression_map, expression_index=None, portrait_assets=None, sound_assets=None):
+        self.characters = characters
+        self.settings = settings
+        self.expression_map = expression_map
+        if expression_index is None:
+            expression_index = settings.expression_index if expression_map is settings.expression_map else ExpressionIndex(expression_map)
+        self.expression_index = expression_index
+        self.portrait_assets = portrait_assets
+        self.sound_assets = sound_assets
+
+    @property
+    def asset_stamp(self):
+        """에셋 검사 결과에 영향을 주는 (폴더, 색인 내용 해시) 목록 (변환 결과 캐시 지문용)"""
+        return [(manifest.root, manifest.digest) if manifest else None for manifest in (self.portrait_assets, self.sound_assets)]
+
+    @property
+    def directive_rules(self):
+        return self.settings.directive_rules
+
+    @property
+    def portrait_stamp(self):
+        """포트레이트 경로 메모의 유효성을 판단하는 (캐릭터 버전, 표정 버전) 스탬프"""
+        return (self.characters.version, self.settings.tab_versions.get("expressions", 0))
@@ -1,17 +1,30 @@
 import json
 import os
+import re
+import pandas as pd
+import atexit
+import tempfile
+import threading
+import time
 from urllib.parse import urlparse
 
 class SheetConfigManager:
     """
     구글 시트 설정 관리 클래스
     - 마지막 접근 URL 저장
-    - 컬럼 매핑 설정 저장
+    - 컬럼 매핑 설정 저장 (시트 ID별 메모리 캐시)
+    - 설정 파일은 디바운스 후 원자적으로 저장
     """
     
-    def __init__(self, config_file="sheet_config.json"):
+    def __init__(self, config_file="sheet_config.json", save_delay=1.0):
         self.config_file = config_file
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._save_timer = None
+        self._dirty = False
+        self._mapping_cache = {}  # {sheet_id: {정규화된 실제컬럼: 역할컬럼}}
         self.config = self.load_config()
+        atexit.register(self.flush)
     
     def load_config(self):
         """설정 파일 로드"""
@@ -29,31 +42,69 @@ class SheetConfigManager:
             "last_url": "",
             "last_sheet_name": "",
             "column_mappings": {},  # {sheet_id: {실제컬럼: 역할컬럼}}
-            "recent_urls": []
+            "recent_urls": [],
+            "recent_sheets": {},  # {sheet_id: [최근 선택한 시트 이름...]} (미리 읽기 후보)
+            "asset_dirs": {"portrait": "", "sound": ""}  # 에셋 존재 여부 검사용 로컬 폴더
         }
     
-    def save_config(self):
-        """설정 파일 저장"""
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, ensure_ascii=False, indent=2)
+    def save_config(self, immediate=False):
+        """
+        [수정] 설정 파일 저장을 예약합니다.
+        save_delay 동안의 변경은 한 번의 쓰기로 합쳐지며, immediate=True면 바로 기록합니다.
+        """
+        with self._lock:
+            self._dirty = True
+            if immediate or self.save_delay <= 0:
+                self.flush()
+            elif self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def flush(self):
+        """[신규] 예약된 변경 사항을 임시 파일에 쓴 뒤 교체하여 원자적으로 저장합니다."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            config_dir = os.path.dirname(os.path.abspath(self.config_file))
+            fd, tmp_path = tempfile.mkstemp(prefix=".sheet_config.", suffix=".tmp", dir=config_dir)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.config, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.config_file)
+                self._dirty = False
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
     
     def extract_sheet_id(self, url):
         """URL에서 시트 ID 추출"""
-        import re
         match = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', url)
         return match.group(1) if match else None
     
     def save_last_access(self, url, sheet_name=""):
         """마지막 접근 정보 저장"""
-        self.config["last_url"] = url
-        self.config["last_sheet_name"] = sheet_name
-        
-        # 최근 URL 목록에 추가 (중복 제거, 최대 5개)
-        if url not in self.config["recent_urls"]:
-            self.config["recent_urls"].insert(0, url)
-            self.config["recent_urls"] = self.config["recent_urls"][:5]
-        
-        self.save_config()
+        with self._lock:
+            self.config["last_url"] = url
+            self.config["last_sheet_name"] = sheet_name
+            
+            # 최근 URL 목록에 추가 (중복 제거, 최대 5개)
+            if url not in self.config["recent_urls"]:
+                self.config["recent_urls"].insert(0, url)
+                self.config["recent_urls"] = self.config["recent_urls"][:5]
+
+            # [신규] 스프레드시트별 최근 선택한 시트 목록 (중복 제거, 최대 5개)
+            sheet_id = self.extract_sheet_id(url)
+            if sheet_id and sheet_name:
+                recent_sheets = self.config.setdefault("recent_sheets", {})
+                names = [name for name in recent_sheets.get(sheet_id, []) if name != sheet_name]
+                recent_sheets[sheet_id] = [sheet_name] + names[:4]
+            
+            self.save_config()
     
     def get_last_access(self):
         """마지막 접근 정보 반환"""
@@ -66,12 +117,30 @@ class SheetConfigManager:
         """최근 접근 URL 목록 반환"""
         return self.config.get("recent_urls", [])
     
+    def get_recent_sheets(self, url):
+        """[신규] 스프레드시트에서 최근 선택한 시트 이름 목록 (최근 순)"""
+        sheet_id = self.extract_sheet_id(url)
+        return list(self.config.get("recent_sheets", {}).get(sheet_id, [])) if sheet_id else []
+
+    def get_asset_dirs(self):
+        """[신규] 에셋 검사용 로컬 폴더 {"portrait": 경로, "sound": 경로} 반환 (비어있으면 검사하지 않음)"""
+        saved = self.config.get("asset_dirs", {})
+        return {"portrait": saved.get("portrait", ""), "sound": saved.get("sound", "")}
+
+    def save_asset_dirs(self, portrait_dir, sound_dir):
+        """[신규] 에셋 검사용 로컬 폴더 저장"""
+        with self._lock:
+            self.config["asset_dirs"] = {"portrait": portrait_dir, "sound": sound_dir}
+            self.save_config()
+
     def save_column_mapping(self, url, column_mapping):
         """특정 시트의 컬럼 매핑 저장"""
         sheet_id = self.extract_sheet_id(url)
         if sheet_id:
-            self.config["column_mappings"][sheet_id] = column_mapping
-            self.save_config()
+            with self._lock:
+                self.config["column_mappings"][sheet_id] = column_mapping
+                self._mapping_cache.pop(sheet_id, None)
+                self.save_config()
     
     def get_column_mapping(self, url):
         """특정 시트의 컬럼 매핑 반환"""
@@ -80,6 +149,26 @@ class SheetConfigManager:
             return self.config["column_mappings"].get(sheet_id, {})
         return {}
     
+    def get_header_mapping(self, url):
+        """
+        [신규] 파싱 단계에서 사용할 정규화된 매핑 {실제컬럼(소문자/공백 제거): 역할컬럼}을 반환합니다.
+        시트 ID별로 메모리에 캐시합니다.
+        """
+        sheet_id = self.extract_sheet_id(url)
+        if not sheet_id:
+            return {}
+        with self._lock:
+            mapping = self._mapping_cache.get(sheet_id)
+            if mapping is None:
+                raw_mapping = self.config["column_mappings"].get(sheet_id, {})
+                # 같은 역할에 매핑된 컬럼이 여럿이면 첫 번째만 사용 (중복 컬럼명 방지)
+                mapping = {}
+                for actual, role in raw_mapping.items():
+                    if actual and role and role not in mapping.values():
+                        mapping[str(actual).strip().lower()] = role
+                self._mapping_cache[sheet_id] = mapping
+            return mapping
+    
     def has_saved_mapping(self, url):
         """저장된 컬럼 매핑이 있는지 확인"""
         return bool(self.get_column_mapping(url))
@@ -105,40 +194,54 @@ class SheetConfigManager:
         if missing_required:
             return False, f"필수 역할이 매핑되지 않음: {', '.join(missing_required)}"
         
+        # [신규] 두 컬럼이 같은 역할로 매핑되면 같은 이름의 컬럼이 두 개 생기므로 거부
+        duplicated_roles = self._duplicated_roles(column_mapping)
+        if duplicated_roles:
+            return False, f"같은 역할에 여러 컬럼이 매핑됨: {', '.join(duplicated_roles)}"
+        
         return True, "매핑이 유효합니다"
     
+    def _duplicated_roles(self, column_mapping):
+        """[신규] 둘 이상의 실제 컬럼이 매핑된 역할 목록"""
+        seen = set()
+        duplicated = []
+        for role in column_mapping.values():
+            if not role:
+                continue
+            if role in seen and role not in duplicated:
+                duplicated.append(role)
+            seen.add(role)
+        return duplicated
+    
     def apply_mapping(self, df, column_mapping):
-        """데이터프레임에 컬럼 매핑 적용"""
+        """
+        [수정] 데이터프레임에 컬럼 매핑 적용 (역할 컬럼만 남긴 새 DataFrame을 한 번에 생성)
+        매핑된 실제 컬럼이 시트에 없으면 같은 이름의 역할 컬럼을 그대로 사용하고, 둘 다 없을 때만 빈 값으로 채웁니다.
+        시트를 읽을 때는 GoogleSheetsManager.read_sheet_data(column_mapping=...)로 파싱 단계에서 적용하는 것을 권장합니다.
+        """
+        duplicated_roles = self._duplicated_roles(column_mapping)
+        if duplicated_roles:
+            raise ValueError(f"같은 역할에 여러 컬럼이 매핑됨: {', '.join(duplicated_roles)}")
+        
         # 역방향 매핑 생성 (역할 -> 실제컬럼)
         reverse_mapping = {role: actual for actual, role in column_mapping.items()}
         
-        # 새로운 데이터프레임 생성
-        mapped_df = df.copy()
-        
-        # 컬럼명 변경
-        rename_dict = {}
-        for role, actual_col in reverse_mapping.items():
-            if actual_col in mapped_df.columns:
-                rename_dict[actual_col] = role
-        
-        mapped_df = mapped_df.rename(columns=rename_dict)
-        
-        # 누락된 선택적 컬럼 추가
+        # 역할 컬럼별로 실제 컬럼을 참조하고, 누락된 선택적 컬럼은 빈 값으로 채움
         role_columns = self.get_role_columns()
+        columns = {}
         for role in role_columns:
-            if role not in mapped_df.columns:
-                mapped_df[role] = ""
-        
-        # 필요한 컬럼만 선택
-        final_columns = list(role_columns.keys())
-        mapped_df = mapped_df[final_columns]
-        
-        return mapped_df
+            source = reverse_mapping.get(role, role)
+            if source not in df.columns:
+                source = role
+            columns[role] = df[source] if source in df.columns else ""
+        return pd.DataFrame(columns, index=df.index)
     
     def clear_config(self):
         """설정 초기화"""
-        self.config = self.default_config()
-        self.save_config()
+        with self._lock:
+            self.config = self.default_config()
+            self._mapping_cache = {}
+            self.save_config(immediate=True)
     
     def get_config_summary(self):
         """설정 요약 정보 반환"""
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from api_metrics import get_api_metrics, set_api_action
+
+
+def prefetch_candidates(sheet_names, selected, recent_sheets=(), limit=3):
+    """
+    선택한 시트 다음에 열 가능성이 높은 시트 목록 (우선순위 순)
+    다음 시트 → 최근 사용한 시트 → 그다음 시트 → 이전 시트 순으로, 선택한 시트와 목록에 없는 시트는 제외합니다.
+    """
+    names = list(sheet_names)
+    ordered = []
+    if selected in names:
+        position = names.index(selected)
+        following = names[position + 1:position + 3]
+        ordered.extend(following[:1])
+        ordered.extend(recent_sheets)
+        ordered.extend(following[1:])
+        ordered.extend(names[max(0, position - 1):position])
+    else:
+        ordered.extend(recent_sheets)
+        ordered.extend(names[:1])
+    available = set(names)
+    candidates = [name for name in dict.fromkeys(ordered) if name != selected and name in available]
+    return candidates[:limit]
+
+
+class SheetPrefetcher:
+    """
+    다음에 선택할 가능성이 높은 시트를 백그라운드에서 미리 읽어 공유 시트 저장소(SharedSheetStore)에 넣어 둡니다.
+    - 작은 스레드 풀(max_workers)에서 실행하며, 대기 중인 작업은 max_pending개까지만 받습니다.
+    - 분당 미리 읽기 수(max_per_minute)와 API 읽기 할당량 사용률(max_quota_ratio)을 넘으면 새 작업을 받지 않습니다.
+    - 사용자가 미리 읽는 중인 시트를 선택하면 wait()로 진행 중인 읽기 결과를 기다려 재사용합니다.
+      아직 시작하지 않은 작업은 취소하고, 진행 중인 작업은 wait_timeout초까지만 기다린 뒤 직접 읽도록 None을 반환합니다.
+    """
+
+    def __init__(self, store, max_workers=2, max_pending=4, max_per_minute=12, max_quota_ratio=0.5, wait_timeout=10.0):
+        self.store = store
+        self.wait_timeout = wait_timeout
+        self.max_pending = max_pending
+        self.max_per_minute = max_per_minute
+        self.max_quota_ratio = max_quota_ratio
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheet-prefetch")
+        self._lock = threading.Lock()
+        self._inflight = {}  # {key: Future}
+        self._started = deque()  # 최근 1분간 시작한 미리 읽기 시각
+        self._prefetched = deque(maxlen=32)  # 미리 읽었지만 아직 선택되지 않은 키
+        self._stats = {"scheduled": 0, "completed": 0, "failed": 0, "skipped": 0, "used": 0, "waited": 0, "cancelled": 0}
+
+    def _over_budget(self, now):
+        while self._started and now - self._started[0] > 60:
+            self._started.popleft()
+        if len(self._inflight) >= self.max_pending or len(self._started) >= self.max_per_minute:
+            return True
+        return get_api_metrics().quota_usage()["read_ratio"] >= self.max_quota_ratio
+
+    def schedule(self, key, loader):
+        """
+        key의 데이터가 저장소에 없으면 loader()(성공 여부, 메시지, DataFrame 반환)로 미리 읽도록 예약합니다.
+        예약했으면 True, 이미 있거나 진행 중이거나 예산을 넘었으면 False
+        """
+        with self._lock:
+            if key in self._inflight or self.store.get(key) is not None:
+                return False
+            now = time.monotonic()
+            if self._over_budget(now):
+                self._stats["skipped"] += 1
+                return False
+            self._started.append(now)
+            self._stats["scheduled"] += 1
+            future = self._executor.submit(self._run, key, loader)
+            self._inflight[key] = future
+        return True
+
+    def _run(self, key, loader):
+        set_api_action("시트 미리 읽기")
+        try:
+            success, _, df = loader()
+            if success:
+                self.store.put(key, df)
+            with self._lock:
+                self._stats["completed" if success else "failed"] += 1
+                if success:
+                    self._prefetched.append(key)
+            return df if success else None
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def wait(self, key, timeout=None):
+        """
+        [수정] key를 미리 읽는 중이면 끝날 때까지(최대 timeout초, 기본 wait_timeout) 기다려 DataFrame을 반환합니다.
+        진행 중이 아니거나, 아직 시작 전이라 취소했거나, 시간 안에 끝나지 않았거나, 실패하면 None (호출한 쪽에서 직접 읽음)
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None and future.cancel():
+                # 풀에서 대기 중이던 작업은 실행되지 않으므로 여기서 정리
+                self._inflight.pop(key, None)
+                self._stats["cancelled"] += 1
+                return None
+        if future is None:
+            return None
+        if timeout is None:
+            timeout = self.wait_timeout
+        try:
+            df = future.result(timeout=timeout)
+        except Exception:
+            return None
+        if df is not None:
+            with self._lock:
+                self._stats["waited"] += 1
+        return df
+
+    def claim(self, key):
+        """사용자가 key를 선택했을 때 호출합니다. 미리 읽은 데이터였으면 True (적중 통계에 반영)"""
+        with self._lock:
+            if key not in self._prefetched:
+                return False
+            self._prefetched.remove(key)
+            self._stats["used"] += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "inflight": len(self._inflight)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,443 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from api_metrics import classify_endpoint
+from synthetic_data import make_scenario_workbook, make_settings_values
+
+
+def column_to_index(letters):
+    """'A' -> 1, 'AA' -> 27"""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index
+
+
+def index_to_column(index):
+    """1 -> 'A', 27 -> 'AA'"""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def split_range(range_name):
+    """"'시트'!A1:B2" -> ("시트", "A1:B2"). 시트 이름만 있으면 셀 범위는 ''"""
+    if range_name.startswith("'"):
+        match = re.match(r"^'((?:[^']|'')*)'(?:!(.*))?$", range_name)
+        if match:
+            return match.group(1).replace("''", "'"), match.group(2) or ""
+    if "!" in range_name:
+        title, cells = range_name.rsplit("!", 1)
+        return title, cells
+    return range_name, ""
+
+
+def parse_cells(cells, row_count, column_count):
+    """A1 셀 범위를 1부터 시작하는 (시작 행, 시작 열, 끝 행, 끝 열)로 변환합니다. 행/열 생략 시 시트 끝까지"""
+    if not cells:
+        return 1, 1, row_count, column_count
+    parts = cells.split(":")
+    refs = [re.match(r"^([A-Za-z]*)(\d*)$", part) for part in parts]
+    if not all(refs):
+        raise ValueError(f"Unable to parse range: {cells}")
+    start_col = column_to_index(refs[0].group(1)) if refs[0].group(1) else 1
+    start_row = int(refs[0].group(2)) if refs[0].group(2) else 1
+    if len(refs) == 1:
+        return start_row, start_col, start_row, start_col
+    end_col = column_to_index(refs[1].group(1)) if refs[1].group(1) else column_count
+    end_row = int(refs[1].group(2)) if refs[1].group(2) else row_count
+    return start_row, start_col, end_row, end_col
+
+
+class StubWorkbook:
+    """메모리에 보관되는 스프레드시트 (시트별 2차원 값 목록)"""
+
+    def __init__(self, spreadsheet_id, title, sheets):
+        self.id = spreadsheet_id
+        self.title = title
+        self.version = 1
+        self.modified = time.time()
+        self.sheets = []
+        for index, (sheet_title, values) in enumerate(sheets.items()):
+            self.sheets.append({"id": 1000 + index, "title": sheet_title, "values": [list(map(str, row)) for row in values]})
+
+    def touch(self):
+        self.version += 1
+        self.modified = time.time()
+
+    def sheet_by_title(self, title):
+        for sheet in self.sheets:
+            if sheet["title"] == title:
+                return sheet
+        raise KeyError(title)
+
+    def sheet_by_id(self, sheet_id):
+        for sheet in self.sheets:
+            if sheet["id"] == sheet_id:
+                return sheet
+        raise KeyError(sheet_id)
+
+    @staticmethod
+    def dimensions(sheet):
+        values = sheet["values"]
+        return max(len(values), 1000), max(max((len(row) for row in values), default=0), 26)
+
+    def metadata(self):
+        sheets = []
+        for index, sheet in enumerate(self.sheets):
+            row_count, column_count = self.dimensions(sheet)
+            sheets.append({"properties": {
+                "sheetId": sheet["id"], "title": sheet["title"], "index": index, "sheetType": "GRID",
+                "gridProperties": {"rowCount": row_count, "columnCount": column_count},
+            }})
+        return {
+            "spreadsheetId": self.id,
+            "properties": {"title": self.title, "locale": "ko_KR", "timeZone": "Asia/Seoul"},
+            "sheets": sheets,
+            "spreadsheetUrl": f"https://docs.google.com/spreadsheets/d/{self.id}/edit",
+        }
+
+    def resolve(self, range_name):
+        title, cells = split_range(range_name)
+        sheet = self.sheet_by_title(title) if title else self.sheets[0]
+        row_count, column_count = self.dimensions(sheet)
+        return sheet, parse_cells(cells, row_count, column_count)
+
+    def get_values(self, range_name):
+        """values.get 응답 (뒤쪽 빈 행/셀은 실제 API처럼 잘라냄)"""
+        sheet, (start_row, start_col, end_row, end_col) = self.resolve(range_name)
+        rows = []
+        for row in sheet["values"][start_row - 1:end_row]:
+            cells = row[start_col - 1:end_col]
+            while cells and cells[-1] == "":
+                cells.pop()
+            rows.append(cells)
+        while rows and not rows[-1]:
+            rows.pop()
+        response = {"range": f"'{sheet['title']}'!{index_to_column(start_col)}{start_row}:{index_to_column(end_col)}{end_row}",
+                    "majorDimension": "ROWS"}
+        if rows:
+            response["values"] = rows
+        return response
+
+    def write_values(self, range_name, values):
+        sheet, (start_row, start_col, _, _) = self.resolve(range_name)
+        self._write(sheet, start_row, start_col, values)
+        self.touch()
+        return {"spreadsheetId": self.id, "updatedRange": range_name,
+                "updatedRows": len(values), "updatedCells": sum(len(row) for row in values)}
+
+    def _write(self, sheet, start_row, start_col, values):
+        grid = sheet["values"]
+        for r, row in enumerate(values):
+            target_row = start_row - 1 + r
+            while len(grid) <= target_row:
+                grid.append([])
+            target = grid[target_row]
+            needed = start_col - 1 + len(row)
+            if len(target) < needed:
+                target.extend([""] * (needed - len(target)))
+            for c, value in enumerate(row):
+                target[start_col - 1 + c] = "" if value is None else str(value)
+
+    def _last_row(self, sheet):
+        last_row = len(sheet["values"])
+        while last_row > 0 and not any(sheet["values"][last_row - 1]):
+            last_row -= 1
+        return last_row
+
+    def append_values(self, range_name, values):
+        title, _ = split_range(range_name)
+        sheet = self.sheet_by_title(title) if title else self.sheets[0]
+        last_row = self._last_row(sheet)
+        self._write(sheet, last_row + 1, 1, values)
+        self.touch()
+        return {"spreadsheetId": self.id, "tableRange": f"'{sheet['title']}'",
+                "updates": {"updatedRange": f"'{sheet['title']}'!A{last_row + 1}", "updatedRows": len(values)}}
+
+    def clear_values(self, range_name):
+        sheet, (start_row, start_col, end_row, end_col) = self.resolve(range_name)
+        for row in sheet["values"][start_row - 1:end_row]:
+            for c in range(start_col - 1, min(end_col, len(row))):
+                row[c] = ""
+        self.touch()
+        return {"spreadsheetId": self.id, "clearedRange": range_name}
+
+    @staticmethod
+    def _cell_rows(rows):
+        """updateCells/appendCells의 RowData를 값 목록으로 변환합니다."""
+        return [
+            [next(iter(cell.get("userEnteredValue", {"stringValue": ""}).values())) for cell in row.get("values", [])]
+            for row in rows
+        ]
+
+    def batch_update(self, requests):
+        """spreadsheets.batchUpdate (셀 갱신, 행 추가, 열/행 늘리기, 행 삭제)"""
+        replies = []
+        for request in requests:
+            if "updateCells" in request:
+                body = request["updateCells"]
+                grid_range = body["range"]
+                sheet = self.sheet_by_id(grid_range.get("sheetId", 0))
+                self._write(sheet, grid_range.get("startRowIndex", 0) + 1, grid_range.get("startColumnIndex", 0) + 1,
+                            self._cell_rows(body.get("rows", [])))
+            elif "appendCells" in request:
+                body = request["appendCells"]
+                sheet = self.sheet_by_id(body.get("sheetId", 0))
+                self._write(sheet, self._last_row(sheet) + 1, 1, self._cell_rows(body.get("rows", [])))
+            elif "appendDimension" in request:
+                self.sheet_by_id(request["appendDimension"].get("sheetId", 0))  # 열/행 수는 값 크기에서 계산하므로 기록만 확인
+            elif "deleteDimension" in request:
+                grid_range = request["deleteDimension"]["range"]
+                sheet = self.sheet_by_id(grid_range.get("sheetId", 0))
+                if grid_range.get("dimension", "ROWS") != "ROWS":
+                    raise ValueError("Only ROWS dimension is supported by the stub")
+                del sheet["values"][grid_range["startIndex"]:grid_range["endIndex"]]
+            else:
+                raise ValueError(f"Unsupported request: {list(request)}")
+            replies.append({})
+        self.touch()
+        return {"spreadsheetId": self.id, "replies": replies}
+
+
+class StubState:
+    """스텁 서버의 워크북, 장애 주입 설정, 요청 통계"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit_rate=0.0, quota_per_minute=None, seed=None):
+        self.workbooks = {}
+        self.lock = threading.RLock()
+        self.config = {
+            "latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate,
+            "rate_limit_rate": rate_limit_rate, "quota_per_minute": quota_per_minute,
+        }
+        self.random = random.Random(seed)
+        self.request_times = []
+        self.counts = Counter()
+
+    def add_workbook(self, spreadsheet_id, title, sheets):
+        with self.lock:
+            self.workbooks[spreadsheet_id] = StubWorkbook(spreadsheet_id, title, sheets)
+        return self.workbooks[spreadsheet_id]
+
+    def fault_for_request(self):
+        """주입할 장애를 결정합니다. (상태 코드, 메시지) 또는 None"""
+        with self.lock:
+            now = time.time()
+            quota = self.config["quota_per_minute"]
+            if quota:
+                self.request_times = [t for t in self.request_times if now - t < 60]
+                if len(self.request_times) >= quota:
+                    return 429, "Quota exceeded for quota metric 'Read requests' (stub)"
+                self.request_times.append(now)
+            roll = self.random.random()
+            if roll < self.config["rate_limit_rate"]:
+                return 429, "Rate limit exceeded (stub)"
+            if roll < self.config["rate_limit_rate"] + self.config["error_rate"]:
+                return 500, "Internal error encountered (stub)"
+        return None
+
+    def delay(self):
+        latency = self.config["latency_ms"] + self.random.uniform(0, self.config["jitter_ms"])
+        if latency > 0:
+            time.sleep(latency / 1000.0)
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Sheets v4 / Drive v3 중 gspread와 이 프로그램이 사용하는 엔드포인트만 구현한 핸들러"""
+    protocol_version = "HTTP/1.1"
+    server_version = "SheetsStub/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.stub_state
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        reasons = {400: "INVALID_ARGUMENT", 404: "NOT_FOUND", 429: "RESOURCE_EXHAUSTED", 500: "INTERNAL"}
+        self._send_json(status, {"error": {"code": status, "message": message, "status": reasons.get(status, "UNKNOWN")}})
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _handle(self, method):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = parse_qs(parsed.query)
+        body = self._read_body() if method in ("POST", "PUT") else {}
+        self.state.counts[f"{method} {classify_endpoint(path)}"] += 1
+
+        if path.startswith("/_stub/"):
+            return self._handle_control(method, path, body)
+
+        self.state.delay()
+        fault = self.state.fault_for_request()
+        if fault:
+            self.state.counts[f"fault {fault[0]}"] += 1
+            return self._send_error(*fault)
+
+        try:
+            with self.state.lock:
+                payload = self._dispatch(method, path, query, body)
+        except KeyError as e:
+            return self._send_error(404, f"Requested entity was not found: {e}")
+        except ValueError as e:
+            return self._send_error(400, str(e))
+        if payload is None:
+            return self._send_error(404, f"Unknown endpoint: {method} {path}")
+        self._send_json(200, payload)
+
+    def _dispatch(self, method, path, query, body):
+        match = re.match(r"^/drive/v3/files/([^/]+)$", path)
+        if match and method == "GET":
+            workbook = self.state.workbooks[unquote(match.group(1))]
+            return {"id": workbook.id, "name": workbook.title, "version": str(workbook.version),
+                    "modifiedTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(workbook.modified))}
+
+        match = re.match(r"^/v4/spreadsheets/([^/:]+)(.*)$", path)
+        if not match:
+            return None
+        workbook = self.state.workbooks[unquote(match.group(1))]
+        rest = match.group(2)
+
+        if rest == "" and method == "GET":
+            return workbook.metadata()
+        if rest == ":batchUpdate" and method == "POST":
+            return workbook.batch_update(body.get("requests", []))
+        if rest == "/values:batchGet" and method == "GET":
+            ranges = query.get("ranges", [])
+            return {"spreadsheetId": workbook.id, "valueRanges": [workbook.get_values(r) for r in ranges]}
+        if rest == "/values:batchUpdate" and method == "POST":
+            responses = [workbook.write_values(item["range"], item.get("values", [])) for item in body.get("data", [])]
+            return {"spreadsheetId": workbook.id, "totalUpdatedCells": sum(r["updatedCells"] for r in responses),
+                    "responses": responses}
+
+        match = re.match(r"^/values/(.+?)(:append|:clear)?$", rest)
+        if match:
+            range_name = unquote(match.group(1))
+            action = match.group(2)
+            if action == ":append" and method == "POST":
+                return workbook.append_values(range_name, body.get("values", []))
+            if action == ":clear" and method == "POST":
+                return workbook.clear_values(range_name)
+            if action is None and method == "GET":
+                return workbook.get_values(range_name)
+            if action is None and method == "PUT":
+                return workbook.write_values(range_name, body.get("values", []))
+        return None
+
+    def _handle_control(self, method, path, body):
+        """스텁 제어용 엔드포인트: GET /_stub/stats, POST /_stub/config"""
+        if path == "/_stub/stats" and method == "GET":
+            return self._send_json(200, {"counts": dict(self.state.counts), "config": self.state.config})
+        if path == "/_stub/config" and method == "POST":
+            with self.state.lock:
+                self.state.config.update({k: v for k, v in body.items() if k in self.state.config})
+            return self._send_json(200, {"config": self.state.config})
+        return self._send_error(404, f"Unknown control endpoint: {path}")
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+class SheetsStubServer:
+    """
+    로컬 Sheets API 대체 서버
+    GoogleSheetsManager(api_base_url=server.base_url)로 연결하면 실제 구글 시트 대신 이 서버를 사용합니다.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, **fault_options):
+        self.state = StubState(**fault_options)
+        self.httpd = ThreadingHTTPServer((host, port), StubRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub_state = self.state
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sheet_url(self, spreadsheet_id):
+        """GoogleSheetsManager/CharacterManager에 넘길 수 있는 형식의 URL"""
+        return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit"
+
+    def add_workbook(self, spreadsheet_id, title, sheets):
+        return self.state.add_workbook(spreadsheet_id, title, sheets)
+
+    def add_synthetic_workbooks(self, sheet_count=3, rows_per_sheet=400, character_count=50, seed=0):
+        """합성 설정 시트('stub-settings')와 시나리오 시트('stub-scenario')를 등록합니다."""
+        self.add_workbook("stub-settings", "설정 (합성)", make_settings_values(character_count, seed))
+        self.add_workbook("stub-scenario", "시나리오 (합성)",
+                          make_scenario_workbook(sheet_count, rows_per_sheet, seed=seed, character_count=character_count))
+        return self.sheet_url("stub-settings"), self.sheet_url("stub-scenario")
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self):
+        return {"counts": dict(self.state.counts), "config": dict(self.state.config)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="부하 테스트용 로컬 Sheets API 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sheets", type=int, default=3, help="시나리오 워크북의 시트 수")
+    parser.add_argument("--rows", type=int, default=400, help="시트당 데이터 행 수")
+    parser.add_argument("--characters", type=int, default=50, help="설정 시트의 캐릭터 수")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="요청마다 추가할 지연(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="지연에 더할 무작위 편차(ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류 비율 (0~1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 오류 비율 (0~1)")
+    parser.add_argument("--quota-per-minute", type=int, default=None, help="분당 허용 요청 수 (초과 시 429)")
+    args = parser.parse_args()
+
+    server = SheetsStubServer(
+        args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, quota_per_minute=args.quota_per_minute,
+    )
+    settings_url, scenario_url = server.add_synthetic_workbooks(args.sheets, args.rows, args.characters)
+    print(f"스텁 서버: {server.base_url}")
+    print(f"설정 시트 URL: {settings_url}")
+    print(f"시나리오 시트 URL: {scenario_url}")
+    print(f"앱 연결: SHEETS_API_BASE_URL={server.base_url} streamlit run dialogue_converter.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import random
+
+SCENARIO_HEADER = ['씬 번호', '지시문', '캐릭터', 'string_id', '표정', '사운드 주소', '사운드 파일', '대사']
+CHARACTER_HEADER = ['String_ID', 'KR', 'Name', 'Portrait_Path', 'Converter_Name']
+EXPRESSIONS = {"화남": "Angry", "슬픔": "Sad", "기쁨": "Happy", "고통": "Pain", "부끄": "Shy", "놀람": "Surprised"}
+DIRECTIVES = [
+    ["카메라", "template", "카메라_이동(\"{{비고}}\")"],
+    ["조명", "simple", "조명_변경()"],
+    ["효과음", "template", "효과음_재생(\"0.1\", \"{{사운드 주소}}{{사운드 파일}}\")\\n#{{대사}}"],
+]
+KOREAN_SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초코토포호"
+
+
+def _korean_word(rng, length):
+    return "".join(rng.choice(KOREAN_SYLLABLES) for _ in range(length))
+
+
+def make_characters(count, seed=0):
+    """합성 캐릭터 목록 [(string_id, kr, name)]"""
+    rng = random.Random(seed)
+    characters = []
+    used = set()
+    while len(characters) < count:
+        kr = _korean_word(rng, rng.randint(2, 3))
+        if kr in used:
+            continue
+        used.add(kr)
+        index = len(characters)
+        characters.append((f"char{index:04d}", kr, f"Char{index:04d}"))
+    return characters
+
+
+def make_settings_values(character_count=50, seed=0):
+    """설정 스프레드시트의 탭별 값 {"character": [...], "expressions": [...], "directives": [...]}"""
+    characters = make_characters(character_count, seed)
+    character_rows = [CHARACTER_HEADER] + [
+        [string_id, kr, name, "" if i % 3 else f"{string_id}/{string_id}_", f"[@{string_id}]"]
+        for i, (string_id, kr, name) in enumerate(characters)
+    ]
+    expression_rows = [['한글 표현', '영문 변환 값']] + [[kr, en] for kr, en in EXPRESSIONS.items()]
+    directive_rows = [['지시문', '타입', '템플릿']] + [list(row) for row in DIRECTIVES]
+    return {"character": character_rows, "expressions": expression_rows, "directives": directive_rows}
+
+
+def make_scenario_values(row_count, scene_size=40, character_count=50, extra_columns=6,
+                         unregistered_rate=0.01, seed=0, sheet_prefix="03"):
+    """
+    합성 시나리오 시트 값 (1~3행 메모, 4행 헤더, 5행부터 데이터)
+    extra_columns만큼 변환에 쓰지 않는 넓은 번역/메모 컬럼을 추가합니다.
+    """
+    rng = random.Random(seed)
+    characters = make_characters(character_count, seed)
+    expressions = list(EXPRESSIONS) + ["", "", "화남(약간)"]
+    header = SCENARIO_HEADER + ['비고'] + [f"번역_{i + 1}" for i in range(extra_columns)]
+    values = [
+        [f"{sheet_prefix} 시나리오 (합성 데이터)"],
+        ["작성자", "load-test"],
+        [],
+        header,
+    ]
+    for i in range(row_count):
+        scene = i // scene_size + 1
+        roll = rng.random()
+        if roll < 0.8:
+            directive = "대사"
+        elif roll < 0.9:
+            directive = rng.choice(["카메라", "조명", "효과음"])
+        elif roll < 0.95:
+            directive = "연출"
+        else:
+            directive = ""
+        if rng.random() < unregistered_rate:
+            speaker = _korean_word(rng, 4)
+        else:
+            speaker = rng.choice(characters)[1]
+        line = " ".join(_korean_word(rng, rng.randint(1, 4)) for _ in range(rng.randint(3, 12)))
+        sound_file = f"{sheet_prefix}_{scene:03d}_{i:05d}" if rng.random() < 0.9 else ""
+        row = [
+            str(scene), directive, speaker if directive == "대사" else "",
+            f"{sheet_prefix}_line_{i:05d}" if rng.random() < 0.95 else "",
+            rng.choice(expressions), "voice/" if sound_file else "", sound_file, line,
+            "줌 인" if directive == "카메라" else "",
+        ]
+        row += [f"translation {i}-{c} " * rng.randint(1, 4) for c in range(extra_columns)]
+        values.append(row)
+    return values
+
+
+def make_scenario_workbook(sheet_count=3, rows_per_sheet=400, seed=0, **kwargs):
+    """합성 시나리오 스프레드시트 {시트 이름: 값}"""
+    return {
+        f"03_{index + 1:02d}": make_scenario_values(rows_per_sheet, seed=seed + index, sheet_prefix=f"03_{index + 1:02d}", **kwargs)
+        for index in range(sheet_count)
+    }
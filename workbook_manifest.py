@@ -0,0 +1,246 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from api_metrics import get_api_metrics, set_api_action
+from character_index import normalize_name
+from google_sheets_manager import scene_numbers
+
+# 색인에 필요한 컬럼 (씬 번호, 지시문, 캐릭터만 읽음)
+MANIFEST_COLUMNS = ("씬 번호", "지시문", "캐릭터")
+
+
+def _text(df, column):
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[column].astype(object).fillna("").astype(str).str.strip()
+
+
+def _names_by_scene(values, scenes):
+    """{씬 번호: [값...]} (빈 값 제외, 등장 순서 유지)"""
+    grouped = {}
+    for scene, value in zip(scenes, values):
+        if value:
+            grouped.setdefault(scene, {})[value] = None
+    return {scene: list(names) for scene, names in grouped.items()}
+
+
+def summarize_sheet(df):
+    """
+    시트 데이터(read_sheet_data 형식)의 색인 항목
+    {rows, scenes, scene_rows, scene_characters, scene_directives, characters, directives, hash}
+    characters/directives는 {이름: 행 수}, hash는 세 컬럼 내용의 해시입니다.
+    """
+    characters = _text(df, "캐릭터")
+    directives = _text(df, "지시문")
+    numbers = scene_numbers(df) if "씬 번호" in df.columns else pd.Series(float("nan"), index=df.index)
+    valid = numbers.notna()
+    scenes = numbers[valid].astype(int)
+    content = pd.DataFrame({"scene": numbers.fillna(-1), "character": characters, "directive": directives})
+    digest = hashlib.sha1(pd.util.hash_pandas_object(content, index=False).values.tobytes()).hexdigest()
+    return {
+        "rows": len(df),
+        "scenes": sorted(int(scene) for scene in scenes.unique()),
+        "scene_rows": {int(scene): int(count) for scene, count in scenes.value_counts().sort_index().items()},
+        "scene_characters": _names_by_scene(characters[valid], scenes.tolist()),
+        "scene_directives": _names_by_scene(directives[valid], scenes.tolist()),
+        "characters": {name: int(count) for name, count in characters[characters != ""].value_counts().items()},
+        "directives": {name: int(count) for name, count in directives[directives != ""].value_counts().items()},
+        "hash": digest,
+    }
+
+
+class WorkbookManifest:
+    """
+    시나리오 워크북 하나의 색인 (시트별 씬 번호, 행 수, 사용한 캐릭터/지시문)
+    만든 뒤에는 수정하지 않으며, 갱신은 새 객체로 교체합니다.
+    sheets: {시트 이름: 색인 항목(summarize_sheet + revision) 또는 None(씬 컬럼이 없는 시트)}
+    """
+
+    def __init__(self, url, revision, sheet_names, sheets, column_mapping=None):
+        self.url = url
+        self.revision = revision
+        self.sheet_names = list(sheet_names)
+        self.sheets = sheets
+        self.column_mapping = column_mapping
+        self.updated = time.time()
+
+    def with_sheet(self, sheet_name, entry):
+        """시트 하나의 항목만 바꾼 새 색인"""
+        sheets = dict(self.sheets)
+        sheets[sheet_name] = entry
+        names = self.sheet_names if sheet_name in self.sheet_names else self.sheet_names + [sheet_name]
+        return WorkbookManifest(self.url, self.revision, names, sheets, self.column_mapping)
+
+    def label(self, sheet_name):
+        """선택 목록에 표시할 시트 이름 ('03_01 · 씬 12개 · 400행')"""
+        entry = self.sheets.get(sheet_name)
+        if not entry:
+            return sheet_name
+        return f"{sheet_name} · 씬 {len(entry['scenes'])}개 · {entry['rows']}행"
+
+    def scene_numbers(self, sheet_name):
+        entry = self.sheets.get(sheet_name)
+        return entry["scenes"] if entry else []
+
+    def search(self, query, limit=200):
+        """
+        씬 번호(숫자) 또는 캐릭터/지시문 이름(공백/대소문자 무시 부분 일치)이 나오는 씬 목록
+        [{"시트", "씬", "행 수", "일치"}] (시트 순서, 씬 번호 순)
+        """
+        query = str(query).strip()
+        if not query:
+            return []
+        key = normalize_name(query)
+        scene = int(query) if query.isdigit() else None
+        hits = []
+        for sheet_name in self.sheet_names:
+            entry = self.sheets.get(sheet_name)
+            if not entry:
+                continue
+            for number in entry["scenes"]:
+                matched = []
+                if number == scene:
+                    matched.append(f"씬 {number}")
+                if key:
+                    matched.extend(name for name in entry["scene_characters"].get(number, []) if key in normalize_name(name))
+                    matched.extend(f"[{name}]" for name in entry["scene_directives"].get(number, []) if key in normalize_name(name))
+                if matched:
+                    hits.append({"시트": sheet_name, "씬": number, "행 수": entry["scene_rows"].get(number, 0), "일치": ", ".join(matched)})
+                    if len(hits) >= limit:
+                        return hits
+        return hits
+
+
+class ManifestService:
+    """
+    시나리오 워크북 색인을 백그라운드에서 만들고 revision이 바뀔 때마다 갱신합니다 (프로세스 전체에서 하나).
+    - 색인은 시트를 하나씩 열지 않고 GoogleSheetsManager.read_workbook_columns로 씬/지시문/캐릭터 컬럼만 묶어서 읽습니다.
+    - 항목마다 읽은 revision을 기록하며, 갱신할 때는 새 revision으로 이미 기록된 시트(세션이 방금 읽은 시트 등)를 건너뜁니다.
+      내용 해시가 같은 시트는 이전 항목을 그대로 재사용합니다.
+    - API 읽기 할당량 사용률이 max_quota_ratio 이상이면 새 갱신을 시작하지 않습니다.
+    """
+
+    def __init__(self, sheets_manager, columns=MANIFEST_COLUMNS, max_quota_ratio=0.5):
+        self.sheets_manager = sheets_manager
+        self.columns = list(columns)
+        self.max_quota_ratio = max_quota_ratio
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workbook-manifest")
+        self._lock = threading.Lock()
+        self._manifests = {}  # {spreadsheet id: WorkbookManifest}
+        self._inflight = {}  # {spreadsheet id: Future}
+        self._stats = {"scans": 0, "sheets_read": 0, "sheets_reused": 0, "recorded": 0, "failed": 0, "skipped": 0}
+        self.last_error = None
+
+    def get(self, url):
+        """url 워크북의 최신 색인 (아직 없으면 None)"""
+        sheet_id = self.sheets_manager.extract_sheet_id(url) if url else None
+        with self._lock:
+            return self._manifests.get(sheet_id)
+
+    def is_scanning(self, url):
+        sheet_id = self.sheets_manager.extract_sheet_id(url) if url else None
+        with self._lock:
+            return sheet_id in self._inflight
+
+    def refresh(self, url, column_mapping=None, revision=None):
+        """
+        색인이 없거나 revision/컬럼 매핑이 바뀌었으면 백그라운드 갱신을 예약합니다.
+        revision을 모르면 갱신 작업에서 Drive API로 조회합니다. 예약했으면 True
+        """
+        sheet_id = self.sheets_manager.extract_sheet_id(url) if url else None
+        if not sheet_id:
+            return False
+        with self._lock:
+            current = self._manifests.get(sheet_id)
+            if sheet_id in self._inflight:
+                return False
+            if current and revision is not None and current.revision == revision and current.column_mapping == column_mapping:
+                return False
+            if get_api_metrics().quota_usage()["read_ratio"] >= self.max_quota_ratio:
+                self._stats["skipped"] += 1
+                return False
+            self._inflight[sheet_id] = self._executor.submit(self._scan, url, sheet_id, column_mapping, revision)
+        return True
+
+    def _scan(self, url, sheet_id, column_mapping, revision):
+        set_api_action("워크북 색인")
+        try:
+            if revision is None:
+                revision = self.sheets_manager.get_spreadsheet_revision(sheet_id)
+            with self._lock:
+                current = self._manifests.get(sheet_id)
+            if current and current.column_mapping != column_mapping:
+                current = None
+            if current and revision is not None and current.revision == revision:
+                return current
+            # 이전 색인이 있으면 시트 추가/삭제/이름 변경을 반영하도록 메타데이터를 새로 조회
+            names = list(self.sheets_manager.open_spreadsheet(sheet_id, refresh=current is not None)["worksheets"])
+            previous = current.sheets if current else {}
+            stale = [name for name in names if not (previous.get(name) and revision is not None
+                                                    and previous[name]["revision"] == revision)]
+            frames = {}
+            if stale:
+                success, message, frames = self.sheets_manager.read_workbook_columns(url, self.columns, column_mapping, stale)
+                if not success:
+                    raise RuntimeError(message)
+            sheets = {}
+            read = reused = 0
+            for name in names:
+                if name not in frames:
+                    sheets[name] = previous.get(name)
+                    continue
+                df = frames[name]
+                if df is None or "씬 번호" not in df.columns:
+                    sheets[name] = None
+                    continue
+                entry = summarize_sheet(df)
+                old = previous.get(name)
+                if old and old["hash"] == entry["hash"]:
+                    entry = old
+                    reused += 1
+                else:
+                    read += 1
+                sheets[name] = {**entry, "revision": revision}
+            manifest = WorkbookManifest(url, revision, names, sheets, column_mapping)
+            with self._lock:
+                self._manifests[sheet_id] = manifest
+                self._stats["scans"] += 1
+                self._stats["sheets_read"] += read
+                self._stats["sheets_reused"] += reused
+            self.last_error = None
+            return manifest
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += 1
+            self.last_error = str(e)
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(sheet_id, None)
+
+    def record_sheet(self, url, sheet_name, revision, df, column_mapping=None):
+        """
+        세션이 시트를 읽었을 때 호출합니다. API 호출 없이 그 데이터로 해당 시트 항목을 갱신하므로,
+        같은 revision으로 갱신할 때 이 시트는 다시 읽지 않습니다. 색인이 아직 없으면 무시합니다.
+        """
+        sheet_id = self.sheets_manager.extract_sheet_id(url) if url else None
+        if df is None or "씬 번호" not in df.columns or revision is None:
+            return
+        entry = {**summarize_sheet(df), "revision": revision}
+        with self._lock:
+            current = self._manifests.get(sheet_id)
+            if current is None or current.column_mapping != column_mapping:
+                return
+            self._manifests[sheet_id] = current.with_sheet(sheet_name, entry)
+            self._stats["recorded"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "workbooks": len(self._manifests), "inflight": len(self._inflight)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)